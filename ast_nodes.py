@@ -1,5 +1,5 @@
 # Arquivo: ast_nodes.py
-from dataclasses import dataclass
+from dataclasses import dataclass, InitVar
 from typing import List, Optional, Union
 
 # Classe Base
@@ -40,6 +40,11 @@ class VarDecl(AstNode):
 class Assign(AstNode): # Corresponde ao 'Attr' do PDF
     name: str
     value: AstNode
+    # (profundidade do escopo, posição no escopo) da variável, preenchido pelo parser; não é campo
+    resolved: InitVar[tuple | None] = None
+
+    def __post_init__(self, resolved):
+        self.resolved = resolved
 
 @dataclass
 class IfStmt(AstNode):
@@ -77,6 +82,10 @@ class Literal(AstNode): # Num, Char
 @dataclass
 class VarAccess(AstNode): # Id (uso)
     name: str
+    resolved: InitVar[tuple | None] = None  # Como em Assign
+
+    def __post_init__(self, resolved):
+        self.resolved = resolved
 
 @dataclass
 class FunctionCall(AstNode):
@@ -0,0 +1,122 @@
+# Arquivo: benchmarks/bench_ast_memory.py
+# Compara as formas de AST que o Parser sabe construir (dataclasses de ast_nodes, nós com
+# __slots__ e arena de arrays) em memória retida, tempo de parse e tempo de travessia.
+#
+# Uso: python benchmarks/bench_ast_memory.py [funcoes] [operandos]
+import gc
+import os
+import sys
+import time
+import tracemalloc
+from dataclasses import fields
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from lexer import Lexer
+from parser import Parser
+from compact_ast import BIN_OP, SLOTTED_NODES, AstArena
+from bench_expressions import long_chains
+import ast_nodes
+
+
+def walk_objects(roots) -> tuple[int, int]:
+    # Travessia iterativa de uma árvore de objetos: (nós, BinOps)
+    child_fields = {}
+    total = binops = 0
+    stack = list(roots)
+    while stack:
+        node = stack.pop()
+        total += 1
+        cls = node.__class__
+        if cls.__name__ == 'BinOp':
+            binops += 1
+        names = child_fields.get(cls)
+        if names is None:
+            names = child_fields[cls] = [f.name for f in fields(cls)]
+        for name in names:
+            value = getattr(node, name)
+            if isinstance(value, list):
+                stack.extend(item for item in value if not isinstance(item, str))
+            elif value is not None and not isinstance(value, (str, int, float)):
+                stack.append(value)
+    return total, binops
+
+
+def walk_arena(arena: AstArena, roots) -> tuple[int, int]:
+    kinds = arena.kinds
+    total = binops = 0
+    for root in roots:
+        for node in arena.walk(root):
+            total += 1
+            if kinds[node] == BIN_OP:
+                binops += 1
+    return total, binops
+
+
+def measure(tokens, make_nodes):
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    nodes = make_nodes()
+    start = time.perf_counter()
+    errors, _, asts = Parser(tokens, nodes=nodes).parse_program()
+    elapsed = time.perf_counter() - start
+    retained = tracemalloc.get_traced_memory()[0] - before
+    tracemalloc.stop()
+    assert not errors, errors[0]
+    return nodes, asts, retained, elapsed
+
+
+def main():
+    functions = int(sys.argv[1]) if len(sys.argv) > 1 else 300
+    operands = int(sys.argv[2]) if len(sys.argv) > 2 else 200
+
+    tokens, _ = Lexer(long_chains(functions, operands), engine='table').scan_tokens()
+    print(f"{functions} funções com {operands} operandos ({len(tokens)} tokens)")
+
+    reference = None
+    for label, make_nodes in (('dataclass', lambda: ast_nodes), ('__slots__', lambda: SLOTTED_NODES),
+                              ('arena', AstArena)):
+        # Parse fora do tracemalloc para o tempo não incluir o custo do rastreamento (melhor de 3)
+        parse_time = float('inf')
+        for _ in range(3):
+            gc.collect()
+            start = time.perf_counter()
+            nodes = make_nodes()
+            _, _, asts = Parser(tokens, nodes=nodes).parse_program()
+            parse_time = min(parse_time, time.perf_counter() - start)
+        _, _, retained, _ = measure(tokens, make_nodes)
+
+        start = time.perf_counter()
+        if isinstance(nodes, AstArena):
+            counts = walk_arena(nodes, asts.values())
+        else:
+            counts = walk_objects(asts.values())
+        walk_time = time.perf_counter() - start
+
+        if reference is None:
+            reference = counts
+        assert counts == reference, (counts, reference)
+        print(f"  {label:<10} memória {retained / 1e6:7.2f} MB ({retained / counts[0]:6.1f} bytes/nó) | "
+              f"parse {parse_time:.3f}s | travessia {walk_time:.3f}s")
+
+        if isinstance(nodes, AstArena):
+            start = time.perf_counter()
+            binops = nodes.kinds.count(BIN_OP)
+            print(f"  {'':<10} contagem de BinOp por varredura linear do array: {time.perf_counter() - start:.4f}s")
+            assert binops == reference[1]
+            # A arena reconstrói exatamente as mesmas árvores
+            assert all(nodes.to_node(node) == ref for node, ref in
+                       zip(asts.values(), Parser(tokens).parse_program()[2].values()))
+
+    print(f"{reference[0]} nós, {reference[1]} BinOps")
+
+    # Endereços resolvidos que não cabem em 16 bits (mais de 65535 variáveis, escopos muito fundos)
+    arena = AstArena()
+    for address in ((0, 0), (1, 65_536), (70_000, 3), (2 ** 31, 2 ** 32 - 1)):
+        assert arena.resolved(arena.Assign('x', arena.VarAccess('x', resolved=address), resolved=address)) == address
+        assert arena.resolved(arena.child_ids(len(arena) - 1)[0]) == address
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,75 @@
+# Arquivo: benchmarks/bench_batch.py
+# Compara compilar um diretório com um processo do main.py por arquivo (como o CI fazia) e com o modo
+# batch (1 e N processos), e confere que as saídas são as mesmas em todos os casos.
+#
+# Uso: python benchmarks/bench_batch.py [arquivos] [processos]
+import filecmp
+import glob
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+MAIN = os.path.join(ROOT, 'main.py')
+
+
+def make_sources(directory: str, count: int):
+    # Replica as entradas do repositório com nomes distintos
+    samples = sorted(glob.glob(os.path.join(ROOT, 'entradas', '*.p')))
+    for i in range(count):
+        sample = samples[i % len(samples)]
+        name = f"{os.path.splitext(os.path.basename(sample))[0]}_{i:05d}.p"
+        shutil.copy(sample, os.path.join(directory, name))
+
+
+def run(label: str, commands: list[list[str]], cwd: str) -> float:
+    os.makedirs(cwd)
+    start = time.perf_counter()
+    for command in commands:
+        subprocess.run(command, cwd=cwd, stdout=subprocess.DEVNULL, check=False)
+    elapsed = time.perf_counter() - start
+    print(f"  {label:<28} {elapsed:7.2f}s")
+    return elapsed
+
+
+def same_outputs(a: str, b: str) -> bool:
+    for sub in ('saidas', 'erros'):
+        left, right = os.path.join(a, sub), os.path.join(b, sub)
+        names = sorted(os.listdir(left))
+        if names != sorted(os.listdir(right)):
+            return False
+        _, mismatch, errors = filecmp.cmpfiles(left, right, names, shallow=False)
+        if mismatch or errors:
+            return False
+    return True
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+    workers = int(sys.argv[2]) if len(sys.argv) > 2 else os.cpu_count()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        sources = os.path.join(tmp, 'fontes')
+        os.makedirs(sources)
+        make_sources(sources, count)
+        files = sorted(glob.glob(os.path.join(sources, '*.p')))
+        print(f"{count} arquivos")
+
+        single = run("um processo por arquivo", [[sys.executable, MAIN, f] for f in files],
+                     os.path.join(tmp, 'single'))
+        batch1 = run("batch, 1 processo", [[sys.executable, MAIN, sources, '--workers', '1']],
+                     os.path.join(tmp, 'batch1'))
+        batchn = run(f"batch, {workers} processos", [[sys.executable, MAIN, sources, '--workers', str(workers)]],
+                     os.path.join(tmp, 'batchn'))
+        print(f"  ganho: {single / batch1:.1f}x (1 processo), {single / batchn:.1f}x ({workers} processos)")
+
+        assert same_outputs(os.path.join(tmp, 'single'), os.path.join(tmp, 'batch1'))
+        assert same_outputs(os.path.join(tmp, 'single'), os.path.join(tmp, 'batchn'))
+        print("  saídas idênticas nos três modos")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,71 @@
+# Arquivo: benchmarks/bench_cache.py
+# Compara compilar sem cache, com cache vazio (falta + gravação) e com cache quente (acerto),
+# conferindo que as saídas restauradas do cache são iguais às da compilação completa.
+#
+# Uso: python benchmarks/bench_cache.py [funcoes] [operandos] [formato]
+import filecmp
+import os
+import shutil
+import sys
+import tempfile
+import time
+from types import SimpleNamespace
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from compile_cache import CompileCache
+from bench_expressions import long_chains
+import main as compiler
+
+
+def options(output_format: str) -> SimpleNamespace:
+    return SimpleNamespace(mmap=False, stream=False, lexer='regex', lex_workers=None, parser='rd',
+                           parse_workers=None, ast='dataclass', output_format=output_format, max_errors=None,
+                           optimize=False, run=False)
+
+
+def outputs(directory: str) -> dict[str, bytes]:
+    files = {}
+    for sub in (compiler.SAIDAS_DIR, compiler.ERROS_DIR):
+        for name in sorted(os.listdir(sub)):
+            with open(os.path.join(sub, name), 'rb') as f:
+                files[os.path.join(sub, name)] = f.read()
+    return files
+
+
+def main():
+    functions = int(sys.argv[1]) if len(sys.argv) > 1 else 300
+    operands = int(sys.argv[2]) if len(sys.argv) > 2 else 100
+    output_format = sys.argv[3] if len(sys.argv) > 3 else 'json'
+
+    with tempfile.TemporaryDirectory() as tmp:
+        os.chdir(tmp)
+        source = os.path.join(tmp, 'programa.p')
+        with open(source, 'w', encoding='utf-8') as f:
+            f.write(long_chains(functions, operands))
+        print(f"{functions} funções com {operands} operandos, saída '{output_format}'")
+
+        cache = CompileCache(os.path.join(tmp, 'cache'))
+        opts = options(output_format)
+        rows = (('sem cache', None), ('cache vazio (falta)', cache), ('cache quente (acerto)', cache))
+        reference = None
+        for label, used in rows:
+            shutil.rmtree(compiler.SAIDAS_DIR, ignore_errors=True)
+            shutil.rmtree(compiler.ERROS_DIR, ignore_errors=True)
+            start = time.perf_counter()
+            result = compiler.compile_file(source, opts, compiler.quiet, used)
+            elapsed = time.perf_counter() - start
+            files = outputs(tmp)
+            if reference is None:
+                reference = files
+            assert files == reference, label
+            print(f"  {label:<22} {elapsed:.3f}s{' (restaurado)' if result.cached else ''}")
+
+        stats = cache.stats()
+        print(f"  acertos {stats['hits']}, faltas {stats['misses']}, entrada de {stats['size'] / 2 ** 20:.2f} MB")
+        os.chdir(ROOT)
+
+
+if __name__ == "__main__":
+    main()
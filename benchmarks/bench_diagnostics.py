@@ -0,0 +1,69 @@
+# Arquivo: benchmarks/bench_diagnostics.py
+# Mede léxico e sintático sobre entrada quebrada: caracteres inválidos espalhados no complexo.p
+# (erros léxicos) e funções com comandos inválidos (erros sintáticos), com e sem --max-errors.
+#
+# Uso: python benchmarks/bench_diagnostics.py [copias] [max_erros]
+import os
+import random
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from lexer import Lexer
+from parser import Parser
+from ll1_parser import LL1Parser
+
+
+def lexical_garbage(copies: int) -> str:
+    with open(os.path.join(ROOT, 'entradas', 'complexo.p'), 'r', encoding='utf-8') as f:
+        chars = list((f.read() + '\n') * copies)
+    rng = random.Random(0)
+    for _ in range(len(chars) // 20):
+        pos = rng.randrange(len(chars))
+        chars[pos:pos] = rng.choice(['$', '@@', '#', '&', '[]', '?'])
+    return ''.join(chars)
+
+
+def syntactic_garbage(functions: int) -> str:
+    parts = []
+    for i in range(functions):
+        parts.append(f"fn f{i}(a: int) -> int {{\n    let b: int;\n    b = a + ;\n    c = 1;\n"
+                     f"    b = (a * 2;\n    return b;\n}}\n")
+    return ''.join(parts)
+
+
+def timed(build):
+    start = time.perf_counter()
+    errors = build()
+    return time.perf_counter() - start, errors
+
+
+def report(label: str, elapsed: float, errors):
+    size = sum(len(str(e)) + 1 for e in errors)
+    print(f"  {label:<28} {elapsed:.3f}s  {errors.error_count():>7} erros  {size / 1e3:>9.1f} KB de log")
+
+
+def main():
+    copies = int(sys.argv[1]) if len(sys.argv) > 1 else 500
+    max_errors = int(sys.argv[2]) if len(sys.argv) > 2 else 100
+
+    source = lexical_garbage(copies)
+    print(f"Erros léxicos: complexo.p x {copies} com caracteres inválidos ({len(source) / 1e6:.1f} MB)")
+    for engine in Lexer.ENGINES:
+        for cap in (None, max_errors):
+            elapsed, errors = timed(lambda: Lexer(source, engine=engine, max_errors=cap).scan_tokens()[1])
+            report(f"{engine}, limite {cap or '-'}", elapsed, errors)
+
+    source = syntactic_garbage(copies * 10)
+    tokens, _ = Lexer(source, engine='table').scan_tokens()
+    print(f"Erros sintáticos: {copies * 10} funções com comandos inválidos ({len(tokens)} tokens)")
+    for name, parser_cls in (('rd', Parser), ('ll1', LL1Parser)):
+        for cap in (None, max_errors):
+            elapsed, errors = timed(lambda: parser_cls(tokens, cap).parse_program()[0])
+            report(f"{name}, limite {cap or '-'}", elapsed, errors)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,126 @@
+# Arquivo: benchmarks/bench_expressions.py
+# Mede o parse de expressões longas e profundamente aninhadas com o Parser (precedence climbing
+# iterativo), comparando com a cascata recursiva parse_rel -> parse_adicao -> parse_termo -> parse_fator.
+#
+# Uso: python benchmarks/bench_expressions.py [funcoes] [operandos] [profundidade]
+import os
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from lexer import Lexer, TokenType
+from parser import Parser
+import ast_nodes as ast
+
+
+class RecursiveExprParser(Parser):
+    # Referência: uma chamada Python por nível de precedência e por operando
+    def parse_expr(self):
+        return self.parse_rel()
+
+    def parse_rel(self):
+        node = self.parse_adicao()
+        while self.peek().token_type in [TokenType.LT, TokenType.LE, TokenType.GT, TokenType.GE, TokenType.EQ,
+                                         TokenType.NE]:
+            op = self.advance().lexeme
+            node = ast.BinOp(left=node, op=op, right=self.parse_adicao())
+        return node
+
+    def parse_adicao(self):
+        node = self.parse_termo()
+        while self.peek().token_type in [TokenType.PLUS, TokenType.MINUS]:
+            op = self.advance().lexeme
+            node = ast.BinOp(left=node, op=op, right=self.parse_termo())
+        return node
+
+    def parse_termo(self):
+        node = self.parse_fator()
+        while self.peek().token_type in [TokenType.MULT, TokenType.DIV]:
+            op = self.advance().lexeme
+            node = ast.BinOp(left=node, op=op, right=self.parse_fator())
+        return node
+
+    def parse_fator(self):
+        tok = self.peek()
+        if tok.token_type == TokenType.ID:
+            self.advance()
+            if not self.symbol_table.lookup(tok.lexeme):
+                raise Exception(f"Identificador '{tok.lexeme}' não declarado.")
+            if self.match(TokenType.LBRACKET):
+                args = self.parse_lista_args()
+                self.consume(TokenType.RBRACKET, "Esperado ')'")
+                return ast.FunctionCall(name=tok.lexeme, args=args)
+            return ast.VarAccess(name=tok.lexeme)
+        elif tok.token_type == TokenType.INT_CONST:
+            self.advance()
+            return ast.Literal(value=int(tok.lexeme), type='int')
+        elif tok.token_type == TokenType.FLOAT_CONST:
+            self.advance()
+            return ast.Literal(value=float(tok.lexeme), type='float')
+        elif self.match(TokenType.LBRACKET):
+            expr = self.parse_expr()
+            self.consume(TokenType.RBRACKET, "Esperado ')'")
+            return expr
+        raise Exception(f"Fator inesperado '{tok.lexeme}'")
+
+
+def long_chains(functions: int, operands: int) -> str:
+    ops = ['+', '-', '*', '/', '<', '+', '*']
+    parts = []
+    for f in range(functions):
+        terms = []
+        for i in range(operands):
+            term = ('a', 'b', 'c', '2', '3.5', 'g(a, b)')[i % 6]
+            terms.append(term if i == 0 else f"{ops[i % len(ops)]} {term}")
+        parts.append(f"fn f{f}(a: int, b: int) -> int {{\n    let c: int;\n"
+                     f"    c = {' '.join(terms)};\n    return c;\n}}\n")
+    return "fn g(x: int, y: int) -> int { return x; }\n" + ''.join(parts)
+
+
+def deep_nesting(depth: int) -> str:
+    return f"fn main() {{\n    let a: int;\n    a = {'(' * depth}a + 1{')' * depth};\n}}\n"
+
+
+def run(parser_cls, tokens, rounds: int = 3):
+    best = float('inf')
+    result = None
+    for _ in range(rounds):
+        parser = parser_cls(tokens)
+        start = time.perf_counter()
+        result = parser.parse_program()
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def main():
+    functions = int(sys.argv[1]) if len(sys.argv) > 1 else 300
+    operands = int(sys.argv[2]) if len(sys.argv) > 2 else 200
+    depth = int(sys.argv[3]) if len(sys.argv) > 3 else 5000
+
+    for label, source in [(f"{functions} funções com {operands} operandos", long_chains(functions, operands)),
+                          (f"parênteses aninhados em profundidade {depth}", deep_nesting(depth))]:
+        tokens, _ = Lexer(source, engine='table').scan_tokens()
+        print(f"{label} ({len(tokens)} tokens)")
+
+        new_time, new_result = run(Parser, tokens)
+        old_time, old_result = run(RecursiveExprParser, tokens)
+
+        print(f"  precedence climbing: {new_time:.3f}s ({len(tokens) / new_time:,.0f} tokens/s)")
+        if new_result[0]:
+            print(f"ERRO: {new_result[0][0]}")
+            sys.exit(1)
+        if old_result[0]:
+            # parse_program captura o RecursionError como erro da função
+            print(f"  cascata recursiva:   falhou ({old_result[0][0]})")
+            continue
+        print(f"  cascata recursiva:   {old_time:.3f}s ({len(tokens) / old_time:,.0f} tokens/s)")
+        if repr(new_result) != repr(old_result):
+            print("ERRO: as ASTs produzidas são diferentes.")
+            sys.exit(1)
+        print(f"  ganho: {old_time / new_time:.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,67 @@
+# Arquivo: benchmarks/bench_incremental.py
+# Latência de edições típicas num arquivo com muitas funções: IncrementalCompiler.edit contra
+# léxico + parser completos do texto novo, conferindo a cada edição que o resultado é o mesmo.
+#
+# Uso: python benchmarks/bench_incremental.py [funcoes] [operandos]
+import os
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from incremental import IncrementalCompiler
+from bench_expressions import long_chains
+
+
+def edits(functions: int) -> list:
+    # (descrição, função que localiza a edição no texto corrente e devolve (início, fim, texto))
+    name = f"fn f{functions // 2}("
+
+    def at(anchor: str, length: int, text: str, offset: int = 0):
+        def locate(source: str):
+            start = source.index(anchor, source.index(name)) + offset
+            return start, start + length, text
+        return locate
+
+    return [
+        ("troca uma constante", at('3.5', 3, '4.5')),
+        ("insere um comando (+1 linha)", at('return c;', 0, 'c = c + 1;\n    ')),
+        ("quebra uma função (erro)", at('return c;', 9, 'return c')),
+        ("conserta a função", at('return c\n', 8, 'return c;')),
+        ("nova função no fim", lambda source: (len(source), len(source), 'fn extra(a: int) -> int { return a; }\n')),
+        ("renomeia a primeira função", lambda source: (source.index('fn g(') + 3, source.index('fn g(') + 4, 'h')),
+    ]
+
+
+def main():
+    functions = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    operands = int(sys.argv[2]) if len(sys.argv) > 2 else 30
+
+    source = long_chains(functions, operands)
+    start = time.perf_counter()
+    compiler = IncrementalCompiler(source)
+    print(f"{functions} funções com {operands} operandos ({len(compiler.tokens)} tokens): "
+          f"compilação inicial {time.perf_counter() - start:.3f}s")
+
+    for label, locate in edits(functions):
+        edit_start, edit_end, text = locate(compiler.source)
+        start = time.perf_counter()
+        compiler.edit(edit_start, edit_end, text)
+        incremental = time.perf_counter() - start
+
+        start = time.perf_counter()
+        full = IncrementalCompiler(compiler.source)
+        rebuild = time.perf_counter() - start
+
+        assert compiler.outputs() == full.outputs(), label
+        info = compiler.last_edit
+        detail = ("recompilação completa" if info['full_rebuild'] else
+                  f"{info['relexed_tokens']} tokens relexados, {info['reparsed_functions']} funções "
+                  f"reanalisadas, {info['reused_functions']} reaproveitadas")
+        print(f"  {label:<30} {incremental * 1000:8.1f} ms vs {rebuild * 1000:8.1f} ms completa "
+              f"({rebuild / incremental:6.1f}x) | {detail}")
+
+
+if __name__ == "__main__":
+    main()
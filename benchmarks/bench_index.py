@@ -0,0 +1,74 @@
+# Arquivo: benchmarks/bench_index.py
+# Índice de símbolos em SQLite sobre muitos arquivos: indexação inicial, reindexação sem mudanças,
+# reindexação depois de alterar alguns arquivos e a latência das consultas.
+#
+# Uso: python benchmarks/bench_index.py [arquivos] [processos]
+import glob
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from symbol_index import SymbolIndex
+
+
+def make_sources(directory: str, count: int) -> list[str]:
+    # Replica as entradas do repositório com nomes distintos
+    samples = sorted(glob.glob(os.path.join(ROOT, 'entradas', '*.p')))
+    paths = []
+    for i in range(count):
+        sample = samples[i % len(samples)]
+        path = os.path.join(directory, f"{os.path.splitext(os.path.basename(sample))[0]}_{i:05d}.p")
+        shutil.copy(sample, path)
+        paths.append(path)
+    return paths
+
+
+def timed(label: str, action):
+    start = time.perf_counter()
+    value = action()
+    print(f"  {label:<34} {(time.perf_counter() - start) * 1000:10.2f} ms")
+    return value
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 5000
+    workers = int(sys.argv[2]) if len(sys.argv) > 2 else os.cpu_count()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        sources = os.path.join(tmp, 'fontes')
+        os.makedirs(sources)
+        paths = make_sources(sources, count)
+        index = SymbolIndex(os.path.join(tmp, 'simbolos.db'))
+        print(f"{count} arquivos, {workers} processos")
+
+        report = timed("indexação inicial", lambda: index.update(paths, workers))
+        assert report['indexed'] == count and not report['failed'], report
+        report = timed("reindexação sem mudanças", lambda: index.update(paths, workers))
+        assert report['indexed'] == 0, report
+
+        changed = paths[::max(1, count // 10)]
+        for path in changed:
+            with open(path, 'a', encoding='utf-8') as f:
+                f.write("\nfn extra_bench(x: float) -> float { return x; }\n")
+        report = timed(f"reindexação com {len(changed)} alterados", lambda: index.update(paths, workers))
+        assert report['indexed'] == len(changed), report
+        stats = index.stats()
+        print(f"  ({stats['files']} arquivos, {stats['symbols']} símbolos, {stats['calls']} chamadas)")
+
+        queries = (("declaração de fatorial", lambda: index.declarations('fatorial')),
+                   ("variáveis float", lambda: index.by_type('float', 'variable')),
+                   ("chamadas de fatorial", lambda: index.call_sites('fatorial')),
+                   ("declaração de extra_bench", lambda: index.declarations('extra_bench')))
+        for label, query in queries:
+            rows = timed(label, query)
+            print(f"    {len(rows)} resultados")
+        index.close()
+
+
+if __name__ == "__main__":
+    main()
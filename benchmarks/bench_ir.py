@@ -0,0 +1,160 @@
+# Arquivo: benchmarks/bench_ir.py
+# Mede os passes da IR em SSA (ir.py, ir_passes.py) nos programas do generator.py: tempo de cada passe
+# e instruções da IR antes e depois, e o tamanho do bytecode gerado pela IR (ir_bytecode.py) contra o
+# do bytecode.py direto. Compara também o tempo da VM com os dois bytecodes num programa com
+# expressões invariantes nos laços e subexpressões repetidas, e confere que a VM imprime a mesma saída
+# com os dois (programas gerados e de entradas/, com e sem o otimizador de ASTs, com e sem os passes).
+# Por fim, confere que programas que o front end aceita mas os backends do --run recusam (comparar char
+# com número, guardar ou passar char onde se espera número, usar o valor de uma função sem retorno,
+# usar uma função como variável ou chamar uma variável) dão o mesmo erro na VM, na IR e no backend
+# python.
+#
+# Uso: python benchmarks/bench_ir.py [n] [rodadas]
+import glob
+import io
+import os
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from bytecode import BytecodeError, compile_program
+from vm import VM
+from ir import IrError, build_program
+from ir_passes import DEFAULT_PIPELINE, PassManager, format_report
+from ir_bytecode import compile_ir_program
+from transpiler import TranspileError
+from generator import PRESETS, generate, preset
+from bench_vm import best_of, front_end, run_python, run_vm
+
+REDUNDANT = """
+fn grade(n: int, escala: int) -> int {
+    let i, j, total: int;
+    total = 0;
+    i = 0;
+    while i < n {
+        j = 0;
+        while j < n {
+            total = total + (i * escala + j) * (escala * escala + 1) + (i * escala + j) / 7;
+            j = j + 1;
+        }
+        i = i + 1;
+    }
+    return total;
+}
+
+fn polinomio(n: int, x: float) -> float {
+    let i: int;
+    let acc: float;
+    acc = 0.0;
+    i = 0;
+    while i < n * n {
+        acc = acc + (x * x + x * 2.0) - (x * x + x * 2.0) / 3.0;
+        i = i + 1;
+    }
+    return acc;
+}
+
+fn main() {
+    println("{} {}", grade(N, 3), polinomio(N, 1.5));
+}
+"""
+
+# (corpo da main, ao lado de PRELUDE, erro esperado); no bytecode, as comparações viram saltos
+# fundidos (_LL, _LC) ou não
+PRELUDE = "fn f(a: int) -> int { return a + a; } fn g() { println(\"g\"); }"
+REJECTED = (
+    ("let c: char; c = 'A'; if c < 1 { println(\"sim\"); }", "Comparação entre char e int"),
+    ("let c: char; while c != 1.5 { c = 'B'; }", "Comparação entre char e float"),
+    ("let c: char; let i: int; if i == c { println(\"sim\"); }", "Comparação entre int e char"),
+    ("let c: char; if 1 >= c { println(\"sim\"); }", "Comparação entre int e char"),
+    ("let c: char; let i: int; i = c < 1; println(\"{}\", i);", "Comparação entre char e int"),
+    ("f = 3;", "'f' não é uma variável"),
+    ("let x: int; x = f;", "'f' não é uma variável"),
+    ("let x: int; if x < f { x = 1; }", "'f' não é uma variável"),
+    ("let x: int; x(1);", "'x' não é uma função"),
+    ("let x: int; x = x(1) + 1;", "'x' não é uma função"),
+    ("let x: int; x = 'a'; x = x + 1;", "Conversão de char para int"),
+    ("println(\"{}\", f('b'));", "Conversão de char para int"),
+    ("let c: char; c = 1.5;", "Conversão de float para char"),
+    ("let x: int; x = g();", "Função sem retorno usada como valor"),
+    ("println(\"{}\", g());", "Função sem retorno usada como valor"),
+    ("if g() == 1 { println(\"sim\"); }", "Função sem retorno usada como valor"),
+    ("while g() { println(\"sim\"); }", "Função sem retorno usada como valor"),
+)
+
+
+def ir_bytecode(tables: dict, asts: dict, pipeline: tuple = DEFAULT_PIPELINE):
+    program = build_program(asts, tables)
+    reports = PassManager(pipeline).run(program)
+    return compile_ir_program(program), reports
+
+
+def run_ir(tables: dict, asts: dict, pipeline: tuple = DEFAULT_PIPELINE) -> str:
+    out = io.StringIO()
+    VM(ir_bytecode(tables, asts, pipeline)[0], out).run()
+    return out.getvalue()
+
+
+def backend_error(run, tables: dict, asts: dict) -> str:
+    try:
+        run(tables, asts)
+    except (BytecodeError, TranspileError, IrError) as error:
+        return str(error)
+    return ''
+
+
+def code_size(program) -> int:
+    return sum(len(function.code) for function in program.functions)
+
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 150
+    rounds = int(sys.argv[2]) if len(sys.argv) > 2 else 3
+
+    sys.setrecursionlimit(100_000)
+    print(f"N = {n}, melhor de {rounds} rodadas")
+    for name in PRESETS:
+        tables, asts = front_end(generate(preset(name, 0.25)))
+        before = build_program(asts, tables).instruction_count()
+        program, reports = ir_bytecode(tables, asts)
+        print(f"  {name} (escala 0.25): bytecode direto {code_size(compile_program(asts, tables))} inteiros, "
+              f"pela IR {code_size(program)}")
+        print('    ' + format_report(reports, before).replace('\n', '\n    '))
+
+    tables, asts = front_end(REDUNDANT.replace('N', str(n)))
+    direct = compile_program(asts, tables)
+    from_ir, _ = ir_bytecode(tables, asts)
+    direct_time, _ = best_of(rounds, lambda: VM(direct, io.StringIO()).run())
+    ir_time, _ = best_of(rounds, lambda: VM(from_ir, io.StringIO()).run())
+    print(f"  laços redundantes: VM direto {direct_time:.3f}s | VM pela IR {ir_time:.3f}s "
+          f"({direct_time / ir_time:.2f}x)")
+    assert run_vm(tables, asts) == run_ir(tables, asts)
+
+    # Mesma saída com os dois bytecodes, com e sem otimizador de ASTs e com e sem os passes
+    sources = [generate(preset(name, 0.05)) for name in PRESETS]
+    for path in sorted(glob.glob(os.path.join(ROOT, 'entradas', '*.p'))):
+        with open(path, encoding='utf-8') as source_file:
+            sources.append(source_file.read())
+    checked = 0
+    for source in sources:
+        for optimize in (False, True):
+            try:
+                tables, asts = front_end(source, optimize)
+            except AssertionError:
+                continue  # Programas de entradas/ com erros de propósito
+            reference = run_vm(tables, asts)
+            for pipeline in ((), DEFAULT_PIPELINE):
+                assert run_ir(*front_end(source, optimize), pipeline) == reference
+            checked += 1
+    print(f"  saídas idênticas em {checked} execuções (programas gerados e de entradas/)")
+
+    for body, message in REJECTED:
+        tables, asts = front_end(f"{PRELUDE} fn main() {{ {body} }}")
+        for run in (run_vm, run_ir, run_python):
+            assert backend_error(run, tables, asts) == message, (body, run.__name__)
+    print(f"  mesmo erro nos três backends em {len(REJECTED)} programas recusados")
+
+
+if __name__ == "__main__":
+    main()
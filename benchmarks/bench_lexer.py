@@ -0,0 +1,52 @@
+# Arquivo: benchmarks/bench_lexer.py
+# Compara a vazão (tokens/s) dos engines léxicos 'regex' e 'table' sobre o complexo.p replicado.
+#
+# Uso: python benchmarks/bench_lexer.py [repeticoes] [rodadas]
+import os
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from lexer import Lexer
+
+
+def load_scaled_source(repeat: int) -> str:
+    with open(os.path.join(ROOT, 'entradas', 'complexo.p'), 'r', encoding='utf-8') as f:
+        source = f.read()
+    return (source + '\n') * repeat
+
+
+def bench(source: str, engine: str, rounds: int) -> tuple[float, list]:
+    best = float('inf')
+    tokens = []
+    for _ in range(rounds):
+        start = time.perf_counter()
+        tokens, _ = Lexer(source, engine=engine).scan_tokens()
+        best = min(best, time.perf_counter() - start)
+    return best, tokens
+
+
+def main():
+    repeat = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    rounds = int(sys.argv[2]) if len(sys.argv) > 2 else 3
+
+    source = load_scaled_source(repeat)
+    print(f"Fonte: complexo.p x {repeat} ({len(source) / 1e6:.1f} MB), melhor de {rounds} rodadas")
+
+    results = {}
+    for engine in Lexer.ENGINES:
+        elapsed, tokens = bench(source, engine, rounds)
+        results[engine] = (elapsed, tokens)
+        print(f"  {engine:>6}: {len(tokens)} tokens em {elapsed:.3f}s -> {len(tokens) / elapsed:,.0f} tokens/s")
+
+    if results['regex'][1] != results['table'][1]:
+        print("ERRO: os engines produziram listas de tokens diferentes.")
+        sys.exit(1)
+
+    print(f"Ganho do engine 'table': {results['regex'][0] / results['table'][0]:.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,70 @@
+# Arquivo: benchmarks/bench_ll1.py
+# Compara o Parser descendente recursivo com o LL1Parser (gramática como dados, tabela LL(1) e
+# pilha explícita) sobre cópias renomeadas do complexo.p, conferindo que as saídas são iguais.
+#
+# Uso: python benchmarks/bench_ll1.py [copias] [rodadas]
+import os
+import re
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from lexer import Lexer
+from parser import Parser
+from ll1_parser import GRAMMAR, LL1Parser, build_table, load_table
+
+
+def load_scaled_source(copies: int) -> str:
+    with open(os.path.join(ROOT, 'entradas', 'complexo.p'), 'r', encoding='utf-8') as f:
+        source = f.read()
+    # Funções renomeadas a cada cópia para o programa continuar válido
+    names = re.compile(r'\b(fatorial|area_circulo|main)\b')
+    return '\n'.join(names.sub(lambda m: f"{m.group(1)}_{i}", source) for i in range(copies))
+
+
+def run(parser_cls, tokens, rounds: int):
+    best = float('inf')
+    result = None
+    for _ in range(rounds):
+        parser = parser_cls(tokens)
+        start = time.perf_counter()
+        result = parser.parse_program()
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def main():
+    copies = int(sys.argv[1]) if len(sys.argv) > 1 else 1000
+    rounds = int(sys.argv[2]) if len(sys.argv) > 2 else 3
+
+    start = time.perf_counter()
+    build_table(GRAMMAR)
+    build_time = time.perf_counter() - start
+    start = time.perf_counter()
+    load_table()
+    load_time = time.perf_counter() - start
+    print(f"Tabela LL(1): construção {build_time * 1000:.1f} ms, carga do cache {load_time * 1000:.1f} ms")
+
+    source = load_scaled_source(copies)
+    tokens, _ = Lexer(source, engine='table').scan_tokens()
+    print(f"Fonte: complexo.p x {copies} ({len(tokens)} tokens), melhor de {rounds} rodadas")
+
+    rd_time, rd_result = run(Parser, tokens, rounds)
+    ll1_time, ll1_result = run(LL1Parser, tokens, rounds)
+
+    print(f"  descendente recursivo: {rd_time:.3f}s ({len(tokens) / rd_time:,.0f} tokens/s)")
+    print(f"  LL(1) por tabela:      {ll1_time:.3f}s ({len(tokens) / ll1_time:,.0f} tokens/s)")
+
+    if rd_result[0] or ll1_result[0]:
+        print(f"ERRO: {(rd_result[0] or ll1_result[0])[0]}")
+        sys.exit(1)
+    if repr(rd_result) != repr(ll1_result):
+        print("ERRO: as tabelas de símbolos/ASTs produzidas são diferentes.")
+        sys.exit(1)
+    print(f"Saídas idênticas. Razão LL(1)/recursivo: {ll1_time / rd_time:.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,128 @@
+# Arquivo: benchmarks/bench_memo.py
+# Mede a memoização das funções puras (purity.py) e as chamadas de cauda transformadas em laço, nos
+# backends do --run: a VM com o bytecode direto e com o da IR, e o backend python. Roda um programa
+# com recursão que repete subproblemas (fib, caminhos numa grade) chamado de dentro de um laço, com e
+# sem memoização, mostrando acertos e faltas; uma recursão de cauda bem mais funda que o limite de
+# chamadas; e confere que a saída com memoização (e uma tabela pequena, para forçar descartes) é a
+# mesma nos programas gerados e nos de entradas/.
+#
+# Uso: python benchmarks/bench_memo.py [n] [rodadas]
+import glob
+import io
+import os
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from bytecode import compile_program
+from vm import DEFAULT_MAX_DEPTH, DEFAULT_MEMO_SIZE, VM, format_memo_stats
+from transpiler import PythonProgram, compile_python
+from generator import PRESETS, generate, preset
+from bench_vm import best_of, front_end, run_vm
+from bench_ir import ir_bytecode
+
+RECURSIVE = """
+fn fib(n: int) -> int {
+    if n < 2 {
+        return n;
+    }
+    return fib(n - 1) + fib(n - 2);
+}
+
+fn caminhos(x: int, y: int) -> int {
+    if x == 0 {
+        return 1;
+    }
+    if y == 0 {
+        return 1;
+    }
+    return caminhos(x - 1, y) + caminhos(x, y - 1);
+}
+
+fn main() {
+    let i, total: int;
+    i = 0;
+    while i < N {
+        total = total + fib(i / 8 + 12) + caminhos(i / 16 + 4, 6);
+        i = i + 1;
+    }
+    println("{}", total);
+}
+"""
+
+TAIL = """
+fn soma(n: int, acc: int) -> int {
+    if n == 0 {
+        return acc;
+    }
+    return soma(n - 1, acc + n);
+}
+
+fn main() {
+    println("{}", soma(DEPTH, 0));
+}
+"""
+
+
+def engines(tables: dict, asts: dict) -> dict:
+    bytecode = compile_program(asts, tables)
+    from_ir, _ = ir_bytecode(tables, asts)
+    code = compile_python(asts, tables)
+    return {
+        'VM': lambda out, memo_size: VM(bytecode, out, memo_size=memo_size),
+        'VM pela IR': lambda out, memo_size: VM(from_ir, out, memo_size=memo_size),
+        'python': lambda out, memo_size: PythonProgram(code, out, memo_size=memo_size),
+    }
+
+
+def execute(make, memo_size: int):
+    out = io.StringIO()
+    program = make(out, memo_size)
+    program.run()
+    return out.getvalue(), program
+
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 64
+    rounds = int(sys.argv[2]) if len(sys.argv) > 2 else 3
+
+    print(f"N = {n}, melhor de {rounds} rodadas")
+    tables, asts = front_end(RECURSIVE.replace('N', str(n)))
+    for label, make in engines(tables, asts).items():
+        plain_time, (plain_out, _) = best_of(rounds, lambda: execute(make, 0))
+        memo_time, (memo_out, program) = best_of(rounds, lambda: execute(make, DEFAULT_MEMO_SIZE))
+        assert plain_out == memo_out, (plain_out, memo_out)
+        print(f"  {label:<11} sem memo {plain_time:.3f}s | com memo {memo_time:.4f}s "
+              f"({plain_time / memo_time:.0f}x) -> {memo_out.strip()}")
+    # Os acertos e faltas são os mesmos nos três (fib e caminhos não têm chamadas de cauda)
+    print('    ' + format_memo_stats(program.memo_stats()).replace('\n', '\n    '))
+
+    # Recursão de cauda 10x mais funda que o limite de chamadas: vira laço nos três
+    depth = DEFAULT_MAX_DEPTH * 10
+    tables, asts = front_end(TAIL.replace('DEPTH', str(depth)))
+    for label, make in engines(tables, asts).items():
+        elapsed, (output, _) = best_of(1, lambda: execute(make, 0))
+        assert output == f"{depth * (depth + 1) // 2}\n", output
+        print(f"  cauda com {depth} níveis, {label:<11} {elapsed:.3f}s")
+
+    # Mesma saída com memoização, com uma tabela de 4 resultados por função
+    sources = [generate(preset(name, 0.05)) for name in PRESETS]
+    for path in sorted(glob.glob(os.path.join(ROOT, 'entradas', '*.p'))):
+        with open(path, encoding='utf-8') as source_file:
+            sources.append(source_file.read())
+    checked = 0
+    for source in sources:
+        try:
+            tables, asts = front_end(source)
+        except AssertionError:
+            continue  # Programas de entradas/ com erros de propósito
+        reference = run_vm(tables, asts)
+        for make in engines(tables, asts).values():
+            assert execute(make, 4)[0] == reference
+        checked += 1
+    print(f"  saídas idênticas com memoização em {checked} programas (gerados e de entradas/)")
+
+
+if __name__ == "__main__":
+    main()
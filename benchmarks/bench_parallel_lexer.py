@@ -0,0 +1,72 @@
+# Arquivo: benchmarks/bench_parallel_lexer.py
+# Escalabilidade do ParallelLexer de 1 a N processos sobre o complexo.p replicado. Confere também
+# que, com max_errors, o resultado é o do Lexer sequencial quando o limite cai no meio de um bloco.
+#
+# Uso: python benchmarks/bench_parallel_lexer.py [repeticoes] [max_workers] [engine]
+import os
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from lexer import Lexer
+from parallel_lexer import ParallelLexer
+
+
+def load_scaled_source(repeat: int) -> str:
+    with open(os.path.join(ROOT, 'entradas', 'complexo.p'), 'r', encoding='utf-8') as f:
+        source = f.read()
+    return (source + '\n') * repeat
+
+
+def same_stream(a, b) -> bool:
+    return a.kinds == b.kinds and a.starts == b.starts and a.ends == b.ends
+
+
+def check_error_limit(engine: str):
+    # Dois erros por linha e blocos de ~10 linhas: os limites caem no meio, no fim e no começo de blocos
+    source = ''.join(f"fn f{i}() {{ let x: int; x = {i} $ @; }}\n" for i in range(100))
+    for max_errors in (1, 7, 10, 20, 21, 199, 200, 201):
+        expected, expected_errors = Lexer(source, engine=engine, max_errors=max_errors).scan_stream()
+        stream, errors = ParallelLexer(source, engine=engine, workers=2, chunk_size=400,
+                                       max_errors=max_errors).scan_stream()
+        if not same_stream(stream, expected) or errors != expected_errors:
+            print(f"ERRO: com max_errors={max_errors}, resultado difere do Lexer sequencial.")
+            sys.exit(1)
+    print("  max_errors no meio de um bloco: idêntico ao Lexer sequencial")
+
+
+def main():
+    repeat = int(sys.argv[1]) if len(sys.argv) > 1 else 10000
+    max_workers = int(sys.argv[2]) if len(sys.argv) > 2 else (os.cpu_count() or 1)
+    engine = sys.argv[3] if len(sys.argv) > 3 else 'table'
+
+    source = load_scaled_source(repeat)
+    print(f"Fonte: complexo.p x {repeat} ({len(source) / 1e6:.1f} MB), engine '{engine}'")
+
+    start = time.perf_counter()
+    expected, expected_errors = Lexer(source, engine=engine).scan_stream()
+    sequential = time.perf_counter() - start
+    print(f"  sequencial: {sequential:.3f}s ({len(expected) / sequential:,.0f} tokens/s)")
+
+    workers = 1
+    while workers <= max_workers:
+        lexer = ParallelLexer(source, engine=engine, workers=workers)
+        start = time.perf_counter()
+        stream, errors = lexer.scan_stream()
+        elapsed = time.perf_counter() - start
+
+        if not same_stream(stream, expected) or errors != expected_errors:
+            print(f"ERRO: resultado com {workers} processos difere do Lexer sequencial.")
+            sys.exit(1)
+
+        print(f"  {workers:>2} processos: {elapsed:.3f}s ({len(stream) / elapsed:,.0f} tokens/s, "
+              f"{sequential / elapsed:.2f}x, {lexer.rescanned_chunks} blocos refeitos)")
+        workers *= 2
+
+    check_error_limit(engine)
+
+
+if __name__ == "__main__":
+    main()
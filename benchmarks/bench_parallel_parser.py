@@ -0,0 +1,56 @@
+# Arquivo: benchmarks/bench_parallel_parser.py
+# Escalabilidade do ParallelParser de 2 a N processos sobre um arquivo com milhares de funções,
+# conferindo que tabelas, ASTs e erros são os mesmos do Parser sequencial.
+#
+# Uso: python benchmarks/bench_parallel_parser.py [funcoes] [operandos] [max_workers]
+import os
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from lexer import Lexer
+from parser import Parser
+from parallel_parser import ParallelParser
+from bench_expressions import long_chains
+import serializer
+
+
+def outputs(result) -> tuple:
+    errors, tables, asts = result
+    return [str(e) for e in errors], serializer.dumps(tables), serializer.dumps(asts)
+
+
+def main():
+    functions = int(sys.argv[1]) if len(sys.argv) > 1 else 5000
+    operands = int(sys.argv[2]) if len(sys.argv) > 2 else 30
+    max_workers = int(sys.argv[3]) if len(sys.argv) > 3 else max(2, os.cpu_count() or 1)
+
+    tokens, _ = Lexer(long_chains(functions, operands), engine='table').scan_stream()
+    print(f"{functions} funções com {operands} operandos ({len(tokens)} tokens)")
+
+    start = time.perf_counter()
+    result = Parser(tokens).parse_program()
+    sequential = time.perf_counter() - start
+    expected = outputs(result)
+    print(f"  sequencial: {sequential:.3f}s")
+
+    workers = 2
+    while workers <= max_workers:
+        parser = ParallelParser(tokens, workers=workers)
+        start = time.perf_counter()
+        result = parser.parse_program()
+        elapsed = time.perf_counter() - start
+
+        if outputs(result) != expected:
+            print(f"ERRO: resultado com {workers} processos difere do Parser sequencial.")
+            sys.exit(1)
+
+        print(f"  {workers:>2} processos: {elapsed:.3f}s ({sequential / elapsed:.2f}x, "
+              f"{parser.parallel_functions} funções em paralelo)")
+        workers *= 2
+
+
+if __name__ == "__main__":
+    main()
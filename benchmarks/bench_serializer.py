@@ -0,0 +1,92 @@
+# Arquivo: benchmarks/bench_serializer.py
+# Compara a escrita das saídas (*_ast.json e *_symbol_tables.json) do main.py antigo (asdict + json.dumps
+# com default=) com o serializer.py (JSON indentado, compacto e binário), confere que o texto indentado
+# é o mesmo do json.dumps e que os três formatos voltam às mesmas árvores, e mostra a fatia da
+# serialização no tempo total de compilação.
+#
+# Uso: python benchmarks/bench_serializer.py [funcoes] [operandos] [rodadas]
+import json
+import os
+import sys
+import time
+from dataclasses import asdict
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from lexer import Lexer
+from parser import Parser
+from symbol_table import TableEntry
+from bench_expressions import long_chains
+import serializer
+
+
+def old_json_serializer(obj):
+    # Versão anterior do main.py: copia cada nó com asdict e só marca o primeiro nível
+    if isinstance(obj, TableEntry):
+        return obj.__dict__
+    if hasattr(obj, '__dataclass_fields__'):
+        d = asdict(obj)
+        d['_node_type'] = obj.__class__.__name__
+        return d
+    raise TypeError(f"Objeto {type(obj)} não serializável")
+
+
+def best_of(rounds: int, func):
+    best = float('inf')
+    result = None
+    for _ in range(rounds):
+        start = time.perf_counter()
+        result = func()
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def main():
+    functions = int(sys.argv[1]) if len(sys.argv) > 1 else 300
+    operands = int(sys.argv[2]) if len(sys.argv) > 2 else 100
+    rounds = int(sys.argv[3]) if len(sys.argv) > 3 else 3
+
+    source = long_chains(functions, operands)
+
+    def compile_source():
+        tokens, _ = Lexer(source).scan_tokens()
+        return Parser(tokens).parse_program()
+
+    compile_time, (errors, tables, asts) = best_of(rounds, compile_source)
+    assert not errors, errors[0]
+    print(f"{functions} funções com {operands} operandos: léxico + sintático {compile_time:.3f}s")
+
+    def old_dump():
+        return (json.dumps(tables, default=old_json_serializer, indent=2, ensure_ascii=False),
+                json.dumps(asts, default=old_json_serializer, indent=2, ensure_ascii=False))
+
+    formats = (
+        ('asdict + json (antigo)', old_dump, None),
+        ('json', lambda: (serializer.dumps(tables), serializer.dumps(asts)), serializer.loads),
+        ('compact', lambda: (serializer.dumps(tables, None), serializer.dumps(asts, None)), serializer.loads),
+        ('binary', lambda: (serializer.dumps_binary(tables), serializer.dumps_binary(asts)),
+         serializer.loads_binary),
+    )
+    reference = serializer.dumps(asts)
+    for label, dump, load in formats:
+        dump_time, (tables_out, asts_out) = best_of(rounds, dump)
+        size = len(tables_out) + len(asts_out)
+        line = (f"  {label:<22} escrita {dump_time:.3f}s ({dump_time / (compile_time + dump_time):5.1%} da "
+                f"compilação) | {size / 1e6:6.2f} MB")
+        if load is not None:
+            load_time, loaded = best_of(rounds, lambda: (load(tables_out), load(asts_out)))
+            line += f" | leitura {load_time:.3f}s"
+            # Ida e volta: as árvores carregadas geram de novo o mesmo JSON
+            assert serializer.dumps(loaded[1]) == reference, label
+            assert serializer.dumps(loaded[0]) == serializer.dumps(tables), label
+        print(line)
+
+    # O JSON indentado é o mesmo texto do json.dumps sobre a estrutura com todos os nós marcados
+    tagged = json.loads(reference)
+    assert reference == json.dumps(tagged, indent=2, ensure_ascii=False)
+    assert serializer.dumps(asts, None) == json.dumps(tagged, separators=(',', ':'), ensure_ascii=False)
+
+
+if __name__ == "__main__":
+    main()
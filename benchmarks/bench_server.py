@@ -0,0 +1,76 @@
+# Arquivo: benchmarks/bench_server.py
+# Latência de um pedido ao servidor residente (main.py --serve) contra um processo main.py por
+# arquivo: primeiro pedido (falta), pedidos repetidos do mesmo arquivo (acerto em memória) e
+# pedidos com conteúdo novo a cada vez (léxico + sintático, sem a partida do interpretador).
+#
+# Uso: python benchmarks/bench_server.py [arquivo] [repeticoes]
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+MAIN = os.path.join(ROOT, 'main.py')
+
+
+def request(server, request_id: int, method: str, params: dict) -> tuple[dict, float]:
+    line = json.dumps({'jsonrpc': '2.0', 'id': request_id, 'method': method, 'params': params})
+    start = time.perf_counter()
+    server.stdin.write(line + '\n')
+    server.stdin.flush()
+    response = json.loads(server.stdout.readline())
+    elapsed = time.perf_counter() - start
+    assert 'result' in response, response
+    return response['result'], elapsed
+
+
+def median(values: list[float]) -> float:
+    values = sorted(values)
+    return values[len(values) // 2]
+
+
+def main():
+    path = os.path.abspath(sys.argv[1] if len(sys.argv) > 1 else os.path.join(ROOT, 'entradas', 'complexo.p'))
+    repeat = int(sys.argv[2]) if len(sys.argv) > 2 else 20
+    with open(path, 'r', encoding='utf-8') as f:
+        source = f.read()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        # Um processo por arquivo (grava saidas/ e erros/ no diretório temporário)
+        process_times = []
+        for _ in range(min(repeat, 5)):
+            start = time.perf_counter()
+            subprocess.run([sys.executable, MAIN, path], cwd=tmp, check=True, stdout=subprocess.DEVNULL)
+            process_times.append(time.perf_counter() - start)
+
+        server = subprocess.Popen([sys.executable, MAIN, '--serve'], cwd=tmp, text=True,
+                                  stdin=subprocess.PIPE, stdout=subprocess.PIPE)
+        try:
+            first, miss = request(server, 0, 'compile', {'path': path})
+            hits = [request(server, i, 'compile', {'path': path})[1] for i in range(1, repeat + 1)]
+            # Conteúdo diferente a cada pedido (um comentário no fim): sempre falta
+            changed = [request(server, i, 'compile', {'source': f"{source}\n// {i}\n"})[1]
+                       for i in range(repeat + 1, 2 * repeat + 1)]
+            parse_hits = [request(server, i, 'parse', {'path': path})[1]
+                          for i in range(2 * repeat + 1, 3 * repeat + 1)]
+            stats, _ = request(server, 3 * repeat + 1, 'stats', {})
+            request(server, 3 * repeat + 2, 'shutdown', {})
+        finally:
+            server.stdin.close()
+            server.wait()
+
+    print(f"{os.path.basename(path)}: {first['tokens']} tokens, {first['syntactic_error_count']} erros")
+    print(f"  processo por arquivo (main.py)   {median(process_times) * 1000:8.2f} ms")
+    print(f"  servidor, 1º pedido (c/ partida) {miss * 1000:8.2f} ms")
+    print(f"  servidor, conteúdo novo          {median(changed) * 1000:8.2f} ms")
+    print(f"  servidor, compile sem mudança    {median(hits) * 1000:8.2f} ms")
+    print(f"  servidor, parse sem mudança      {median(parse_hits) * 1000:8.2f} ms")
+    print(f"  acertos {stats['hits']}, faltas {stats['misses']}")
+
+
+if __name__ == "__main__":
+    main()
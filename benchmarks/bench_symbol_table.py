@@ -0,0 +1,126 @@
+# Arquivo: benchmarks/bench_symbol_table.py
+# Compara a SymbolTable (dicionário único com cadeias de declarações e log de desfazer) com a
+# tabela anterior, que percorria a pilha de escopos em cada lookup, variando a profundidade. Confere
+# também que a recuperação de erro do parser deixa o escopo da função com erro aberto, como a pilha
+# de escopos deixava: as tabelas gravadas e os erros de um programa com erro dentro de um while são
+# os mesmos de antes.
+#
+# Uso: python benchmarks/bench_symbol_table.py [lookups] [nomes_por_escopo]
+import json
+import os
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from symbol_table import SymbolTable, TableEntry
+from lexer import Lexer
+from parser import Parser
+import serializer
+
+# O ';' que falta dentro do while faz o erro cair no 'fn g': g é declarada dentro do escopo de f (e
+# aparece na tabela de f), o 'y = x' de g enxerga o x de f e o 'return' depois de g encerra a análise
+RECOVERY = """
+fn f(a: int) -> int {
+    let x: int;
+    while a < 1 {
+        x = 2
+    fn g() {
+        let y: int;
+        y = x;
+    }
+    return x;
+}
+
+fn main() {
+    let z: int;
+    z = f(1);
+}
+"""
+
+RECOVERY_ERRORS = [
+    "Erro Sintático na linha 5, coluna 5: Esperado ';' (Encontrado 'fn')",
+    "Erro Sintático: Token inesperado 'return' na linha 9, coluna 5.",
+]
+
+RECOVERY_TABLES = {
+    'f': {
+        'a': {'lexema': 'a', 'tipo': 'int', 'num_linha': 1, 'kind': 'parameter'},
+        'x': {'lexema': 'x', 'tipo': 'int', 'num_linha': 2, 'kind': 'variable'},
+        'g': {'lexema': 'g', 'tipo': 'void', 'num_linha': 5, 'kind': 'function'},
+    },
+    'g': {
+        'y': {'lexema': 'y', 'tipo': 'int', 'num_linha': 6, 'kind': 'variable'},
+    },
+}
+
+
+class ScopeStackTable:
+    # Referência: uma pilha de dicionários, percorrida do escopo mais interno para fora
+    def __init__(self):
+        self.scopes = [{}]
+
+    def enter_scope(self):
+        self.scopes.append({})
+
+    def exit_scope(self):
+        self.scopes.pop()
+
+    def add_entry(self, entry: TableEntry, column: int | None = None):
+        if entry.lexema in self.scopes[-1]:
+            raise Exception(f"O identificador '{entry.lexema}' já foi declarado neste escopo.")
+        self.scopes[-1][entry.lexema] = entry
+
+    def lookup(self, lexema: str) -> TableEntry | None:
+        for scope in reversed(self.scopes):
+            if lexema in scope:
+                return scope[lexema]
+        return None
+
+
+def run(table_cls, depth: int, names_per_scope: int, lookups: int) -> float:
+    table = table_cls()
+    start = time.perf_counter()
+    for d in range(depth):
+        table.enter_scope()
+        for i in range(names_per_scope):
+            table.add_entry(TableEntry(f"v{d}_{i}", 'int', 1, 'variable'))
+
+    # Usos espalhados por todos os níveis, como num corpo de função aninhado
+    uses = [f"v{d}_{i}" for d in range(depth) for i in range(names_per_scope)]
+    uses = ''.join(u + ' ' for u in uses).split()  # cópias: como lexemas vindos do léxico
+    lookup = table.lookup
+    for _ in range(max(1, lookups // len(uses))):
+        for name in uses:
+            lookup(name)
+
+    for _ in range(depth):
+        table.exit_scope()
+    return time.perf_counter() - start
+
+
+def check_recovery():
+    tokens, _ = Lexer(RECOVERY.lstrip('\n')).scan_tokens()
+    errors, tables, _ = Parser(tokens).parse_program()
+    assert [str(e) for e in errors] == RECOVERY_ERRORS, errors
+    assert serializer.dumps(tables) == json.dumps(RECOVERY_TABLES, indent=2, ensure_ascii=False)
+
+
+def main():
+    lookups = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    names_per_scope = int(sys.argv[2]) if len(sys.argv) > 2 else 8
+
+    print(f"{lookups} lookups, {names_per_scope} nomes por escopo")
+    for depth in (1, 2, 8, 32):
+        old = run(ScopeStackTable, depth, names_per_scope, lookups)
+        new = run(SymbolTable, depth, names_per_scope, lookups)
+        print(f"  profundidade {depth:>2}: pilha de escopos {old:.3f}s | cadeias + undo log {new:.3f}s "
+              f"({old / new:.2f}x)")
+
+    check_recovery()
+    print("  recuperação de erro: tabelas e erros iguais aos da pilha de escopos")
+
+
+if __name__ == "__main__":
+    main()
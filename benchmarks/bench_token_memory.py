@@ -0,0 +1,46 @@
+# Arquivo: benchmarks/bench_token_memory.py
+# Mede a memória por token da lista de Token (dataclass) contra o TokenStream (arrays).
+#
+# Uso: python benchmarks/bench_token_memory.py [repeticoes]
+import os
+import sys
+import tracemalloc
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from lexer import Lexer
+
+
+def load_scaled_source(repeat: int) -> str:
+    with open(os.path.join(ROOT, 'entradas', 'complexo.p'), 'r', encoding='utf-8') as f:
+        source = f.read()
+    return (source + '\n') * repeat
+
+
+def measure(build) -> tuple[int, int]:
+    # Retorna (bytes retidos pela estrutura, quantidade de tokens)
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    tokens = build()
+    retained = tracemalloc.get_traced_memory()[0] - before
+    tracemalloc.stop()
+    return retained, len(tokens)
+
+
+def main():
+    repeat = int(sys.argv[1]) if len(sys.argv) > 1 else 500
+    source = load_scaled_source(repeat)
+    print(f"Fonte: complexo.p x {repeat} ({len(source.encode('utf-8')) / 1e6:.2f} MB em disco)")
+
+    list_bytes, count = measure(lambda: Lexer(source, engine='table').scan_tokens()[0])
+    stream_bytes, stream_count = measure(lambda: Lexer(source, engine='table').scan_stream()[0])
+    assert count == stream_count
+
+    print(f"  list[Token]: {list_bytes / 1e6:8.2f} MB -> {list_bytes / count:6.1f} bytes/token")
+    print(f"  TokenStream: {stream_bytes / 1e6:8.2f} MB -> {stream_bytes / count:6.1f} bytes/token")
+    print(f"Redução: {list_bytes / stream_bytes:.1f}x ({count} tokens)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,243 @@
+# Arquivo: benchmarks/bench_vm.py
+# Compara os backends do --run, a VM de bytecode (bytecode.py + vm.py) e a tradução para code
+# objects Python (transpiler.py), com um interpretador ingênuo que percorre a AST, em programas com
+# muitos laços e muitas chamadas, e confere que os três imprimem a mesma saída (também nos programas
+# do generator.py, com e sem o otimizador). Mede também quanto custa traduzir e compilar para Python
+# contra carregar o code object com marshal, como numa execução com --cache.
+#
+# Uso: python benchmarks/bench_vm.py [n] [rodadas]
+import io
+import os
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from lexer import Lexer
+from parser import Parser
+from optimizer import Optimizer
+from bytecode import char_value, compile_program, format_parts
+from vm import VM
+from transpiler import PythonProgram, compile_python, dumps_code, loads_code
+from generator import PRESETS, generate, preset
+
+LOOPS = """
+fn soma_quadrados(n: int) -> int {
+    let i, j, total: int;
+    total = 0;
+    i = 0;
+    while i < n {
+        j = 0;
+        while j < 100 {
+            total = total + i * j - (j / 3);
+            j = j + 1;
+        }
+        i = i + 1;
+    }
+    return total;
+}
+
+fn media(n: int) -> float {
+    let i: int;
+    let acc: float;
+    acc = 0.0;
+    i = 1;
+    while i <= n * 50 {
+        acc = acc + i / 2.0;
+        i = i + 1;
+    }
+    return acc / n;
+}
+
+fn main() {
+    println("{} {}", soma_quadrados(N), media(N));
+}
+"""
+
+CALLS = """
+fn fib(n: int) -> int {
+    if n < 2 {
+        return n;
+    }
+    return fib(n - 1) + fib(n - 2);
+}
+
+fn ack(m: int, n: int) -> int {
+    if m == 0 {
+        return n + 1;
+    }
+    if n == 0 {
+        return ack(m - 1, 1);
+    }
+    return ack(m - 1, ack(m, n - 1));
+}
+
+fn main() {
+    let i: int;
+    i = 0;
+    while i < N / 20 {
+        i = i + 1;
+    }
+    println("fib {} ack {}", fib(N / 20 + 10), ack(2, N / 10));
+}
+"""
+
+
+class ReturnValue(Exception):
+    def __init__(self, value):
+        self.value = value
+
+
+class AstInterpreter:
+    # Referência: avalia a AST diretamente, com um dicionário de variáveis por chamada e o return
+    # propagado por exceção
+    def __init__(self, function_asts: dict, function_tables: dict, out):
+        self.functions = function_asts
+        self.tables = function_tables
+        self.out = out
+
+    def call(self, name: str, args: list):
+        func = self.functions[name]
+        env = {}
+        types = {}
+        for entry in self.tables[name].values():
+            env[entry.lexema] = {'int': 0, 'float': 0.0, 'char': '\0'}[entry.tipo]
+            types[entry.lexema] = entry.tipo
+        for param, value in zip(func.params, args):
+            env[param.name] = float(value) if param.type == 'float' else value
+        try:
+            self.block(func.body.statements, env, types)
+        except ReturnValue as ret:
+            return self.convert(ret.value, func.return_type)
+        return None
+
+    @staticmethod
+    def convert(value, type_name: str):
+        if type_name == 'float':
+            return float(value)
+        if type_name == 'int' and isinstance(value, float):
+            return int(value)
+        return value
+
+    def block(self, statements: list, env: dict, types: dict):
+        for stmt in statements:
+            kind = type(stmt).__name__
+            if kind == 'Assign':
+                env[stmt.name] = self.convert(self.eval(stmt.value, env), types[stmt.name])
+            elif kind == 'IfStmt':
+                if self.eval(stmt.condition, env):
+                    self.block(stmt.then_branch.statements, env, types)
+                elif stmt.else_branch is not None:
+                    branch = stmt.else_branch
+                    self.block([branch] if type(branch).__name__ == 'IfStmt' else branch.statements, env, types)
+            elif kind == 'WhileStmt':
+                while self.eval(stmt.condition, env):
+                    self.block(stmt.body.statements, env, types)
+            elif kind == 'PrintlnStmt':
+                parts = format_parts(stmt.fmt_string, len(stmt.args))
+                values = [self.eval(arg, env) for arg in stmt.args]
+                self.out.write(parts[0] + ''.join(str(v) + p for v, p in zip(values, parts[1:])) + '\n')
+            elif kind == 'ReturnStmt':
+                raise ReturnValue(self.eval(stmt.value, env))
+            elif kind == 'FunctionCall':
+                self.eval(stmt, env)
+
+    def eval(self, node, env: dict):
+        kind = type(node).__name__
+        if kind == 'VarAccess':
+            return env[node.name]
+        if kind == 'Literal':
+            return char_value(node.value) if node.type == 'char' else node.value
+        if kind == 'FunctionCall':
+            return self.call(node.name, [self.eval(arg, env) for arg in node.args])
+        left = self.eval(node.left, env)
+        right = self.eval(node.right, env)
+        op = node.op
+        if op == '+':
+            return left + right
+        if op == '-':
+            return left - right
+        if op == '*':
+            return left * right
+        if op == '/':
+            if isinstance(left, int) and isinstance(right, int):
+                quotient = abs(left) // abs(right)
+                return quotient if (left < 0) == (right < 0) else -quotient
+            return left / right
+        return {'<': left < right, '<=': left <= right, '>': left > right, '>=': left >= right,
+                '==': left == right, '!=': left != right}[op]
+
+
+def front_end(source: str, optimize: bool = False):
+    tokens, _ = Lexer(source, engine='table').scan_tokens()
+    errors, tables, asts = Parser(tokens).parse_program()
+    assert not errors, errors[0]
+    if optimize:
+        Optimizer().optimize(asts, tables)
+    return tables, asts
+
+
+def run_ast(tables: dict, asts: dict) -> str:
+    out = io.StringIO()
+    AstInterpreter(asts, tables, out).call('main', [])
+    return out.getvalue()
+
+
+def run_vm(tables: dict, asts: dict) -> str:
+    out = io.StringIO()
+    VM(compile_program(asts, tables), out).run()
+    return out.getvalue()
+
+
+def run_python(tables: dict, asts: dict) -> str:
+    out = io.StringIO()
+    PythonProgram(compile_python(asts, tables), out).run()
+    return out.getvalue()
+
+
+def best_of(rounds: int, func):
+    best = float('inf')
+    result = None
+    for _ in range(rounds):
+        start = time.perf_counter()
+        result = func()
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+    rounds = int(sys.argv[2]) if len(sys.argv) > 2 else 3
+
+    sys.setrecursionlimit(100_000)
+    print(f"N = {n}, melhor de {rounds} rodadas")
+    for label, template in (('laços', LOOPS), ('chamadas', CALLS)):
+        tables, asts = front_end(template.replace('N', str(n)))
+        ast_time, ast_out = best_of(rounds, lambda: run_ast(tables, asts))
+        vm_time, vm_out = best_of(rounds, lambda: run_vm(tables, asts))
+        python_time, python_out = best_of(rounds, lambda: run_python(tables, asts))
+        assert ast_out == vm_out == python_out, (ast_out, vm_out, python_out)
+        print(f"  {label:<9} AST {ast_time:.3f}s | VM {vm_time:.3f}s ({ast_time / vm_time:.2f}x) | "
+              f"Python {python_time:.3f}s ({ast_time / python_time:.2f}x) -> {vm_out.strip()}")
+
+    # Tradução + compile() contra marshal.loads do code object guardado
+    tables, asts = front_end(generate(preset('mixed', 0.25)))
+    compile_time, code = best_of(rounds, lambda: compile_python(asts, tables))
+    payload = dumps_code(code)
+    load_time, _ = best_of(rounds, lambda: loads_code(payload))
+    print(f"  code object (mixed, escala 0.25): traduzir e compilar {compile_time * 1000:.1f} ms | "
+          f"marshal {load_time * 1000:.1f} ms ({len(payload) / 1024:.0f} KB)")
+
+    # Mesma saída nos três executores, com e sem otimização, nos programas gerados
+    for name in PRESETS:
+        source = generate(preset(name, 0.05))
+        reference = run_ast(*front_end(source))
+        for optimize in (False, True):
+            assert run_vm(*front_end(source, optimize)) == reference, name
+            assert run_python(*front_end(source, optimize)) == reference, name
+    print(f"  saídas idênticas nos programas gerados ({', '.join(PRESETS)})")
+
+
+if __name__ == "__main__":
+    main()
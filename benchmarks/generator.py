@@ -0,0 +1,261 @@
+# Arquivo: benchmarks/generator.py
+# Gerador de programas sintéticos da Linguagem P, com tamanho e forma configuráveis: quantidade de
+# funções, comandos, aninhamento de if/while, tamanho das expressões e das declarações. Os programas
+# gerados são válidos (e terminam: cada while tem o seu contador, as chamadas só vão para funções
+# anteriores e as divisões são por constantes diferentes de zero); com errors > 0 recebem erros
+# léxicos, sintáticos e semânticos em pontos sorteados. Mesma forma e mesma semente, mesmo programa.
+#
+# Uso: python benchmarks/generator.py [--preset NOME] [--scale N] [--errors N] [--seed N] [-o arquivo.p]
+import argparse
+import random
+import sys
+from dataclasses import dataclass, fields, replace
+
+
+@dataclass
+class Shape:
+    functions: int = 50  # funções além da main
+    statements: int = 12  # comandos por bloco de função
+    depth: int = 2  # aninhamento máximo de if/while
+    expression: int = 6  # operandos por expressão
+    declarations: int = 6  # variáveis declaradas por função
+    params: int = 3  # parâmetros por função (no máximo)
+    loop_count: int = 4  # iterações de cada while
+    errors: int = 0  # erros injetados
+    seed: int = 0
+
+
+# Formas típicas; a escala multiplica a dimensão que dá nome à forma
+PRESETS = {
+    'many_functions': Shape(functions=2000, statements=6, depth=1, expression=4, declarations=3),
+    'deep_nesting': Shape(functions=20, statements=4, depth=40, expression=3, declarations=3),
+    'long_expressions': Shape(functions=50, statements=6, depth=1, expression=300, declarations=4),
+    'many_declarations': Shape(functions=50, statements=6, depth=1, expression=4, declarations=400),
+    'mixed': Shape(functions=300, statements=12, depth=3, expression=8, declarations=8),
+}
+SCALED_FIELD = {'many_functions': 'functions', 'deep_nesting': 'depth', 'long_expressions': 'expression',
+                'many_declarations': 'declarations', 'mixed': 'functions'}
+
+TYPES = ('int', 'float', 'char')
+INT_OPS = ('+', '-', '+', '-', '*')
+RELATIONAL = ('<', '>', '<=', '>=', '==', '!=')
+CHARS = "abcdefghijklmnopqrstuvwxyz"
+MAX_LOOPS = 2
+
+
+def preset(name: str, scale: float = 1.0, **overrides) -> Shape:
+    shape = PRESETS[name]
+    scaled = SCALED_FIELD[name]
+    shape = replace(shape, **{scaled: max(1, int(getattr(shape, scaled) * scale))})
+    return replace(shape, **overrides)
+
+
+class _Function:
+    def __init__(self, name: str, params: list[tuple[str, str]], return_type: str):
+        self.name = name
+        self.params = params
+        self.return_type = return_type
+
+
+class ProgramGenerator:
+    def __init__(self, shape: Shape):
+        self.shape = shape
+        self.rng = random.Random(shape.seed)
+        self.functions = []
+        self.lines = []
+
+    # --- Expressões ---
+
+    def _literal(self, type_name: str) -> str:
+        rng = self.rng
+        if type_name == 'int':
+            return str(rng.randint(0, 99))
+        if type_name == 'float':
+            return f"{rng.randint(0, 99)}.{rng.randint(0, 9)}"
+        return f"'{rng.choice(CHARS)}'"
+
+    def _operand(self, type_name: str, scope: dict[str, list[str]], calls: list) -> str:
+        rng = self.rng
+        roll = rng.random()
+        if calls and calls[0].return_type == type_name and roll < 0.2:
+            # A chamada da função (no máximo uma, executada no máximo uma vez por execução dela)
+            callee = calls.pop()
+            return f"{callee.name}({', '.join(self.expression(t, scope, [], 2) for _, t in callee.params)})"
+        names = scope[type_name]
+        if names and roll < 0.65:
+            return rng.choice(names)
+        return self._literal(type_name)
+
+    def expression(self, type_name: str, scope: dict[str, list[str]], calls: list, size: int | None = None) -> str:
+        # Expressão de um tipo só: soma/subtração de operandos, com * e / apenas por constantes pequenas
+        rng = self.rng
+        if type_name == 'char':
+            names = scope['char']
+            return rng.choice(names) if names and rng.random() < 0.5 else self._literal('char')
+        size = size or max(1, rng.randint(1, self.shape.expression))
+        parts = [self._operand(type_name, scope, calls)]
+        for _ in range(size - 1):
+            op = rng.choice(INT_OPS)
+            if op == '*':
+                parts.append(f"* {rng.randint(2, 3) if type_name == 'int' else '1.5'}")
+                if rng.random() < 0.5:
+                    parts.append(f"/ {rng.randint(2, 4) if type_name == 'int' else '2.0'}")
+                continue
+            operand = self._operand(type_name, scope, calls)
+            if rng.random() < 0.15:
+                operand = f"({operand} {rng.choice('+-')} {self._literal(type_name)})"
+            parts.append(f"{op} {operand}")
+        return ' '.join(parts)
+
+    def condition(self, scope: dict, calls: list) -> str:
+        type_name = self.rng.choice(('int', 'int', 'float'))
+        size = max(1, self.shape.expression // 2)
+        return (f"{self.expression(type_name, scope, calls, self.rng.randint(1, size))} "
+                f"{self.rng.choice(RELATIONAL)} {self.expression(type_name, scope, calls, 1)}")
+
+    # --- Comandos ---
+
+    def _emit(self, indent: int, text: str):
+        self.lines.append('    ' * indent + text)
+
+    def block(self, indent: int, level: int, scope: dict, targets: dict, counters: list[str], calls: list,
+              count: int, loops: int = 0):
+        # O primeiro comando de cada bloco desce um nível, até shape.depth: todo corpo tem uma cadeia
+        # com o aninhamento máximo. No máximo MAX_LOOPS whiles ficam um dentro do outro (o tempo de
+        # execução é loop_count elevado a esse número). A chamada só aparece no primeiro nível:
+        # dentro de if/while ela poderia rodar várias vezes, e o tempo cresceria ao longo da cadeia.
+        rng = self.rng
+        for position in range(count):
+            roll = rng.random()
+            if level < self.shape.depth and (position == 0 or roll < 0.3):
+                inner = max(1, count // 2)
+                if loops >= MAX_LOOPS or rng.random() < 0.5:
+                    self._emit(indent, f"if {self.condition(scope, calls)} {{")
+                    self.block(indent + 1, level + 1, scope, targets, counters, [], inner, loops)
+                    if rng.random() < 0.5:
+                        self._emit(indent, "} else {")
+                        self.block(indent + 1, level + 1, scope, targets, counters, [], inner, loops)
+                    self._emit(indent, "}")
+                else:
+                    counter = counters[level]
+                    self._emit(indent, f"{counter} = 0;")
+                    self._emit(indent, f"while {counter} < {self.shape.loop_count} {{")
+                    self.block(indent + 1, level + 1, scope, targets, counters, [], inner, loops + 1)
+                    self._emit(indent + 1, f"{counter} = {counter} + 1;")
+                    self._emit(indent, "}")
+            elif roll < 0.4:
+                type_name = rng.choice(('int', 'float'))
+                args = [self.expression(type_name, scope, calls, 1) for _ in range(rng.randint(0, 2))]
+                fmt = ' '.join('{}' for _ in args) or 'ok'
+                self._emit(indent, f'println("{fmt}"{"".join(", " + a for a in args)});')
+            else:
+                type_name = rng.choice([t for t in TYPES if targets[t]] or ['int'])
+                if not targets[type_name]:
+                    continue
+                target = rng.choice(targets[type_name])
+                self._emit(indent, f"{target} = {self.expression(type_name, scope, calls)};")
+
+    def function(self, index: int):
+        rng = self.rng
+        shape = self.shape
+        name = f"f{index}"
+        params = [(f"p{i}", rng.choice(TYPES)) for i in range(rng.randint(0, shape.params))]
+        return_type = rng.choice(('int', 'float'))
+
+        scope = {t: [] for t in TYPES}
+        targets = {t: [] for t in TYPES}
+        for param, type_name in params:
+            scope[type_name].append(param)
+
+        header = ', '.join(f"{p}: {t}" for p, t in params)
+        self._emit(0, f"fn {name}({header}) -> {return_type} {{")
+        # Declarações agrupadas por tipo, várias por 'let'
+        variables = [(f"v{i}", rng.choice(TYPES)) for i in range(shape.declarations)]
+        for type_name in TYPES:
+            names = [v for v, t in variables if t == type_name]
+            for start in range(0, len(names), 8):
+                self._emit(1, f"let {', '.join(names[start:start + 8])}: {type_name};")
+        counters = [f"k{level}" for level in range(shape.depth)]
+        if counters:
+            self._emit(1, f"let {', '.join(counters)}: int;")
+        # Cada variável recebe um valor antes de ser lida
+        for variable, type_name in variables:
+            self._emit(1, f"{variable} = {self.expression(type_name, scope, [], 1)};")
+            scope[type_name].append(variable)
+            targets[type_name].append(variable)
+
+        # No máximo uma chamada, a uma das funções anteriores mais próximas
+        calls = [rng.choice(self.functions[-8:])] if self.functions and rng.random() < 0.3 else []
+        self.block(1, 0, scope, targets, counters, calls, shape.statements)
+        self._emit(1, f"return {self.expression(return_type, scope, calls)};")
+        self._emit(0, "}")
+        self.functions.append(_Function(name, params, return_type))
+
+    def main(self):
+        self._emit(0, "fn main() {")
+        self._emit(1, "let r: int;")
+        self._emit(1, "let x: float;")
+        self._emit(1, "r = 0;")
+        self._emit(1, "x = 0.0;")
+        for function in self.functions[-3:]:
+            args = ', '.join(self._literal(t) for _, t in function.params)
+            target = 'r' if function.return_type == 'int' else 'x'
+            self._emit(1, f"{target} = {function.name}({args});")
+            self._emit(1, f'println("{function.name}: {{}}", {target});')
+        self._emit(0, "}")
+
+    # --- Erros ---
+
+    def inject_errors(self):
+        # Cada erro altera uma linha de comando sorteada (não as de 'fn' ou '}')
+        rng = self.rng
+        candidates = [i for i, line in enumerate(self.lines) if line.rstrip().endswith(';')]
+        for i in rng.sample(candidates, min(self.shape.errors, len(candidates))):
+            line = self.lines[i]
+            kind = rng.choice(('lexical', 'semicolon', 'undeclared', 'redeclared'))
+            if kind == 'lexical':
+                self.lines[i] = line[:-1] + ' $;'
+            elif kind == 'semicolon':
+                self.lines[i] = line[:-1]
+            elif kind == 'undeclared':
+                indent = line[:len(line) - len(line.lstrip())]
+                self.lines[i] = f"{line}\n{indent}nao_declarada = 1;"
+            else:
+                indent = line[:len(line) - len(line.lstrip())]
+                self.lines[i] = f"{line}\n{indent}let r_{i}: int;\n{indent}let r_{i}: float;"
+
+    def generate(self) -> str:
+        for index in range(self.shape.functions):
+            self.function(index)
+        self.main()
+        if self.shape.errors:
+            self.inject_errors()
+        return '\n'.join(self.lines) + '\n'
+
+
+def generate(shape: Shape | None = None, **options) -> str:
+    """Programa da Linguagem P com a forma dada (ou Shape(**options))."""
+    return ProgramGenerator(shape or Shape(**options)).generate()
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description="Gera um programa sintético da Linguagem P.")
+    arg_parser.add_argument('--preset', choices=PRESETS, help="forma pronta (os outros valores a sobrescrevem)")
+    arg_parser.add_argument('--scale', type=float, default=1.0, help="multiplica a dimensão principal do preset")
+    for f in fields(Shape):
+        arg_parser.add_argument(f"--{f.name.replace('_', '-')}", type=int, dest=f.name)
+    arg_parser.add_argument('-o', '--output', help="arquivo de saída (padrão: saída padrão)")
+    args = arg_parser.parse_args()
+
+    overrides = {f.name: getattr(args, f.name) for f in fields(Shape) if getattr(args, f.name) is not None}
+    shape = preset(args.preset, args.scale, **overrides) if args.preset else Shape(**overrides)
+    program = generate(shape)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            f.write(program)
+    else:
+        sys.stdout.write(program)
+
+
+if __name__ == "__main__":
+    main()
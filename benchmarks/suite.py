@@ -0,0 +1,214 @@
+# Arquivo: benchmarks/suite.py
+# Suíte de regressão de desempenho: gera programas com o generator.py (uma forma por preset, mais um
+# programa com erros) e mede Lexer, Parser, SymbolTable e o main.write_json em cada formato. Cada
+# caso registra a vazão (melhor de N rodadas, sem tracemalloc) e o pico de memória (uma rodada à
+# parte, com tracemalloc). Os números são comparados com benchmarks/baselines.json: a suíte falha
+# (código de saída 1) se a vazão cair ou o pico de memória subir além do limite. As baselines
+# dependem da máquina; --save as regrava.
+#
+# Uso: python benchmarks/suite.py [--save] [--scale N] [--rounds N] [--threshold F]
+#                                 [--memory-threshold F] [--only TEXTO] [--baselines arquivo.json]
+import argparse
+import gc
+import json
+import os
+import platform
+import sys
+import tempfile
+import time
+import tracemalloc
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from lexer import Lexer, TokenType
+from parser import Parser
+from symbol_table import SymbolTable, TableEntry
+from profiler import count_nodes
+from main import quiet, write_json
+from generator import PRESETS, generate, preset
+
+BASELINES_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'baselines.json')
+BASELINE_VERSION = 1
+OUTPUT_FORMATS = ('json', 'compact', 'binary')
+# Escala padrão dos presets: programas de 0,1 a 0,5 MB, e a suíte inteira em menos de um minuto
+DEFAULT_SCALE = 0.25
+
+
+def programs(scale: float) -> dict[str, str]:
+    sources = {name: generate(preset(name, scale)) for name in PRESETS}
+    sources['errors'] = generate(preset('mixed', scale, errors=max(1, int(200 * scale)), seed=1))
+    return sources
+
+
+def replay_symbols(tables: dict, lookups: list[list[str]]) -> int:
+    # Refaz o trabalho da tabela de símbolos de uma compilação: as funções no escopo global, e em
+    # cada função as declarações e um lookup por identificador usado nela
+    table = SymbolTable()
+    operations = 0
+    for func_name in tables:
+        table.add_entry(TableEntry(func_name, 'function', 0, 'function'))
+    for entries, names in zip(tables.values(), lookups):
+        table.enter_scope()
+        for entry in entries.values():
+            table.add_entry(TableEntry(entry.lexema, entry.tipo, entry.num_linha, entry.kind))
+        lookup = table.lookup
+        for name in names:
+            lookup(name)
+        table.exit_scope()
+        operations += len(entries) + len(names)
+    return operations
+
+
+def identifiers_by_function(tokens) -> list[list[str]]:
+    # Lexemas dos identificadores de cada função, na ordem do fonte
+    functions = []
+    for token in tokens:
+        if token.token_type is TokenType.FUNCTION:
+            functions.append([])
+        elif token.token_type is TokenType.ID and functions:
+            functions[-1].append(token.lexeme)
+    return functions
+
+
+class Case:
+    """Um caso da suíte: run() faz o trabalho medido e devolve quantas unidades processou."""
+
+    def __init__(self, name: str, unit: str, run):
+        self.name = name
+        self.unit = unit
+        self.run = run
+
+
+def cases_for(program: str, source: str, output_dir: str) -> list[Case]:
+    tokens, _ = Lexer(source, engine='table').scan_tokens()
+    _, tables, asts = Parser(tokens).parse_program()
+    nodes = sum(count_nodes(asts).values())
+    lookups = identifiers_by_function(tokens)
+    if len(lookups) != len(tables):
+        lookups = lookups[:len(tables)]  # funções descartadas pela recuperação de erros
+
+    def lex(engine):
+        return lambda: len(Lexer(source, engine=engine).scan_tokens()[0])
+
+    def parse():
+        Parser(tokens).parse_program()
+        return len(tokens)
+
+    def write(output_format):
+        filename = os.path.join(output_dir, f"{program}_ast{'.bin' if output_format == 'binary' else '.json'}")
+        return lambda: write_json(filename, asts, output_format, log=quiet) or nodes
+
+    cases = [Case(f"{program}/lexer-{engine}", 'tokens', lex(engine)) for engine in Lexer.ENGINES]
+    cases.append(Case(f"{program}/parser", 'tokens', parse))
+    cases.append(Case(f"{program}/symbol_table", 'ops', lambda: replay_symbols(tables, lookups)))
+    cases.extend(Case(f"{program}/write_json-{f}", 'nodes', write(f)) for f in OUTPUT_FORMATS)
+    return cases
+
+
+def measure(case: Case, rounds: int) -> dict:
+    # Como no timeit, o coletor de lixo fica desligado enquanto o tempo é medido
+    best = float('inf')
+    units = 0
+    gc.collect()
+    gc.disable()
+    try:
+        for _ in range(rounds):
+            start = time.perf_counter()
+            units = case.run()
+            best = min(best, time.perf_counter() - start)
+    finally:
+        gc.enable()
+
+    tracemalloc.start()
+    try:
+        case.run()
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+    return {'unit': case.unit, 'units': units, 'seconds': best, 'throughput': units / best, 'peak_memory': peak}
+
+
+def compare(results: dict, baselines: dict, threshold: float, memory_threshold: float) -> list[str]:
+    regressions = []
+    for name, result in results.items():
+        base = baselines.get(name)
+        if base is None or base['units'] != result['units']:
+            # Caso novo, ou programa diferente (outro --scale, gerador alterado): sem comparação
+            continue
+        if result['throughput'] < base['throughput'] * (1 - threshold):
+            regressions.append(f"{name}: vazão {result['throughput']:,.0f} {result['unit']}/s, "
+                               f"baseline {base['throughput']:,.0f} (-{1 - result['throughput'] / base['throughput']:.0%})")
+        if result['peak_memory'] > base['peak_memory'] * (1 + memory_threshold):
+            regressions.append(f"{name}: pico de memória {result['peak_memory'] / 1e6:.1f} MB, "
+                               f"baseline {base['peak_memory'] / 1e6:.1f} MB "
+                               f"(+{result['peak_memory'] / base['peak_memory'] - 1:.0%})")
+    return regressions
+
+
+def load_baselines(filename: str) -> dict | None:
+    if not os.path.exists(filename):
+        return None
+    with open(filename, 'r', encoding='utf-8') as f:
+        data = json.load(f)
+    if data.get('version') != BASELINE_VERSION:
+        print(f"Aviso: {filename} tem outra versão de formato; ignorado.")
+        return None
+    return data
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description="Suíte de regressão de desempenho do compilador.")
+    arg_parser.add_argument('--save', action='store_true', help="grava os resultados como novas baselines")
+    arg_parser.add_argument('--scale', type=float, default=DEFAULT_SCALE, help="escala dos programas gerados")
+    arg_parser.add_argument('--rounds', type=int, default=3, help="rodadas por caso (vale a melhor)")
+    arg_parser.add_argument('--threshold', type=float, default=0.25, help="queda de vazão tolerada (fração)")
+    arg_parser.add_argument('--memory-threshold', type=float, default=0.10,
+                            help="aumento de pico de memória tolerado (fração)")
+    arg_parser.add_argument('--only', help="roda só os casos cujo nome contém o texto")
+    arg_parser.add_argument('--baselines', default=BASELINES_FILE, help="arquivo das baselines")
+    args = arg_parser.parse_args()
+
+    baselines = load_baselines(args.baselines)
+    if baselines and (baselines['python'], baselines['platform']) != (sys.version.split()[0], platform.platform()):
+        print(f"Aviso: baselines gravadas em Python {baselines['python']} ({baselines['platform']}); "
+              f"os números podem não ser comparáveis.")
+
+    results = {}
+    with tempfile.TemporaryDirectory() as output_dir:
+        for program, source in programs(args.scale).items():
+            print(f"{program}: {len(source) / 1e6:.2f} MB")
+            for case in cases_for(program, source, output_dir):
+                if args.only and args.only not in case.name:
+                    continue
+                result = results[case.name] = measure(case, args.rounds)
+                base = (baselines or {}).get('cases', {}).get(case.name)
+                delta = ''
+                if base and base['units'] == result['units']:
+                    delta = f" ({result['throughput'] / base['throughput'] - 1:+.0%})"
+                print(f"  {case.name.split('/')[1]:<22} {result['throughput']:>13,.0f} {case.unit}/s{delta:<8}"
+                      f" | pico {result['peak_memory'] / 1e6:8.2f} MB")
+
+    if args.save:
+        cases = dict(baselines['cases']) if baselines and args.only else {}
+        cases.update(results)
+        with open(args.baselines, 'w', encoding='utf-8') as f:
+            json.dump({'version': BASELINE_VERSION, 'python': sys.version.split()[0],
+                       'platform': platform.platform(), 'scale': args.scale, 'cases': cases}, f, indent=2)
+        print(f"Baselines gravadas em {args.baselines}")
+        return
+
+    if baselines is None:
+        print(f"Sem baselines em {args.baselines}; rode com --save para gravá-las.")
+        return
+    regressions = compare(results, baselines['cases'], args.threshold, args.memory_threshold)
+    if regressions:
+        print(f"{len(regressions)} regressões:")
+        for line in regressions:
+            print(f"  {line}")
+        sys.exit(1)
+    print(f"Sem regressões (vazão -{args.threshold:.0%}, memória +{args.memory_threshold:.0%}).")
+
+
+if __name__ == "__main__":
+    main()
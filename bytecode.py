@@ -0,0 +1,416 @@
+# Arquivo: bytecode.py
+# Compila as ASTs (ast_nodes ou SLOTTED_NODES) e as tabelas de símbolos de um programa em bytecode
+# para a VM de vm.py. Cada função vira um CodeObject: instruções (opcode e argumentos) num array de
+# inteiros, um pool de constantes e os locais em slots, na ordem da tabela de símbolos
+# da função (parâmetros primeiro). Os tipos são resolvidos em compilação: a divisão sai como
+# DIV_INT (truncada em direção a zero) ou DIV_FLOAT, e as conversões int <-> float viram instruções
+# explícitas nas atribuições, argumentos e retornos. Para gastar menos despachos na VM:
+#  - o operando da direita de uma operação que seja variável ou constante vai no argumento da
+#    instrução (ADD_LOCAL, SUB_CONST...);
+#  - uma comparação usada como condição vira um único salto (JUMP_IF_NOT_<op>); entre uma variável e
+#    outra variável (_LL) ou uma constante (_LC), sem passar pela pilha;
+#  - x = x + constante (ou - constante) vira INCREMENT;
+#  - o while testa a condição no fim do corpo;
+#  - return f(...) dentro da própria f (chamada de cauda) vira um salto para o começo da função, então
+#    a recursão de cauda roda como um laço, sem gastar frames.
+# As instruções têm dois inteiros (opcode, argumento); INCREMENT tem três (opcode, slot, constante) e
+# os saltos _LL/_LC, quatro (opcode, slot da esquerda, operando da direita, destino).
+import codecs
+from array import array
+from dataclasses import dataclass
+
+from purity import analyze, is_self_tail_call
+
+# Opcodes agrupados em faixas, na ordem em que a VM os testa. As famílias de operações aritméticas
+# (ADD..DIV_FLOAT) e de saltos condicionais (LT..NE) têm a mesma ordem interna, então
+# opcode - início da faixa dá a operação.
+(LOAD_LOCAL, STORE_LOCAL, INCREMENT, LOAD_CONST, ADD_LOCAL, SUB_LOCAL, MUL_LOCAL, DIV_INT_LOCAL,
+ DIV_FLOAT_LOCAL, ADD_CONST, SUB_CONST, MUL_CONST, DIV_INT_CONST, DIV_FLOAT_CONST, ADD, SUB, MUL, DIV_INT,
+ DIV_FLOAT, JUMP_IF_NOT_LT_LL, JUMP_IF_NOT_LE_LL, JUMP_IF_NOT_GT_LL, JUMP_IF_NOT_GE_LL, JUMP_IF_NOT_EQ_LL,
+ JUMP_IF_NOT_NE_LL, JUMP_IF_NOT_LT_LC, JUMP_IF_NOT_LE_LC, JUMP_IF_NOT_GT_LC, JUMP_IF_NOT_GE_LC,
+ JUMP_IF_NOT_EQ_LC, JUMP_IF_NOT_NE_LC, JUMP_IF_NOT_LT, JUMP_IF_NOT_LE, JUMP_IF_NOT_GT, JUMP_IF_NOT_GE,
+ JUMP_IF_NOT_EQ, JUMP_IF_NOT_NE, JUMP, CALL, RETURN, PRINT, POP, JUMP_IF_FALSE, COMPARE, TO_INT, TO_FLOAT) = range(46)
+
+ARITHMETIC = ('ADD', 'SUB', 'MUL', 'DIV_INT', 'DIV_FLOAT')
+_JUMPS = ('JUMP_IF_NOT_LT', 'JUMP_IF_NOT_LE', 'JUMP_IF_NOT_GT', 'JUMP_IF_NOT_GE', 'JUMP_IF_NOT_EQ',
+          'JUMP_IF_NOT_NE')
+OPCODE_NAMES = (('LOAD_LOCAL', 'STORE_LOCAL', 'INCREMENT', 'LOAD_CONST')
+                + tuple(f"{name}_LOCAL" for name in ARITHMETIC) + tuple(f"{name}_CONST" for name in ARITHMETIC)
+                + ARITHMETIC
+                + tuple(f"{name}_LL" for name in _JUMPS) + tuple(f"{name}_LC" for name in _JUMPS) + _JUMPS
+                + ('JUMP', 'CALL', 'RETURN', 'PRINT', 'POP', 'JUMP_IF_FALSE', 'COMPARE', 'TO_INT', 'TO_FLOAT'))
+# Tamanho de cada instrução em inteiros
+INSTRUCTION_SIZE = tuple(4 if JUMP_IF_NOT_LT_LL <= op <= JUMP_IF_NOT_NE_LC else 3 if op == INCREMENT else 2
+                         for op in range(len(OPCODE_NAMES)))
+
+COMPARISONS = ('<', '<=', '>', '>=', '==', '!=')
+
+# Operação -> deslocamento dentro de cada família
+ARITHMETIC_OFFSET = {'+': 0, '-': 1, '*': 2}
+JUMP_OFFSET = {op: offset for offset, op in enumerate(COMPARISONS)}
+# Saltar quando a comparação é verdadeira = saltar quando a comparação oposta é falsa
+NEGATED = {'<': '>=', '<=': '>', '>': '<=', '>=': '<', '==': '!=', '!=': '=='}
+DEFAULT_VALUES = {'int': 0, 'float': 0.0, 'char': '\0', 'void': None}
+NUMERIC = ('int', 'float')
+
+
+class BytecodeError(Exception):
+    """Construção que a VM não executa (ex: aritmética com char)."""
+
+
+def lookup(names: dict, name: str, kind: str, error: type = BytecodeError):
+    # names[name], usado pelos três backends do --run (bytecode.py, transpiler.py e ir.py) para as
+    # variáveis e as funções chamadas. O parser aceita atribuir ou ler o nome de uma função
+    # (f = 3; x = f;) e chamar uma variável (x(1);): aí o nome não está no dicionário do tipo
+    # esperado e o erro sai no tipo de exceção do backend, em vez de um KeyError
+    try:
+        return names[name]
+    except KeyError:
+        raise error(f"'{name}' não é {kind}") from None
+
+
+# Checagens de tipo dos três backends do --run (o front end não checa os tipos das expressões).
+# 'void' é o tipo de uma chamada a função sem retorno, que não pode ser usada como valor.
+
+def check_value(value_type: str, error: type = BytecodeError):
+    if value_type == 'void':
+        raise error("Função sem retorno usada como valor")
+
+
+def check_conversion(value_type: str, target_type: str, error: type = BytecodeError):
+    # Só int <-> float tem conversão; um destino void (return numa função sem retorno) descarta o valor
+    if value_type == target_type or target_type == 'void':
+        return
+    check_value(value_type, error)
+    if value_type not in NUMERIC or target_type not in NUMERIC:
+        raise error(f"Conversão de {value_type} para {target_type}")
+
+
+def check_comparison(left_type: str, right_type: str, error: type = BytecodeError):
+    # char só se compara com char
+    check_value(left_type, error)
+    check_value(right_type, error)
+    if (left_type == 'char') != (right_type == 'char'):
+        raise error(f"Comparação entre {left_type} e {right_type}")
+
+
+@dataclass
+class CodeObject:
+    name: str
+    code: array  # instruções, com os tamanhos de INSTRUCTION_SIZE
+    consts: list
+    nparams: int
+    defaults: list  # valor inicial de cada slot: parâmetros e variáveis, na ordem da tabela
+    return_type: str
+    slot_names: list
+    memoize: bool = False  # Pura e memoizável (purity.py): com memo, a VM guarda o resultado pelos argumentos
+
+
+@dataclass
+class BytecodeProgram:
+    functions: list[CodeObject]
+    index: dict[str, int]  # nome da função -> posição em functions (argumento do CALL)
+
+    def function(self, name: str) -> CodeObject:
+        return self.functions[self.index[name]]
+
+
+def char_value(lexeme: str) -> str:
+    # "'A'" -> 'A'; escapes como '\n' e '\'' são decodificados
+    inner = lexeme[1:-1] if len(lexeme) >= 2 and lexeme[0] == lexeme[-1] == "'" else lexeme
+    return codecs.decode(inner, 'unicode_escape') if inner.startswith('\\') else inner
+
+
+def format_parts(fmt_string: str, argc: int) -> tuple[str, ...]:
+    # Texto entre os '{}' do println, com exatamente argc + 1 partes (placeholders sem argumento
+    # ficam no texto; argumentos sem placeholder saem separados por espaço)
+    text = fmt_string[1:-1] if len(fmt_string) >= 2 and fmt_string[0] == fmt_string[-1] == '"' else fmt_string
+    parts = text.split('{}')
+    if len(parts) > argc + 1:
+        parts = parts[:argc] + ['{}'.join(parts[argc:])]
+    while len(parts) < argc + 1:
+        parts[-1:] = [parts[-1] + ' ', '']
+    return tuple(parts)
+
+
+class CodeBuilder:
+    # Código e pool de constantes de uma função em construção (base dos compiladores de bytecode)
+    def __init__(self):
+        self.code = array('l')
+        self.consts = []
+        self._const_index = {}
+
+    def emit(self, op: int, *args: int) -> int:
+        # Devolve a posição do último inteiro da instrução (onde fica o destino de um salto)
+        code = self.code
+        code.append(op)
+        code.extend(args or (0,))
+        return len(code) - 1
+
+    def patch(self, position: int, target: int | None = None):
+        self.code[position] = len(self.code) if target is None else target
+
+    def const(self, value) -> int:
+        key = (type(value), value)
+        index = self._const_index.get(key)
+        if index is None:
+            index = self._const_index[key] = len(self.consts)
+            self.consts.append(value)
+        return index
+
+
+class FunctionCompiler(CodeBuilder):
+    def __init__(self, func, table: dict, program: 'BytecodeCompiler'):
+        super().__init__()
+        self.func = func
+        self.program = program
+        self.slots = {name: slot for slot, name in enumerate(table)}
+        self.types = [entry.tipo for entry in table.values()]
+
+    def compile(self) -> CodeObject:
+        func = self.func
+        statements = func.body.statements
+        self.block(statements)
+        if not statements or type(statements[-1]).__name__ != 'ReturnStmt':
+            self.emit(LOAD_CONST, self.const(DEFAULT_VALUES.get(func.return_type)))
+            self.emit(RETURN)
+        return CodeObject(func.name, self.code, self.consts, len(func.params),
+                          [DEFAULT_VALUES.get(t) for t in self.types], func.return_type, list(self.slots))
+
+    # --- Comandos ---
+
+    def block(self, statements: list):
+        for stmt in statements:
+            kind = type(stmt).__name__
+            if kind == 'Assign':
+                slot = lookup(self.slots, stmt.name, 'uma variável')
+                if not self.increment(slot, stmt.value):
+                    self.coerce(self.expression(stmt.value), self.types[slot])
+                    self.emit(STORE_LOCAL, slot)
+            elif kind == 'IfStmt':
+                self.if_statement(stmt)
+            elif kind == 'WhileStmt':
+                # JUMP para o teste; o teste, depois do corpo, volta ao corpo enquanto a condição vale
+                entry = self.emit(JUMP)
+                body = len(self.code)
+                self.block(stmt.body.statements)
+                self.patch(entry)
+                self.jump_unless(stmt.condition, body, negate=True)
+            elif kind == 'PrintlnStmt':
+                parts = format_parts(stmt.fmt_string, len(stmt.args))
+                for arg in stmt.args:
+                    check_value(self.expression(arg))
+                self.emit(PRINT, self.const(parts))
+            elif kind == 'ReturnStmt':
+                if is_self_tail_call(stmt, self.func.name):
+                    self.tail_call(stmt.value)
+                else:
+                    self.coerce(self.expression(stmt.value), self.func.return_type)
+                    self.emit(RETURN)
+            elif kind == 'FunctionCall':
+                self.call(stmt)
+                self.emit(POP)
+            # VarDecl: os slots já existem (valores iniciais em CodeObject.defaults)
+
+    def increment(self, slot: int, value) -> bool:
+        # x = x + c / x = x - c, com c numérico e sem mudar o tipo de x, vira um INCREMENT
+        if type(value).__name__ != 'BinOp' or value.op not in '+-':
+            return False
+        left, right = value.left, value.right
+        if type(left).__name__ != 'VarAccess' or self.slots.get(left.name) != slot:
+            return False
+        if type(right).__name__ != 'Literal' or right.type not in NUMERIC:
+            return False
+        if self.types[slot] not in NUMERIC or (self.types[slot] == 'int' and right.type == 'float'):
+            return False
+        step = right.value if value.op == '+' else -right.value
+        self.emit(INCREMENT, slot, self.const(float(step) if self.types[slot] == 'float' else step))
+        return True
+
+    def if_statement(self, stmt):
+        skip_then = self.jump_unless(stmt.condition)
+        self.block(stmt.then_branch.statements)
+        branch = stmt.else_branch
+        if branch is None:
+            self.patch(skip_then)
+            return
+        then = stmt.then_branch.statements
+        skip_else = None if then and type(then[-1]).__name__ == 'ReturnStmt' else self.emit(JUMP)
+        self.patch(skip_then)
+        if type(branch).__name__ == 'IfStmt':
+            self.if_statement(branch)
+        else:
+            self.block(branch.statements)
+        if skip_else is not None:
+            self.patch(skip_else)
+
+    def jump_unless(self, condition, target: int = 0, negate: bool = False) -> int:
+        # Salta para target se a condição for falsa (com negate, se for verdadeira); devolve a posição
+        # do destino no código, para quem ainda não o conhece
+        if type(condition).__name__ == 'BinOp' and condition.op in JUMP_OFFSET:
+            offset = JUMP_OFFSET[NEGATED[condition.op] if negate else condition.op]
+            left = self.operand(condition.left)
+            right = self.operand(condition.right)
+            if left is not None and left[0] == 'local' and right is not None:
+                check_comparison(left[2], right[2])
+                base = JUMP_IF_NOT_LT_LL if right[0] == 'local' else JUMP_IF_NOT_LT_LC
+                return self.emit(base + offset, left[1], right[1], target)
+            check_comparison(self.expression(condition.left), self.expression(condition.right))
+            return self.emit(JUMP_IF_NOT_LT + offset, target)
+        check_value(self.expression(condition))
+        if negate:
+            self.emit(LOAD_CONST, self.const(0))
+            return self.emit(JUMP_IF_NOT_EQ, target)
+        return self.emit(JUMP_IF_FALSE, target)
+
+    # --- Expressões ---
+
+    def coerce(self, value_type: str, target_type: str):
+        check_conversion(value_type, target_type)
+        if value_type == target_type or target_type == 'void':
+            return
+        self.emit(TO_FLOAT if target_type == 'float' else TO_INT)
+
+    def arguments(self, node):
+        # Empilha os argumentos de uma chamada, convertidos para os tipos dos parâmetros
+        callee = self.program.signature(node.name)
+        if len(node.args) != len(callee.params):
+            raise BytecodeError(f"'{node.name}' espera {len(callee.params)} argumentos, recebeu {len(node.args)}")
+        for arg, param in zip(node.args, callee.params):
+            self.coerce(self.expression(arg), param.type)
+        return callee
+
+    def call(self, node) -> str:
+        callee = self.arguments(node)
+        self.emit(CALL, self.program.index[node.name])
+        return callee.return_type
+
+    def tail_call(self, node):
+        # return f(...) dentro de f: os argumentos vão para os slots dos parâmetros, as variáveis
+        # voltam ao valor inicial e a execução salta para o começo, sem CALL nem frame novo
+        nparams = len(self.arguments(node).params)
+        for slot in reversed(range(nparams)):
+            self.emit(STORE_LOCAL, slot)
+        for slot in range(nparams, len(self.types)):
+            self.emit(LOAD_CONST, self.const(DEFAULT_VALUES.get(self.types[slot])))
+            self.emit(STORE_LOCAL, slot)
+        self.emit(JUMP, 0)
+
+    def expression(self, node) -> str:
+        # Emite o código que deixa o valor na pilha e devolve o tipo estático dele
+        kind = type(node).__name__
+        if kind == 'VarAccess':
+            slot = lookup(self.slots, node.name, 'uma variável')
+            self.emit(LOAD_LOCAL, slot)
+            return self.types[slot]
+        if kind == 'Literal':
+            value = char_value(node.value) if node.type == 'char' else node.value
+            self.emit(LOAD_CONST, self.const(value))
+            return node.type
+        if kind == 'FunctionCall':
+            return self.call(node)
+        if kind != 'BinOp':
+            raise BytecodeError(f"Expressão não suportada: {kind}")
+
+        # Cadeias longas à esquerda (a + b + c + ...) sem recursão em Python
+        chain = []
+        while type(node).__name__ == 'BinOp' and node.op not in JUMP_OFFSET:
+            chain.append(node)
+            node = node.left
+        if chain:
+            left_type = self.expression(node)
+            for binop in reversed(chain):
+                left_type = self.arithmetic(binop, left_type)
+            return left_type
+
+        check_comparison(self.expression(node.left), self.expression(node.right))
+        self.emit(COMPARE, COMPARISONS.index(node.op))
+        return 'int'
+
+    def operand(self, node) -> tuple[str, int, str] | None:
+        # (modo, argumento, tipo) de uma folha que pode ir no argumento da instrução
+        kind = type(node).__name__
+        if kind == 'VarAccess':
+            slot = lookup(self.slots, node.name, 'uma variável')
+            return 'local', slot, self.types[slot]
+        if kind == 'Literal':
+            value = char_value(node.value) if node.type == 'char' else node.value
+            return 'const', self.const(value), node.type
+        return None
+
+    def arithmetic(self, node, left_type: str) -> str:
+        operand = self.operand(node.right)
+        right_type = self.expression(node.right) if operand is None else operand[2]
+        if left_type not in NUMERIC or right_type not in NUMERIC:
+            raise BytecodeError(f"Operação '{node.op}' entre {left_type} e {right_type}")
+        result = 'float' if 'float' in (left_type, right_type) else 'int'
+        if node.op == '/':
+            offset = 3 if result == 'int' else 4
+        else:
+            offset = ARITHMETIC_OFFSET[node.op]
+        if operand is None:
+            self.emit(ADD + offset)
+        else:
+            self.emit((ADD_LOCAL if operand[0] == 'local' else ADD_CONST) + offset, operand[1])
+        return result
+
+
+class BytecodeCompiler:
+    """Compila as funções de um programa, na ordem do fonte.
+
+    As chamadas são resolvidas pelo índice da função no programa; como no parser, uma função só
+    chama a si mesma ou as declaradas antes dela.
+    """
+
+    def __init__(self):
+        self.functions = []
+        self.index = {}
+        self._decls = {}
+
+    def signature(self, name: str):
+        return lookup(self._decls, name, 'uma função')
+
+    def compile_function(self, func, table: dict) -> CodeObject:
+        self.index[func.name] = len(self.functions)
+        self._decls[func.name] = func
+        self.functions.append(None)
+        code = FunctionCompiler(func, table, self).compile()
+        self.functions[self.index[func.name]] = code
+        return code
+
+    def compile_program(self, function_asts: dict, function_tables: dict) -> BytecodeProgram:
+        memoizable = analyze(function_asts).memoizable
+        for name, func in function_asts.items():
+            self.compile_function(func, function_tables[name]).memoize = name in memoizable
+        return BytecodeProgram(self.functions, self.index)
+
+
+def compile_program(function_asts: dict, function_tables: dict) -> BytecodeProgram:
+    return BytecodeCompiler().compile_program(function_asts, function_tables)
+
+
+def disassemble(code: CodeObject) -> str:
+    lines = [f"fn {code.name} ({code.nparams} parâmetros, {len(code.defaults)} slots)"]
+    pc = 0
+    while pc < len(code.code):
+        op = code.code[pc]
+        args = list(code.code[pc + 1:pc + INSTRUCTION_SIZE[op]])
+        name = OPCODE_NAMES[op]
+        if JUMP_IF_NOT_LT_LL <= op <= JUMP_IF_NOT_NE_LC:
+            right = code.slot_names[args[1]] if name.endswith('_LL') else repr(code.consts[args[1]])
+            detail = f"{code.slot_names[args[0]]}, {right} -> {args[2]}"
+        elif op == INCREMENT:
+            detail = f"{args[0]} ({code.slot_names[args[0]]}) += {code.consts[args[1]]!r}"
+        elif name.endswith('_LOCAL') or op == STORE_LOCAL:
+            detail = f"{args[0]} ({code.slot_names[args[0]]})"
+        elif name.endswith('_CONST') or op == PRINT:
+            detail = f"{args[0]} ({code.consts[args[0]]!r})"
+        elif op == COMPARE:
+            detail = COMPARISONS[args[0]]
+        elif op in (JUMP, JUMP_IF_FALSE, CALL) or JUMP_IF_NOT_LT <= op <= JUMP_IF_NOT_NE:
+            detail = str(args[0])
+        else:
+            detail = ''
+        lines.append(f"  {pc:>5} {name:<22} {detail}".rstrip())
+        pc += INSTRUCTION_SIZE[op]
+    return '\n'.join(lines)
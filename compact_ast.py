@@ -0,0 +1,333 @@
+# Arquivo: compact_ast.py
+# Formas compactas da AST para programas grandes. As duas são passadas ao Parser/LL1Parser em
+# nodes=... (o padrão continua sendo o módulo ast_nodes):
+#  - SLOTTED_NODES: as mesmas classes de ast_nodes (mesmos nomes e campos), com __slots__;
+#  - AstArena: a árvore inteira em arrays paralelos (tipo, dados e filhos de cada nó), com nós
+#    identificados por inteiros e strings internadas numa tabela.
+from array import array
+from dataclasses import MISSING, field, fields, make_dataclass
+from types import SimpleNamespace
+from typing import Iterator
+
+import ast_nodes
+
+NODE_CLASSES = (
+    ast_nodes.Program, ast_nodes.FunctionDecl, ast_nodes.Param, ast_nodes.Block, ast_nodes.VarDecl,
+    ast_nodes.Assign, ast_nodes.IfStmt, ast_nodes.WhileStmt, ast_nodes.PrintlnStmt, ast_nodes.ReturnStmt,
+    ast_nodes.BinOp, ast_nodes.Literal, ast_nodes.VarAccess, ast_nodes.FunctionCall,
+)
+
+# Nós com o endereço resolvido da variável (não é campo, não vai para o JSON)
+RESOLVABLE = ('Assign', 'VarAccess')
+
+
+# --- Nós com __slots__ ---
+
+class SlotNode:
+    __slots__ = ()
+
+
+def _slotted(cls):
+    spec = [(f.name, f.type) if f.default is MISSING else (f.name, f.type, field(default=f.default))
+            for f in fields(cls)]
+    twin = make_dataclass(cls.__name__, spec, bases=(SlotNode,), slots=True, namespace={'__module__': __name__})
+    if cls.__name__ not in RESOLVABLE:
+        return twin
+    field_names = [f.name for f in fields(cls)]
+
+    class Resolvable(twin):
+        __slots__ = ('resolved',)
+
+        def __init__(self, *args, resolved=None, **kwargs):
+            twin.__init__(self, *args, **kwargs)
+            self.resolved = resolved
+
+        # Estado para pickle: os campos e o endereço resolvido, que não é campo
+        def __getstate__(self):
+            return tuple(getattr(self, name) for name in field_names), self.resolved
+
+        def __setstate__(self, state):
+            for name, value in zip(field_names, state[0]):
+                setattr(self, name, value)
+            self.resolved = state[1]
+
+    Resolvable.__name__ = Resolvable.__qualname__ = cls.__name__
+    return Resolvable
+
+
+SLOTTED_NODES = SimpleNamespace(AstNode=SlotNode, **{cls.__name__: _slotted(cls) for cls in NODE_CLASSES})
+# As classes também ficam no módulo (compact_ast.BinOp etc.), o que permite serializá-las com pickle
+globals().update({cls.__name__: getattr(SLOTTED_NODES, cls.__name__) for cls in NODE_CLASSES})
+
+
+# --- Arena ---
+
+NODE_KINDS = tuple(cls.__name__ for cls in NODE_CLASSES)
+(PROGRAM, FUNCTION_DECL, PARAM, BLOCK, VAR_DECL, ASSIGN, IF_STMT, WHILE_STMT, PRINTLN_STMT, RETURN_STMT,
+ BIN_OP, LITERAL, VAR_ACCESS, FUNCTION_CALL) = range(len(NODE_KINDS))
+
+# Tipos cujos "filhos" em children são ids de string, e não de nós
+STRING_CHILDREN = frozenset([VAR_DECL])
+
+NO_VALUE = -1
+
+
+class AstArena:
+    """AST em arrays paralelos: um nó é um índice e custa alguns bytes em cada array.
+
+    Por nó: kinds (tipo), data (id de string ou de constante), extra (segundo dado: tipo,
+    endereço resolvido ou presença do else) e first/count (fatia do nó em children). Os filhos
+    são criados antes dos pais, então todo filho tem id menor que o do pai. O endereço resolvido
+    de Assign/VarAccess fica em depths/slots, e extra guarda a posição dele nesses arrays.
+
+    Os construtores têm os nomes e parâmetros das classes de ast_nodes e devolvem o id do nó,
+    para que o parser monte a arena sem saber em qual forma está construindo.
+    """
+
+    def __init__(self):
+        self.kinds = array('B')
+        self.data = array('i')
+        self.extra = array('i')
+        self.first = array('I')
+        self.count = array('I')
+        self.children = array('i')
+        self.depths = array('I')
+        self.slots = array('I')
+        self.strings = []
+        self.string_ids = {}
+        self.constants = []
+
+    def __len__(self) -> int:
+        return len(self.kinds)
+
+    def intern(self, text: str) -> int:
+        sid = self.string_ids.get(text)
+        if sid is None:
+            sid = self.string_ids[text] = len(self.strings)
+            self.strings.append(text)
+        return sid
+
+    def _add(self, kind: int, data: int, extra: int, children=()) -> int:
+        node = len(self.kinds)
+        self.kinds.append(kind)
+        self.data.append(data)
+        self.extra.append(extra)
+        self.first.append(len(self.children))
+        self.count.append(len(children))
+        self.children.extend(children)
+        return node
+
+    def _address(self, resolved: tuple | None) -> int:
+        if resolved is None:
+            return NO_VALUE
+        depth, slot = resolved
+        self.depths.append(depth)
+        self.slots.append(slot)
+        return len(self.depths) - 1
+
+    # --- Construtores (mesma assinatura das classes de ast_nodes) ---
+    def Program(self, functions: list[int]) -> int:
+        return self._add(PROGRAM, NO_VALUE, NO_VALUE, functions)
+
+    def FunctionDecl(self, name: str, params: list[int], return_type: str, body: int) -> int:
+        return self._add(FUNCTION_DECL, self.intern(name), self.intern(return_type), params + [body])
+
+    def Param(self, name: str, type: str) -> int:
+        return self._add(PARAM, self.intern(name), self.intern(type))
+
+    def Block(self, statements: list[int]) -> int:
+        return self._add(BLOCK, NO_VALUE, NO_VALUE, statements)
+
+    def VarDecl(self, names: list[str], type: str) -> int:
+        return self._add(VAR_DECL, NO_VALUE, self.intern(type), [self.intern(name) for name in names])
+
+    def Assign(self, name: str, value: int, resolved: tuple | None = None) -> int:
+        return self._add(ASSIGN, self.intern(name), self._address(resolved), (value,))
+
+    def IfStmt(self, condition: int, then_branch: int, else_branch: int | None = None) -> int:
+        if else_branch is None:
+            return self._add(IF_STMT, NO_VALUE, 0, (condition, then_branch))
+        return self._add(IF_STMT, NO_VALUE, 1, (condition, then_branch, else_branch))
+
+    def WhileStmt(self, condition: int, body: int) -> int:
+        return self._add(WHILE_STMT, NO_VALUE, NO_VALUE, (condition, body))
+
+    def PrintlnStmt(self, fmt_string: str, args: list[int]) -> int:
+        return self._add(PRINTLN_STMT, self.intern(fmt_string), NO_VALUE, args)
+
+    def ReturnStmt(self, value: int) -> int:
+        return self._add(RETURN_STMT, NO_VALUE, NO_VALUE, (value,))
+
+    def BinOp(self, left: int, op: str, right: int) -> int:
+        return self._add(BIN_OP, self.intern(op), NO_VALUE, (left, right))
+
+    def Literal(self, value: int | float | str, type: str) -> int:
+        self.constants.append(value)
+        return self._add(LITERAL, len(self.constants) - 1, self.intern(type))
+
+    def VarAccess(self, name: str, resolved: tuple | None = None) -> int:
+        return self._add(VAR_ACCESS, self.intern(name), self._address(resolved))
+
+    def FunctionCall(self, name: str, args: list[int]) -> int:
+        return self._add(FUNCTION_CALL, self.intern(name), NO_VALUE, args)
+
+    # --- Leitura ---
+    def kind(self, node: int) -> str:
+        return NODE_KINDS[self.kinds[node]]
+
+    def child_ids(self, node: int) -> array:
+        # Filhos que são nós (vazio para VarDecl, cujos "filhos" são nomes)
+        if self.kinds[node] in STRING_CHILDREN:
+            return array('i')
+        first = self.first[node]
+        return self.children[first:first + self.count[node]]
+
+    def string(self, node: int) -> str:
+        return self.strings[self.data[node]]
+
+    def resolved(self, node: int) -> tuple | None:
+        address = self.extra[node]
+        return None if address == NO_VALUE else (self.depths[address], self.slots[address])
+
+    def cursor(self, node: int) -> 'NodeCursor':
+        return NodeCursor(self, node)
+
+    def walk(self, root: int) -> Iterator[int]:
+        # Pré-ordem iterativa: a profundidade da árvore não esbarra no limite de recursão
+        kinds, first, count, children = self.kinds, self.first, self.count, self.children
+        stack = [root]
+        while stack:
+            node = stack.pop()
+            yield node
+            if kinds[node] not in STRING_CHILDREN:
+                start = first[node]
+                stack.extend(reversed(children[start:start + count[node]]))
+
+    def to_node(self, root: int, nodes=ast_nodes):
+        # Reconstrói a subárvore como objetos (ast_nodes ou SLOTTED_NODES). Como filhos têm id
+        # menor que o pai, basta construir os nós em ordem crescente de id.
+        built = {}
+        for node in sorted(self.walk(root)):
+            built[node] = self._build(node, built, nodes)
+        return built[root]
+
+    def _build(self, node: int, built: dict, nodes):
+        kind = self.kinds[node]
+        first = self.first[node]
+        kids = self.children[first:first + self.count[node]]
+        strings = self.strings
+        if kind == VAR_DECL:
+            return nodes.VarDecl(names=[strings[sid] for sid in kids], type=strings[self.extra[node]])
+        kids = [built[child] for child in kids]
+        if kind == BIN_OP:
+            return nodes.BinOp(left=kids[0], op=self.string(node), right=kids[1])
+        if kind == VAR_ACCESS:
+            return nodes.VarAccess(name=self.string(node), resolved=self.resolved(node))
+        if kind == LITERAL:
+            return nodes.Literal(value=self.constants[self.data[node]], type=strings[self.extra[node]])
+        if kind == FUNCTION_CALL:
+            return nodes.FunctionCall(name=self.string(node), args=kids)
+        if kind == ASSIGN:
+            return nodes.Assign(name=self.string(node), value=kids[0], resolved=self.resolved(node))
+        if kind == BLOCK:
+            return nodes.Block(statements=kids)
+        if kind == IF_STMT:
+            return nodes.IfStmt(condition=kids[0], then_branch=kids[1], else_branch=kids[2] if self.extra[node] else None)
+        if kind == WHILE_STMT:
+            return nodes.WhileStmt(condition=kids[0], body=kids[1])
+        if kind == PRINTLN_STMT:
+            return nodes.PrintlnStmt(fmt_string=self.string(node), args=kids)
+        if kind == RETURN_STMT:
+            return nodes.ReturnStmt(value=kids[0])
+        if kind == PARAM:
+            return nodes.Param(name=self.string(node), type=strings[self.extra[node]])
+        if kind == FUNCTION_DECL:
+            return nodes.FunctionDecl(name=self.string(node), params=kids[:-1], return_type=strings[self.extra[node]],
+                                      body=kids[-1])
+        return nodes.Program(functions=kids)
+
+
+class NodeCursor:
+    """Visão de um nó da arena com os mesmos nomes de campo das classes de ast_nodes.
+
+    Campos que são nós (ou listas de nós) devolvem novos cursores; os demais devolvem o valor.
+    """
+    __slots__ = ('arena', 'node')
+
+    def __init__(self, arena: AstArena, node: int):
+        self.arena = arena
+        self.node = node
+
+    @property
+    def kind(self) -> str:
+        return NODE_KINDS[self.arena.kinds[self.node]]
+
+    @property
+    def children(self) -> list['NodeCursor']:
+        return [NodeCursor(self.arena, child) for child in self.arena.child_ids(self.node)]
+
+    def __getattr__(self, name: str):
+        getter = CURSOR_FIELDS[self.arena.kinds[self.node]].get(name)
+        if getter is None:
+            raise AttributeError(f"{self.kind} não tem o campo '{name}'")
+        return getter(self)
+
+    def __eq__(self, other):
+        return isinstance(other, NodeCursor) and self.arena is other.arena and self.node == other.node
+
+    def __hash__(self):
+        return hash((id(self.arena), self.node))
+
+    def __repr__(self):
+        return f"NodeCursor({self.kind}#{self.node})"
+
+
+def _child(index: int):
+    return lambda c: NodeCursor(c.arena, c.arena.child_ids(c.node)[index])
+
+
+def _text(c: NodeCursor) -> str:
+    return c.arena.string(c.node)
+
+
+def _extra_text(c: NodeCursor) -> str:
+    return c.arena.strings[c.arena.extra[c.node]]
+
+
+def _child_list(c: NodeCursor) -> list[NodeCursor]:
+    return c.children
+
+
+CURSOR_FIELDS = {
+    PROGRAM: {'functions': _child_list},
+    FUNCTION_DECL: {'name': _text, 'return_type': _extra_text, 'params': lambda c: c.children[:-1],
+                    'body': lambda c: c.children[-1]},
+    PARAM: {'name': _text, 'type': _extra_text},
+    BLOCK: {'statements': _child_list},
+    VAR_DECL: {'names': lambda c: [c.arena.strings[sid] for sid in
+                                   c.arena.children[c.arena.first[c.node]:c.arena.first[c.node] + c.arena.count[c.node]]],
+               'type': _extra_text},
+    ASSIGN: {'name': _text, 'value': _child(0), 'resolved': lambda c: c.arena.resolved(c.node)},
+    IF_STMT: {'condition': _child(0), 'then_branch': _child(1),
+              'else_branch': lambda c: _child(2)(c) if c.arena.extra[c.node] else None},
+    WHILE_STMT: {'condition': _child(0), 'body': _child(1)},
+    PRINTLN_STMT: {'fmt_string': _text, 'args': _child_list},
+    RETURN_STMT: {'value': _child(0)},
+    BIN_OP: {'left': _child(0), 'op': _text, 'right': _child(1)},
+    LITERAL: {'value': lambda c: c.arena.constants[c.arena.data[c.node]], 'type': _extra_text},
+    VAR_ACCESS: {'name': _text, 'resolved': lambda c: c.arena.resolved(c.node)},
+    FUNCTION_CALL: {'name': _text, 'args': _child_list},
+}
+
+
+class ArenaVisitor:
+    """Percorre uma subárvore da arena em pré-ordem, sem recursão, chamando visit_<Tipo>(id)
+    para cada nó que tiver método correspondente."""
+
+    def visit(self, arena: AstArena, root: int):
+        handlers = [getattr(self, 'visit_' + kind, None) for kind in NODE_KINDS]
+        kinds = arena.kinds
+        for node in arena.walk(root):
+            handler = handlers[kinds[node]]
+            if handler is not None:
+                handler(node)
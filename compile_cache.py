@@ -0,0 +1,233 @@
+# Arquivo: compile_cache.py
+# Cache em disco endereçado por conteúdo: a chave é o hash do fonte, das opções que mudam a saída
+# e da versão do compilador (hash do código dos módulos que produzem a saída). Cada entrada é um
+# arquivo marshal com os tokens (em arrays), os erros já formatados e as tabelas/ASTs no formato
+# binário do serializer. O descarte é LRU pela data de modificação dos arquivos, que um acerto
+# atualiza; assim vários processos (modo batch) podem usar o mesmo diretório sem um índice comum.
+import hashlib
+import json
+import marshal
+import os
+from array import array
+
+from lexer import TokenStream
+
+CACHE_MAGIC = b'PCC\x01'
+DEFAULT_CACHE_DIR = '.pcache'
+DEFAULT_MAX_SIZE = 256 * 1024 * 1024
+STATS_FILE = 'stats.json'
+
+# Módulos cujo código decide tokens, erros, tabelas, ASTs e os code objects do backend python: mudou
+# algum, as entradas antigas não casam
+COMPILER_MODULES = ('lexer.py', 'parser.py', 'll1_parser.py', 'symbol_table.py', 'diagnostics.py',
+                    'ast_nodes.py', 'serializer.py', 'optimizer.py', 'bytecode.py', 'transpiler.py',
+                    'purity.py')
+# Code objects (marshal, ver transpiler.dumps_code) ficam ao lado das entradas, com outra extensão,
+# e entram no mesmo tamanho máximo e no mesmo descarte
+CODE_SUFFIX = '.code'
+
+# Depois de tantas gravações o tamanho do diretório é recontado (outros processos também gravam)
+RESCAN_EVERY = 64
+
+_version = None
+
+
+def compiler_version() -> str:
+    global _version
+    if _version is None:
+        digest = hashlib.sha256()
+        base = os.path.dirname(os.path.abspath(__file__))
+        for name in COMPILER_MODULES:
+            with open(os.path.join(base, name), 'rb') as f:
+                digest.update(f.read())
+        _version = digest.hexdigest()[:16]
+    return _version
+
+
+class CacheEntry:
+    """O que uma compilação produziu, sem os objetos: tokens em arrays, erros como texto e
+    tabelas/ASTs no formato binário do serializer (None quando houve erro léxico)."""
+    __slots__ = ('kinds', 'starts', 'ends', 'lexical_errors', 'lexical_count', 'syntactic_errors',
+                 'syntactic_count', 'tables', 'asts')
+
+    def __init__(self, kinds: array, starts: array, ends: array, lexical_errors: list[str], lexical_count: int,
+                 syntactic_errors: list[str] | None = None, syntactic_count: int = 0,
+                 tables: bytes | None = None, asts: bytes | None = None):
+        self.kinds = kinds
+        self.starts = starts
+        self.ends = ends
+        self.lexical_errors = lexical_errors
+        self.lexical_count = lexical_count
+        self.syntactic_errors = syntactic_errors
+        self.syntactic_count = syntactic_count
+        self.tables = tables
+        self.asts = asts
+
+    @property
+    def token_count(self) -> int:
+        return len(self.kinds)
+
+    def token_stream(self, source) -> TokenStream:
+        # Os tokens de volta, sobre o mesmo fonte (o conteúdo é o da chave)
+        stream = TokenStream(source)
+        stream.kinds, stream.starts, stream.ends = self.kinds, self.starts, self.ends
+        return stream
+
+    def to_bytes(self) -> bytes:
+        return CACHE_MAGIC + marshal.dumps((
+            self.kinds.tobytes(), self.starts.tobytes(), self.ends.tobytes(), self.lexical_errors,
+            self.lexical_count, self.syntactic_errors, self.syntactic_count, self.tables, self.asts))
+
+    @classmethod
+    def from_bytes(cls, payload: bytes) -> 'CacheEntry':
+        if not payload.startswith(CACHE_MAGIC):
+            raise ValueError("Entrada de cache inválida (cabeçalho)")
+        kinds, starts, ends, *rest = marshal.loads(payload[len(CACHE_MAGIC):])
+        return cls(array('B', kinds), array('I', starts), array('I', ends), *rest)
+
+
+class CompileCache:
+    def __init__(self, directory: str = DEFAULT_CACHE_DIR, max_size: int | None = DEFAULT_MAX_SIZE):
+        # max_size None: não descarta nada (quem cria o cache chama evict() quando quiser)
+        self.directory = directory
+        self.max_size = max_size
+        # Contadores deste processo; save_stats os soma aos acumulados no diretório
+        self.hits = 0
+        self.misses = 0
+        self.stores = 0
+        self.evictions = 0
+        self._size = None
+        self._writes = 0
+
+    @staticmethod
+    def key(source: str | bytes, *options) -> str:
+        digest = hashlib.sha256(compiler_version().encode())
+        digest.update(repr(options).encode())
+        digest.update(source.encode('utf-8') if isinstance(source, str) else source)
+        return digest.hexdigest()
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, key + '.bin')
+
+    def get(self, key: str) -> CacheEntry | None:
+        path = self._path(key)
+        try:
+            with open(path, 'rb') as f:
+                entry = CacheEntry.from_bytes(f.read())
+            os.utime(path)
+        except (OSError, ValueError, EOFError, TypeError):
+            # Ausente, descartada por outro processo no meio da leitura ou corrompida
+            self.misses += 1
+            return None
+        self.hits += 1
+        return entry
+
+    def put(self, key: str, entry: CacheEntry):
+        self._write(self._path(key), entry.to_bytes())
+        self.stores += 1
+
+    def get_code(self, key: str) -> bytes | None:
+        # Não conta nos acertos/faltas, que são das compilações
+        path = os.path.join(self.directory, key + CODE_SUFFIX)
+        try:
+            with open(path, 'rb') as f:
+                payload = f.read()
+            os.utime(path)
+        except OSError:
+            return None
+        return payload
+
+    def put_code(self, key: str, payload: bytes):
+        self._write(os.path.join(self.directory, key + CODE_SUFFIX), payload)
+
+    def _write(self, path: str, payload: bytes):
+        os.makedirs(self.directory, exist_ok=True)
+        tmp = f"{path}.{os.getpid()}.tmp"
+        with open(tmp, 'wb') as f:
+            f.write(payload)
+        os.replace(tmp, path)
+        if self.max_size is None:
+            return
+
+        self._writes += 1
+        if self._size is None or self._writes % RESCAN_EVERY == 0:
+            self._size = self.size()
+        else:
+            self._size += len(payload)
+        if self._size > self.max_size:
+            self.evict()
+
+    def _entries(self) -> list[os.DirEntry]:
+        try:
+            with os.scandir(self.directory) as it:
+                return [e for e in it if e.name.endswith(('.bin', CODE_SUFFIX)) and e.is_file()]
+        except FileNotFoundError:
+            return []
+
+    def size(self) -> int:
+        return sum(e.stat().st_size for e in self._entries())
+
+    def evict(self):
+        # Remove as entradas usadas há mais tempo até o diretório caber no limite
+        entries = [(e.stat().st_mtime_ns, e.stat().st_size, e.path) for e in self._entries()]
+        total = sum(size for _, size, _ in entries)
+        entries.sort()
+        for _, size, path in entries:
+            if self.max_size is None or total <= self.max_size:
+                break
+            try:
+                os.remove(path)
+                self.evictions += 1
+            except FileNotFoundError:
+                pass
+            total -= size
+        self._size = total
+
+    def clear(self) -> int:
+        removed = 0
+        for e in self._entries():
+            try:
+                os.remove(e.path)
+                removed += 1
+            except FileNotFoundError:
+                pass
+        try:
+            os.remove(os.path.join(self.directory, STATS_FILE))
+        except FileNotFoundError:
+            pass
+        self._size = 0
+        return removed
+
+    def stats(self) -> dict:
+        # Acumulados no diretório mais os contadores ainda não salvos deste processo
+        totals = self._load_stats()
+        entries = self._entries()
+        return {
+            'hits': totals['hits'] + self.hits,
+            'misses': totals['misses'] + self.misses,
+            'stores': totals['stores'] + self.stores,
+            'evictions': totals['evictions'] + self.evictions,
+            'entries': sum(1 for e in entries if e.name.endswith('.bin')),
+            'size': sum(e.stat().st_size for e in entries),
+            'max_size': self.max_size,
+        }
+
+    def _load_stats(self) -> dict:
+        try:
+            with open(os.path.join(self.directory, STATS_FILE), 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {'hits': 0, 'misses': 0, 'stores': 0, 'evictions': 0}
+
+    def save_stats(self):
+        if not (self.hits or self.misses or self.stores or self.evictions):
+            return
+        totals = self._load_stats()
+        for name in ('hits', 'misses', 'stores', 'evictions'):
+            totals[name] += getattr(self, name)
+            setattr(self, name, 0)
+        os.makedirs(self.directory, exist_ok=True)
+        path = os.path.join(self.directory, STATS_FILE)
+        with open(path + '.tmp', 'w', encoding='utf-8') as f:
+            json.dump(totals, f)
+        os.replace(path + '.tmp', path)
@@ -0,0 +1,113 @@
+# Arquivo: diagnostics.py
+# Diagnósticos estruturados (código, posição e argumentos). O texto da mensagem só é montado
+# quando alguém o lê, então erros em massa (entrada quebrada ou lixo) não pagam formatação.
+
+MESSAGES = {
+    # Léxicos
+    'L001': "Erro Léxico: Caractere inesperado '{0}' na {pos}.",
+    'L002': "Erro Léxico: Caracteres inesperados '{0}' na {pos}.",
+    'L003': "Erro léxico inesperado na {pos}.",
+    # Sintáticos
+    'S001': "Erro Sintático na {pos}: {0} (Encontrado '{1}')",
+    'S002': "Esperado nome de função na {pos}",
+    'S003': "Tipo inválido na {pos}",
+    'S004': "Comando inválido '{0}' na {pos}",
+    'S005': "Esperado '=' ou '(' após ID na {pos}",
+    'S006': "Fator inesperado '{0}' na {pos}",
+    'S007': "Erro Sintático: Token inesperado '{0}' na {pos}.",
+    # Semânticos
+    'E001': "Erro Semântico na {pos}: Identificador '{0}' não declarado.",
+    'E002': "Erro Semântico na {pos}: O identificador '{0}' já foi declarado neste escopo.",
+    # Gerais
+    'G001': "Limite de {0} erros atingido: análise interrompida.",
+}
+
+
+class Diagnostic:
+    """Um erro de compilação com código, argumentos e posição resolvidos sob demanda.
+
+    `where` indica a posição: um token (Token ou TokenRef), um LineIndex junto com `offset`,
+    uma tupla (linha, coluna ou None), um texto já resolvido ou None (fim do arquivo).
+    """
+    __slots__ = ('code', 'args', 'where', 'offset')
+
+    def __init__(self, code: str, args: tuple = (), where=None, offset: int | None = None):
+        self.code = code
+        self.args = args
+        self.where = where
+        self.offset = offset
+
+    @property
+    def position(self) -> str:
+        where = self.where
+        if where is None:
+            return "fim do arquivo"
+        if isinstance(where, str):
+            return where
+        if self.offset is not None:
+            return where.position(self.offset)
+        if isinstance(where, tuple):
+            line, column = where
+            return f"linha {line}" if column is None else f"linha {line}, coluna {column}"
+        return f"linha {where.line}, coluna {where.column}"
+
+    def __str__(self):
+        return MESSAGES[self.code].format(*self.args, pos=self.position)
+
+    def __repr__(self):
+        return f"Diagnostic({self.code}, {str(self)!r})"
+
+    def __eq__(self, other):
+        if isinstance(other, Diagnostic):
+            return self.code == other.code and str(self) == str(other)
+        return NotImplemented
+
+    def __hash__(self):
+        return hash((self.code, str(self)))
+
+    def __reduce__(self):
+        # Entre processos a posição vai resolvida, sem levar o token/LineIndex (e o fonte) junto
+        return Diagnostic, (self.code, tuple(str(arg) for arg in self.args), self.position)
+
+
+class CompileError(Exception):
+    # Levanta um Diagnostic até o ponto de recuperação do parser
+    def __init__(self, diagnostic: Diagnostic):
+        super().__init__(diagnostic)
+        self.diagnostic = diagnostic
+
+    def __str__(self):
+        return str(self.diagnostic)
+
+
+class DiagnosticList(list):
+    """Lista de diagnósticos com limite opcional de erros.
+
+    report() devolve False quando o limite é atingido; nesse caso um diagnóstico G001 é
+    acrescentado no fim e quem analisa deve parar.
+    """
+
+    def __init__(self, max_errors: int | None = None):
+        super().__init__()
+        self.max_errors = max_errors
+        self.limit_reached = False
+
+    def report(self, diagnostic: Diagnostic | str) -> bool:
+        if self.limit_reached:
+            return False
+        self.append(diagnostic)
+        if self.max_errors is not None and len(self) >= self.max_errors:
+            self.limit_reached = True
+            self.append(Diagnostic('G001', (self.max_errors,)))
+            return False
+        return True
+
+    def error_count(self) -> int:
+        return len(self) - 1 if self.limit_reached else len(self)
+
+
+def diagnostic_of(error: Exception) -> Diagnostic | str:
+    # Erros inesperados (ex: RecursionError) não têm código e entram só como texto
+    if isinstance(error, CompileError):
+        return error.diagnostic
+    return str(error)
@@ -0,0 +1,244 @@
+# Arquivo: incremental.py
+# Compilação incremental de um arquivo em edição: guarda os tokens (TokenStream), e a AST e a
+# tabela de cada função. Numa edição (trecho do texto + substituição) só a região afetada é
+# relexada e só as funções cujos tokens mudaram são reanalisadas; as outras são reaproveitadas.
+# O resultado é sempre o mesmo de um léxico + Parser.parse_program completos sobre o novo texto.
+import marshal
+from array import array
+from bisect import bisect_left
+
+from diagnostics import DiagnosticList
+from lexer import Lexer, LineIndex, TokenStream
+from parallel_parser import function_spans
+from parser import Parser
+from symbol_table import TableEntry
+import serializer
+
+# O léxico olha até 2 caracteres depois de um token ('3' + '.5'); tokens que terminam mais perto
+# que isso do início da edição são relexados
+LOOKAHEAD = 2
+
+
+def _binary_content(data) -> tuple:
+    # Operações e valores do formato binário (os bytes do marshal variam com o compartilhamento de strings)
+    return marshal.loads(serializer.dumps_binary(data)[len(serializer.BINARY_MAGIC):])
+
+
+class FunctionState:
+    # Resultado de uma função analisada sem erro: trecho de tokens, tabela, AST e entrada global
+    __slots__ = ('start', 'end', 'name', 'table', 'ast', 'entry')
+
+    def __init__(self, start: int, end: int, name: str, table: dict, ast, entry: TableEntry):
+        self.start = start
+        self.end = end
+        self.name = name
+        self.table = table
+        self.ast = ast
+        self.entry = entry
+
+
+def _shift(values: array, delta: int) -> array:
+    return array(values.typecode, map(delta.__add__, values)) if delta else values
+
+
+def _shifted_table(table: dict[str, TableEntry], lines: int) -> dict[str, TableEntry]:
+    return {name: TableEntry(e.lexema, e.tipo, e.num_linha + lines, e.kind) for name, e in table.items()}
+
+
+class IncrementalCompiler:
+    """Léxico + sintático de um texto que recebe edições.
+
+    Depois de cada edit() os atributos tokens, lexical_errors, errors, function_tables e
+    function_asts são os de uma compilação completa do texto novo (como o main.py faz: com erro
+    léxico o sintático não roda). last_edit diz quanto foi refeito.
+    """
+
+    def __init__(self, source: str, engine: str = 'table', max_errors: int | None = None):
+        self.engine = engine
+        self.max_errors = max_errors
+        self.last_edit = None
+        self._load(source)
+
+    # --- Compilação completa ---
+
+    def _load(self, source: str):
+        self.source = source
+        self.tokens, self.lexical_errors = Lexer(source, engine=self.engine, max_errors=self.max_errors).scan_stream()
+        self.functions = []
+        self._parse({})
+
+    def rebuild(self):
+        self._load(self.source)
+
+    # --- Edição ---
+
+    def edit(self, start: int, end: int, text: str):
+        """Substitui source[start:end] por text e atualiza tokens, tabelas, ASTs e erros."""
+        old_source = self.source
+        if not 0 <= start <= end <= len(old_source):
+            raise ValueError(f"Trecho de edição inválido [{start}, {end})")
+        source = old_source[:start] + text + old_source[end:]
+
+        # Com erro léxico antes ou depois da edição, as posições dos erros valem o texto inteiro
+        if self.lexical_errors:
+            self._load(source)
+            self.last_edit = {'full_rebuild': True}
+            return
+
+        delta = len(text) - (end - start)
+        old = self.tokens
+        kinds, starts, ends = old.kinds, old.starts, old.ends
+        size = len(kinds)
+
+        # Recomeça no fim do último token que não enxerga a edição (um ponto de parada válido do léxico)
+        first = bisect_left(ends, start - LOOKAHEAD)
+        lexer = Lexer(source, engine=self.engine, max_errors=self.max_errors)
+        lexer.position = ends[first - 1] if first else 0
+
+        # Relexa até um token novo coincidir com um antigo (deslocado) inteiramente depois da edição:
+        # como o estado do léxico é só a posição, dali em diante os tokens antigos valem
+        new_kinds, new_starts, new_ends = array('B'), array('I'), array('I')
+        resume = bisect_left(starts, end)
+        synced = False
+        for tok in lexer.iter_tokens():
+            if lexer.errors:
+                break
+            tok_start = tok.offset
+            tok_end = tok_start + len(tok.lexeme)
+            kind = tok.token_type.value
+            old_start = tok_start - delta
+            while resume < size and starts[resume] < old_start:
+                resume += 1
+            if resume < size and starts[resume] == old_start and ends[resume] == tok_end - delta \
+                    and kinds[resume] == kind:
+                synced = True
+                break
+            new_kinds.append(kind)
+            new_starts.append(tok_start)
+            new_ends.append(tok_end)
+
+        if lexer.errors:
+            self._load(source)
+            self.last_edit = {'full_rebuild': True}
+            return
+        if not synced:
+            resume = size
+
+        stream = TokenStream(source, self._shifted_lines(source, start, end, text))
+        stream.kinds = kinds[:first] + new_kinds + kinds[resume:]
+        stream.starts = starts[:first] + new_starts + _shift(starts[resume:], delta)
+        stream.ends = ends[:first] + new_ends + _shift(ends[resume:], delta)
+
+        # Funções reaproveitáveis: trecho de tokens intacto e mesmas funções globais antes dela
+        token_shift = first + len(new_kinds) - resume
+        line_shift = text.count('\n') - old_source.count('\n', start, end)
+        suffix = first + len(new_kinds)
+        old_by_start = {state.start: (k, state) for k, state in enumerate(self.functions)}
+
+        self.source = source
+        self.tokens = stream
+        self.lexical_errors = DiagnosticList(self.max_errors)
+        spans = function_spans(stream.kinds, stream.lexeme)
+
+        old_names = [state.name for state in self.functions]
+        common = 0
+        for old_name, (_, _, name) in zip(old_names, spans):
+            if old_name != name:
+                break
+            common += 1
+
+        reuse = {}
+        for k, (span_start, span_end, name) in enumerate(spans[:common]):
+            if span_end <= first:
+                found = old_by_start.get(span_start)
+                if found and found[0] == k and found[1].end == span_end:
+                    reuse[k] = found[1]
+            elif span_start >= suffix:
+                found = old_by_start.get(span_start - token_shift)
+                if found and found[0] == k and found[1].end == span_end - token_shift:
+                    state = found[1]
+                    table = _shifted_table(state.table, line_shift) if line_shift else state.table
+                    reuse[k] = FunctionState(span_start, span_end, name, table, state.ast, state.entry)
+
+        self.functions = []
+        reused, reparsed = self._parse(reuse, spans)
+        self.last_edit = {'full_rebuild': False, 'relexed_tokens': len(new_kinds),
+                          'reused_functions': reused, 'reparsed_functions': reparsed}
+
+    def _shifted_lines(self, source: str, start: int, end: int, text: str) -> LineIndex:
+        # Inícios de linha do texto novo a partir dos antigos, sem varrer o texto inteiro
+        index = LineIndex(source)
+        old_starts = self.tokens.line_index._starts
+        if old_starts is None:
+            return index
+        before = bisect_left(old_starts, start + 1)
+        after = bisect_left(old_starts, end + 1)
+        inserted = array('Q')
+        pos = text.find('\n')
+        while pos != -1:
+            inserted.append(start + pos + 1)
+            pos = text.find('\n', pos + 1)
+        index._starts = old_starts[:before] + inserted + _shift(old_starts[after:], len(text) - (end - start))
+        return index
+
+    # --- Sintático ---
+
+    def _parse(self, reuse: dict[int, FunctionState], spans=None) -> tuple[int, int]:
+        # Mesma sequência de Parser.parse_program, pulando as funções reaproveitadas. Depois do primeiro
+        # erro tudo segue pelo parser, porque a recuperação depende dos tokens que vêm depois.
+        parser = Parser(self.tokens, self.max_errors)
+        self.errors = parser.errors
+        self.function_tables = parser.function_tables
+        self.function_asts = parser.function_asts
+        if self.lexical_errors:
+            return 0, 0
+        if spans is None:
+            spans = function_spans(self.tokens.kinds, self.tokens.lexeme)
+
+        functions = self.functions
+        reused = parsed = 0
+        results = parser.iter_functions()
+        for k, (start, end, name) in enumerate(spans):
+            if parser.errors or parser.current != start:
+                break
+            state = reuse.get(k)
+            if state is not None:
+                parser.symbol_table.add_entry(state.entry)
+                parser.function_tables[name] = state.table
+                parser.function_asts[name] = state.ast
+                parser.current = end
+                functions.append(state)
+                reused += 1
+                continue
+
+            item = next(results, None)
+            if item is None:
+                return reused, parsed
+            parsed += 1
+            func_name, table, func_node = item
+            if func_node is not None:
+                parser.function_asts[func_name] = func_node
+            if parser.errors or parser.current != end or func_name != name:
+                break
+            entry = parser.symbol_table.lookup(name)
+            functions.append(FunctionState(start, end, name, table, func_node, entry))
+
+        for func_name, _, func_node in results:
+            parsed += 1
+            if func_node is not None:
+                parser.function_asts[func_name] = func_node
+        return reused, parsed
+
+    # --- Conferência ---
+
+    def outputs(self) -> tuple:
+        # Tokens, erros, tabelas e ASTs (com os endereços resolvidos) numa forma comparável
+        tokens = self.tokens
+        return (tokens.kinds.tobytes(), tokens.starts.tobytes(), tokens.ends.tobytes(),
+                [str(e) for e in self.lexical_errors], [str(e) for e in self.errors],
+                _binary_content((self.function_tables, self.function_asts)))
+
+    def matches_full_build(self) -> bool:
+        """Compara o estado atual com uma compilação completa do texto atual."""
+        full = IncrementalCompiler(self.source, self.engine, self.max_errors)
+        return self.outputs() == full.outputs()
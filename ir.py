@@ -0,0 +1,607 @@
+# Arquivo: ir.py
+# Representação intermediária em SSA, de três endereços, construída a partir das ASTs (ast_nodes ou
+# SLOTTED_NODES) e das tabelas de símbolos. Cada função vira um grafo de fluxo de controle (CFG) de
+# blocos básicos: o corpo de um bloco é uma lista de instruções com no máximo dois operandos e um
+# destino (Binary, Convert, Call, Print, Copy), os phis ficam no começo do bloco e o fim é sempre um
+# terminador (Jump, Branch ou Return). if/else vira um Branch para os dois ramos e um bloco de
+# junção; while vira um bloco de cabeçalho com a condição, o corpo (que volta ao cabeçalho) e o
+# bloco de saída; depois de um return o código continua num bloco sem predecessores. Numa função com
+# chamadas de cauda a si mesma (return f(...)), o corpo começa num bloco depois da entrada, e cada
+# chamada dessas vira um Jump de volta para ele com os argumentos nos parâmetros: um laço na IR.
+#
+# A SSA é montada durante a tradução, pelo algoritmo de Braun et al. ("Simple and Efficient
+# Construction of Static Single Assignment Form"): cada leitura de variável procura a definição no
+# bloco e, se não achar, nos predecessores, criando phis nas junções; o cabeçalho de um while só é
+# selado depois do corpo, quando todos os seus predecessores são conhecidos. Uma atribuição vira um
+# Copy para um valor novo (a propagação de cópias de ir_passes.py os remove). Os tipos são os do
+# bytecode.py: a divisão é '/i' (inteiros, truncada em direção a zero) ou '/f', as conversões int
+# <-> float são instruções Convert e as comparações valem 0/1.
+#
+# Os passes ficam em ir_passes.py e a geração de bytecode para a VM a partir da IR, em ir_bytecode.py.
+from dataclasses import dataclass, field
+
+from bytecode import (DEFAULT_VALUES, NUMERIC, char_value, check_comparison, check_conversion, check_value,
+                      format_parts, lookup)
+from purity import PurityInfo, analyze, is_self_tail_call
+
+COMPARISONS = ('<', '<=', '>', '>=', '==', '!=')
+
+
+class IrError(Exception):
+    """Construção que a IR não representa (ex: aritmética com char)."""
+
+
+# --- Operandos ---
+
+@dataclass(eq=False)
+class Value:
+    """Resultado de uma instrução (ou parâmetro); comparado por identidade."""
+    id: int
+    type: str
+    name: str | None = None  # Variável de origem, só para leitura humana
+
+    def __repr__(self) -> str:
+        return f"%{self.name}.{self.id}" if self.name else f"%{self.id}"
+
+
+@dataclass(frozen=True)
+class Const:
+    value: object
+    type: str
+
+    def __repr__(self) -> str:
+        return repr(self.value)
+
+
+def operand_key(operand):
+    # Chave de um operando para tabelas de hash: o próprio Value ou (tipo, repr) da constante,
+    # para que 0.0 e -0.0 (iguais em ==) não se confundam
+    return operand if isinstance(operand, Value) else (operand.type, repr(operand.value))
+
+
+# --- Instruções ---
+
+@dataclass(eq=False)
+class Instruction:
+    dest: Value | None
+    args: list  # Operandos (Value ou Const); os passes os reescrevem no lugar
+
+    # Sem efeito colateral e sem erro em execução: pode ser removida, reaproveitada ou movida
+    pure = False
+
+
+@dataclass(eq=False)
+class Binary(Instruction):
+    op: str = '+'  # + - * /i /f e as comparações
+
+    @property
+    def pure(self) -> bool:
+        if self.op in ('/i', '/f'):
+            # Divisão por zero é erro de execução; só um divisor constante diferente de zero é seguro
+            divisor = self.args[1]
+            return isinstance(divisor, Const) and divisor.value != 0
+        return True
+
+
+@dataclass(eq=False)
+class Convert(Instruction):
+    to: str = 'float'
+
+    @property
+    def pure(self) -> bool:
+        # int() de um float infinito é erro de execução
+        return self.to == 'float' or isinstance(self.args[0], Const)
+
+
+@dataclass(eq=False)
+class Copy(Instruction):
+    pure = True
+
+
+@dataclass(eq=False)
+class Call(Instruction):
+    function: str = ''
+
+
+@dataclass(eq=False)
+class Print(Instruction):
+    parts: tuple = ()  # Texto entre os argumentos, como em format_parts
+
+
+@dataclass(eq=False)
+class Phi(Instruction):
+    # args[i] vem de block.preds[i]
+    pure = True
+
+
+@dataclass(eq=False)
+class Jump(Instruction):
+    target: 'BasicBlock' = None
+
+
+@dataclass(eq=False)
+class Branch(Instruction):
+    # args[0] diferente de zero: if_true; senão: if_false
+    if_true: 'BasicBlock' = None
+    if_false: 'BasicBlock' = None
+
+
+@dataclass(eq=False)
+class Return(Instruction):
+    pass
+
+
+@dataclass(eq=False)
+class BasicBlock:
+    id: int
+    phis: list = field(default_factory=list)
+    body: list = field(default_factory=list)
+    terminator: Instruction | None = None
+    preds: list = field(default_factory=list)
+
+    @property
+    def succs(self) -> list:
+        term = self.terminator
+        if isinstance(term, Jump):
+            return [term.target]
+        if isinstance(term, Branch):
+            return [term.if_true] if term.if_true is term.if_false else [term.if_true, term.if_false]
+        return []
+
+    def instructions(self):
+        yield from self.phis
+        yield from self.body
+        if self.terminator is not None:
+            yield self.terminator
+
+    def __repr__(self) -> str:
+        return f"b{self.id}"
+
+
+@dataclass(eq=False)
+class IrFunction:
+    name: str
+    params: list  # Values dos parâmetros, na ordem
+    return_type: str
+    blocks: list = field(default_factory=list)  # O primeiro é a entrada
+    next_value: int = 0
+    next_block: int = 0
+    memoize: bool = False  # Pura e memoizável (purity.py), passado ao CodeObject
+
+    @property
+    def entry(self) -> BasicBlock:
+        return self.blocks[0]
+
+    def new_value(self, type_name: str, name: str | None = None) -> Value:
+        value = Value(self.next_value, type_name, name)
+        self.next_value += 1
+        return value
+
+    def new_block(self) -> BasicBlock:
+        block = BasicBlock(self.next_block)
+        self.next_block += 1
+        self.blocks.append(block)
+        return block
+
+    def instruction_count(self) -> int:
+        return sum(len(block.phis) + len(block.body) + 1 for block in self.blocks)
+
+
+@dataclass
+class IrProgram:
+    functions: dict  # nome -> IrFunction, na ordem do fonte
+
+    def instruction_count(self) -> int:
+        return sum(function.instruction_count() for function in self.functions.values())
+
+
+# --- Análises sobre o CFG ---
+
+def reverse_postorder(function: IrFunction) -> list:
+    # Blocos alcançáveis a partir da entrada, em pós-ordem reversa (DFS com pilha explícita). Os
+    # sucessores são visitados do último para o primeiro, então o primeiro (if_true de um Branch)
+    # vem logo depois do bloco
+    order = []
+    seen = {function.entry}
+    stack = [(function.entry, reversed(function.entry.succs))]
+    while stack:
+        block, succs = stack[-1]
+        for succ in succs:
+            if succ not in seen:
+                seen.add(succ)
+                stack.append((succ, reversed(succ.succs)))
+                break
+        else:
+            stack.pop()
+            order.append(block)
+    order.reverse()
+    return order
+
+
+def dominators(function: IrFunction, order: list | None = None) -> dict:
+    """Dominador imediato de cada bloco alcançável (a entrada aponta para si mesma), pelo
+    algoritmo iterativo de Cooper, Harvey e Kennedy."""
+    order = order if order is not None else reverse_postorder(function)
+    position = {block: index for index, block in enumerate(order)}
+    entry = order[0]
+    idom = {entry: entry}
+    changed = True
+    while changed:
+        changed = False
+        for block in order[1:]:
+            new = None
+            for pred in block.preds:
+                if pred not in idom:
+                    continue
+                if new is None:
+                    new = pred
+                    continue
+                a, b = pred, new
+                while a is not b:
+                    while position[a] > position[b]:
+                        a = idom[a]
+                    while position[b] > position[a]:
+                        b = idom[b]
+                new = a
+            if idom.get(block) is not new:
+                idom[block] = new
+                changed = True
+    return idom
+
+
+def dominator_tree(idom: dict) -> dict:
+    children = {block: [] for block in idom}
+    for block, parent in idom.items():
+        if parent is not block:
+            children[parent].append(block)
+    return children
+
+
+def dominates(idom: dict, a: BasicBlock, b: BasicBlock) -> bool:
+    while True:
+        if a is b:
+            return True
+        parent = idom[b]
+        if parent is b:
+            return False
+        b = parent
+
+
+def replace_uses(function: IrFunction, mapping: dict):
+    # Troca cada uso de um Value de mapping pelo seu substituto (seguindo cadeias a -> b -> c)
+    if not mapping:
+        return
+
+    def resolve(operand):
+        while isinstance(operand, Value) and operand in mapping:
+            operand = mapping[operand]
+        return operand
+
+    for block in function.blocks:
+        for inst in block.instructions():
+            args = inst.args
+            for index, arg in enumerate(args):
+                if isinstance(arg, Value) and arg in mapping:
+                    args[index] = resolve(arg)
+
+
+def remove_pred(block: BasicBlock, pred: BasicBlock):
+    # Tira pred de block.preds junto com o operando correspondente de cada phi
+    index = block.preds.index(pred)
+    del block.preds[index]
+    for phi in block.phis:
+        del phi.args[index]
+
+
+def remove_unreachable(function: IrFunction) -> int:
+    # Remove os blocos que a entrada não alcança (o código depois de um return, por exemplo)
+    reachable = set(reverse_postorder(function))
+    removed = [block for block in function.blocks if block not in reachable]
+    for block in removed:
+        for succ in block.succs:
+            if succ in reachable:
+                remove_pred(succ, block)
+    function.blocks = [block for block in function.blocks if block in reachable]
+    return len(removed)
+
+
+# --- Construção a partir da AST ---
+
+class FunctionBuilder:
+    def __init__(self, func, table: dict, program: 'IrBuilder'):
+        self.func = func
+        self.program = program
+        self.types = {name: entry.tipo for name, entry in table.items()}
+        params = [None] * len(func.params)
+        self.function = IrFunction(func.name, params, func.return_type)
+        self.block = None
+        self.definitions = {name: {} for name in self.types}  # variável -> {bloco: valor}
+        self.sealed = set()
+        self.incomplete = {}  # bloco não selado -> {variável: phi}
+        self.start = None  # Destino das chamadas de cauda, se houver alguma
+
+    def build(self) -> IrFunction:
+        function = self.function
+        entry = self.block = self.new_block(seal=True)
+        for index, param in enumerate(self.func.params):
+            value = function.new_value(param.type, param.name)
+            function.params[index] = value
+            self.write(param.name, entry, value)
+        self.reset_locals(entry)
+        if self.program.purity.tail_calls.get(self.func.name):
+            # return f(...) dentro de f salta para um bloco depois da entrada, com phis para as variáveis
+            self.start = self.new_block()
+            self.jump(self.start)
+            self.block = self.start
+        self.statements(self.func.body.statements)
+        if self.block.terminator is None:
+            default = DEFAULT_VALUES.get(function.return_type)
+            self.terminate(Return(None, [Const(default, function.return_type)]))
+        if self.start is not None:
+            self.seal(self.start)
+        remove_unreachable(function)
+        return function
+
+    def reset_locals(self, block: BasicBlock):
+        # As variáveis que não são parâmetros começam (ou recomeçam) com o valor padrão
+        params = {param.name for param in self.func.params}
+        for name, type_name in self.types.items():
+            if name not in params:
+                self.write(name, block, Const(DEFAULT_VALUES.get(type_name), type_name))
+
+    # --- Blocos e variáveis (Braun et al.) ---
+
+    def new_block(self, seal: bool = False) -> BasicBlock:
+        block = self.function.new_block()
+        if seal:
+            self.sealed.add(block)
+        return block
+
+    def emit(self, inst: Instruction) -> Value | None:
+        self.block.body.append(inst)
+        return inst.dest
+
+    def terminate(self, inst: Instruction):
+        block = self.block
+        block.terminator = inst
+        for succ in block.succs:
+            succ.preds.append(block)
+
+    def jump(self, target: BasicBlock):
+        if self.block.terminator is None:
+            self.terminate(Jump(None, [], target=target))
+
+    def write(self, name: str, block: BasicBlock, value):
+        self.definitions[name][block] = value
+
+    def read(self, name: str, block: BasicBlock):
+        definitions = lookup(self.definitions, name, 'uma variável', IrError)
+        chain = []
+        # Cadeias de blocos com um só predecessor, sem recursão
+        while block not in definitions and block in self.sealed and len(block.preds) == 1:
+            chain.append(block)
+            block = block.preds[0]
+        value = definitions[block] if block in definitions else self.read_phi(name, block)
+        for visited in chain:
+            definitions[visited] = value
+        return value
+
+    def read_phi(self, name: str, block: BasicBlock) -> Value:
+        phi = Phi(self.function.new_value(self.types[name], name), [])
+        block.phis.append(phi)
+        self.write(name, block, phi.dest)
+        if block in self.sealed:
+            self.add_phi_operands(name, phi, block)
+        else:
+            self.incomplete.setdefault(block, {})[name] = phi
+        return phi.dest
+
+    def add_phi_operands(self, name: str, phi: Phi, block: BasicBlock):
+        phi.args = [self.read(name, pred) for pred in block.preds]
+
+    def seal(self, block: BasicBlock):
+        for name, phi in self.incomplete.pop(block, {}).items():
+            self.add_phi_operands(name, phi, block)
+        self.sealed.add(block)
+
+    # --- Comandos ---
+
+    def statements(self, statements: list):
+        for stmt in statements:
+            kind = type(stmt).__name__
+            if kind == 'Assign':
+                target_type = lookup(self.types, stmt.name, 'uma variável', IrError)
+                value = self.coerce(self.expression(stmt.value), target_type)
+                dest = self.emit(Copy(self.function.new_value(target_type, stmt.name), [value]))
+                self.write(stmt.name, self.block, dest)
+            elif kind == 'IfStmt':
+                self.if_statement(stmt)
+            elif kind == 'WhileStmt':
+                self.while_statement(stmt)
+            elif kind == 'PrintlnStmt':
+                args = [self.value(arg) for arg in stmt.args]
+                self.emit(Print(None, args, parts=format_parts(stmt.fmt_string, len(stmt.args))))
+            elif kind == 'ReturnStmt':
+                if self.start is not None and is_self_tail_call(stmt, self.func.name):
+                    self.tail_call(stmt.value)
+                else:
+                    value = self.coerce(self.expression(stmt.value), self.function.return_type)
+                    self.terminate(Return(None, [value]))
+                # O que vier depois do return fica num bloco sem predecessores
+                self.block = self.new_block(seal=True)
+            elif kind == 'FunctionCall':
+                self.call(stmt, statement=True)
+            # VarDecl: as variáveis começam com o valor padrão, escrito na entrada
+
+    def branch(self, condition, if_true: BasicBlock, if_false: BasicBlock):
+        self.terminate(Branch(None, [self.value(condition)], if_true=if_true, if_false=if_false))
+
+    def if_statement(self, stmt):
+        then_block = self.new_block()
+        merge = self.new_block()
+        else_block = merge if stmt.else_branch is None else self.new_block()
+        self.branch(stmt.condition, then_block, else_block)
+        self.seal(then_block)
+        self.block = then_block
+        self.statements(stmt.then_branch.statements)
+        self.jump(merge)
+        if else_block is not merge:
+            self.seal(else_block)
+            self.block = else_block
+            branch = stmt.else_branch
+            if type(branch).__name__ == 'IfStmt':
+                self.if_statement(branch)
+            else:
+                self.statements(branch.statements)
+            self.jump(merge)
+        self.seal(merge)
+        self.block = merge
+
+    def while_statement(self, stmt):
+        header = self.new_block()
+        body = self.new_block()
+        exit_block = self.new_block()
+        self.jump(header)
+        self.block = header
+        self.branch(stmt.condition, body, exit_block)
+        self.seal(body)
+        self.block = body
+        self.statements(stmt.body.statements)
+        self.jump(header)
+        # Só agora o cabeçalho conhece todos os predecessores (a entrada e o fim do corpo)
+        self.seal(header)
+        self.seal(exit_block)
+        self.block = exit_block
+
+    # --- Expressões ---
+
+    def value(self, node):
+        # Operando de uma expressão usada só pelo valor (println, condição), que não pode ser void
+        operand = self.expression(node)
+        check_value(operand.type, IrError)
+        return operand
+
+    def coerce(self, operand, target_type: str):
+        check_conversion(operand.type, target_type, IrError)
+        if operand.type == target_type or target_type == 'void':
+            return operand
+        if isinstance(operand, Const):
+            return Const(float(operand.value) if target_type == 'float' else int(operand.value), target_type)
+        return self.emit(Convert(self.function.new_value(target_type), [operand], to=target_type))
+
+    def arguments(self, node) -> list:
+        callee = self.program.signature(node.name)
+        if len(node.args) != len(callee.params):
+            raise IrError(f"'{node.name}' espera {len(callee.params)} argumentos, recebeu {len(node.args)}")
+        return [self.coerce(self.expression(arg), param.type) for arg, param in zip(node.args, callee.params)]
+
+    def call(self, node, statement: bool = False):
+        args = self.arguments(node)
+        dest = None if statement else self.function.new_value(self.program.signature(node.name).return_type)
+        self.emit(Call(dest, args, function=node.name))
+        return dest
+
+    def tail_call(self, node):
+        # Os argumentos viram os novos valores dos parâmetros e a execução volta ao bloco de início
+        # (os phis de lá juntam a entrada e cada chamada de cauda)
+        args = self.arguments(node)
+        for param, value in zip(self.func.params, args):
+            self.write(param.name, self.block, value)
+        self.reset_locals(self.block)
+        self.jump(self.start)
+
+    def expression(self, node):
+        # Operando (Value ou Const) com o valor da expressão
+        kind = type(node).__name__
+        if kind == 'VarAccess':
+            return self.read(node.name, self.block)
+        if kind == 'Literal':
+            return Const(char_value(node.value) if node.type == 'char' else node.value, node.type)
+        if kind == 'FunctionCall':
+            return self.call(node)
+        if kind != 'BinOp':
+            raise IrError(f"Expressão não suportada: {kind}")
+
+        # Cadeias longas à esquerda (a + b + c + ...) sem recursão em Python
+        chain = []
+        while type(node).__name__ == 'BinOp':
+            chain.append(node)
+            node = node.left
+        left = self.expression(node)
+        for binop in reversed(chain):
+            left = self.binary(binop, left, self.expression(binop.right))
+        return left
+
+    def binary(self, node, left, right):
+        op = node.op
+        if op in COMPARISONS:
+            check_comparison(left.type, right.type, IrError)
+            return self.emit(Binary(self.function.new_value('int'), [left, right], op=op))
+        if left.type not in NUMERIC or right.type not in NUMERIC:
+            raise IrError(f"Operação '{op}' entre {left.type} e {right.type}")
+        result = 'float' if 'float' in (left.type, right.type) else 'int'
+        if op == '/':
+            op = '/i' if result == 'int' else '/f'
+        return self.emit(Binary(self.function.new_value(result), [left, right], op=op))
+
+
+class IrBuilder:
+    """Traduz as funções de um programa para a IR, na ordem do fonte."""
+
+    def __init__(self):
+        self._decls = {}
+        self.functions = {}
+        self.purity = PurityInfo()
+
+    def signature(self, name: str):
+        return lookup(self._decls, name, 'uma função', IrError)
+
+    def build_function(self, func, table: dict) -> IrFunction:
+        self._decls[func.name] = func
+        function = self.functions[func.name] = FunctionBuilder(func, table, self).build()
+        return function
+
+    def build_program(self, function_asts: dict, function_tables: dict) -> IrProgram:
+        self.purity = analyze(function_asts)
+        for name, func in function_asts.items():
+            self.build_function(func, function_tables[name]).memoize = name in self.purity.memoizable
+        return IrProgram(self.functions)
+
+
+def build_program(function_asts: dict, function_tables: dict) -> IrProgram:
+    return IrBuilder().build_program(function_asts, function_tables)
+
+
+# --- Texto ---
+
+def format_instruction(inst: Instruction) -> str:
+    args = ', '.join(repr(arg) for arg in inst.args)
+    if isinstance(inst, Binary):
+        text = f"{inst.args[0]!r} {inst.op} {inst.args[1]!r}"
+    elif isinstance(inst, Convert):
+        text = f"{inst.to}({args})"
+    elif isinstance(inst, Copy):
+        text = args
+    elif isinstance(inst, Call):
+        text = f"call {inst.function}({args})"
+    elif isinstance(inst, Print):
+        text = f"println {'{}'.join(inst.parts)!r}" + (f", {args}" if args else '')
+    elif isinstance(inst, Phi):
+        text = f"phi {args}"
+    elif isinstance(inst, Jump):
+        text = f"jump {inst.target!r}"
+    elif isinstance(inst, Branch):
+        text = f"branch {args} ? {inst.if_true!r} : {inst.if_false!r}"
+    else:
+        text = f"return {args}"
+    return f"{inst.dest!r} = {text}" if inst.dest is not None else text
+
+
+def format_function(function: IrFunction) -> str:
+    params = ', '.join(f"{value!r}: {value.type}" for value in function.params)
+    lines = [f"fn {function.name}({params}) -> {function.return_type}"]
+    for block in reverse_postorder(function):
+        preds = ', '.join(repr(pred) for pred in block.preds)
+        lines.append(f"  {block!r}:" + (f"  ; preds {preds}" if preds else ''))
+        lines.extend(f"    {format_instruction(inst)}" for inst in block.instructions())
+    return '\n'.join(lines)
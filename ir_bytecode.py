@@ -0,0 +1,480 @@
+# Arquivo: ir_bytecode.py
+# Gera bytecode para a VM de vm.py a partir da IR em SSA de ir.py (em geral depois dos passes de
+# ir_passes.py): é o backend que consome a IR otimizada. Por função:
+#  - um valor usado uma única vez, no mesmo bloco, é calculado direto na pilha de operandos na hora
+#    do uso, como numa árvore de expressão. Uma instrução com efeito (chamada, divisão que pode
+#    falhar) só é adiada se não houver outra com efeito no meio, para não mudar a ordem da saída;
+#  - os demais valores vão para slots. Cada phi é unido num mesmo slot com os seus operandos
+#    quando os intervalos de vida deles não se cruzam (análise de vivacidade sobre os blocos); assim
+#    i = i + 1 num laço continua sendo um INCREMENT e não uma cópia no fim do corpo;
+#  - os phis restantes viram cópias no fim de cada predecessor, feitas em paralelo pela pilha
+#    (todos os LOAD e depois os STORE). Uma aresta de um Branch para um bloco com phis ganha um
+#    trecho próprio no fim do código, para as cópias não valerem para o outro sucessor (a condição é
+#    invertida quando isso evita o trecho), e os blocos vazios que só saltam não geram código;
+#  - uma comparação usada pelo Branch vira um único salto (JUMP_IF_NOT_<op>); se ela foi tirada do
+#    laço ou reaproveitada por outro comando, é refeita no bloco do Branch (o que altera a IrFunction).
+from collections import Counter
+
+from bytecode import (LOAD_LOCAL, STORE_LOCAL, INCREMENT, LOAD_CONST, ADD_LOCAL, ADD_CONST, ADD, JUMP_IF_NOT_LT_LL,
+                      JUMP_IF_NOT_LT_LC, JUMP_IF_NOT_LT, JUMP, CALL, RETURN, PRINT, POP, JUMP_IF_FALSE, COMPARE,
+                      JUMP_IF_NOT_EQ, TO_INT, TO_FLOAT, ARITHMETIC_OFFSET, COMPARISONS, DEFAULT_VALUES, JUMP_OFFSET,
+                      NEGATED, NUMERIC, BytecodeProgram, CodeBuilder, CodeObject)
+from ir import Binary, Branch, Call, Const, Convert, IrFunction, IrProgram, Jump, Print, Return, Value, reverse_postorder
+
+
+class IrFunctionCompiler(CodeBuilder):
+    def __init__(self, function: IrFunction, index: dict):
+        super().__init__()
+        self.function = function
+        self.index = index  # nome da função -> argumento do CALL
+        self.order = reverse_postorder(function)
+        self.definitions = {}  # valor -> instrução do corpo de um bloco que o define
+        self.where = {}  # valor -> bloco da definição
+        self.uses = Counter()
+        self.stacked = set()  # valores calculados na pilha, no consumidor
+        self.slots = {}
+        self.slot_types = []
+        self.slot_names = []
+        self.labels = {}
+        self.forwarders = set()
+        self.fixups = []  # (posição no código, bloco de destino)
+
+    def compile(self) -> CodeObject:
+        for block in self.order:
+            for inst in block.instructions():
+                for arg in inst.args:
+                    if isinstance(arg, Value):
+                        self.uses[arg] += 1
+            for inst in block.body:
+                if inst.dest is not None:
+                    self.definitions[inst.dest] = inst
+                    self.where[inst.dest] = block
+        self.rematerialize()
+        for block in self.order:
+            self.stackify(block)
+        self.assign_slots()
+        self.emit_blocks()
+        function = self.function
+        return CodeObject(function.name, self.code, self.consts, len(function.params),
+                          [DEFAULT_VALUES.get(type_name) for type_name in self.slot_types], function.return_type,
+                          self.slot_names, function.memoize)
+
+    # --- Valores na pilha ---
+
+    def rematerialize(self):
+        # Um Branch sobre uma comparação de outro bloco (tirada do laço pelo licm) ou usada mais de uma
+        # vez (cse) ganha uma cópia dela no fim do próprio bloco, que vira um salto condicional único
+        # em vez de um slot a mais. A original sai se ficar sem usos (comparações são puras).
+        for block in self.order:
+            term = block.terminator
+            cond = term.args[0] if isinstance(term, Branch) else None
+            definition = self.definitions.get(cond)
+            if not isinstance(definition, Binary) or definition.op not in JUMP_OFFSET:
+                continue
+            if self.where[cond] is block and self.uses[cond] == 1:
+                continue
+            clone = Binary(self.function.new_value('int'), list(definition.args), op=definition.op)
+            block.body.append(clone)
+            term.args[0] = clone.dest
+            self.definitions[clone.dest] = clone
+            self.where[clone.dest] = block
+            self.uses[clone.dest] = 1
+            for arg in clone.args:
+                if isinstance(arg, Value):
+                    self.uses[arg] += 1
+            self.uses[cond] -= 1
+            if not self.uses[cond]:
+                origin = self.where[cond]
+                origin.body.remove(definition)
+                for arg in definition.args:
+                    if isinstance(arg, Value):
+                        self.uses[arg] -= 1
+
+    def stackify(self, block):
+        # Percorre o bloco de trás para frente: cada operando usado uma só vez e definido neste bloco
+        # passa a ser calculado dentro do consumidor. Instruções com efeito só são adiadas se não
+        # houver outra com efeito entre a posição original e a da raiz da árvore.
+        body = block.body
+        position = {inst.dest: index for index, inst in enumerate(body) if inst.dest is not None}
+        effects = [0]
+        for inst in body:
+            effects.append(effects[-1] + (not inst.pure))
+        roots = [(block.terminator, len(body))] + [(body[index], index) for index in reversed(range(len(body)))]
+        for root, final in roots:
+            if root.dest is not None and root.dest in self.stacked:
+                continue
+            work = [root]
+            while work:
+                inst = work.pop()
+                for arg in inst.args:
+                    if not isinstance(arg, Value) or self.uses[arg] != 1 or arg not in position:
+                        continue
+                    start = position[arg]
+                    definition = body[start]
+                    if not definition.pure and effects[final] - effects[start + 1]:
+                        continue
+                    self.stacked.add(arg)
+                    work.append(definition)
+
+    def linear(self, block) -> list:
+        # Instruções na ordem em que o código é emitido (as da pilha dentro da árvore do consumidor)
+        sequence = []
+        for root in block.body + [block.terminator]:
+            if root.dest is not None and root.dest in self.stacked:
+                continue
+            stack = [(root, False)]
+            while stack:
+                inst, done = stack.pop()
+                if done:
+                    sequence.append(inst)
+                    continue
+                stack.append((inst, True))
+                for arg in reversed(inst.args):
+                    if isinstance(arg, Value) and arg in self.stacked:
+                        stack.append((self.definitions[arg], False))
+        return sequence
+
+    # --- Slots ---
+
+    def in_slot(self, operand) -> bool:
+        return isinstance(operand, Value) and operand not in self.stacked
+
+    def liveness(self, sequences: dict) -> tuple[dict, dict]:
+        # Valores em slots vivos na entrada e na saída de cada bloco. Os operandos de um phi contam
+        # como usados no fim do predecessor correspondente.
+        edge_uses = {block: set() for block in self.order}
+        for block in self.order:
+            for phi in block.phis:
+                for pred, arg in zip(block.preds, phi.args):
+                    if self.in_slot(arg):
+                        edge_uses[pred].add(arg)
+        gen = {}
+        kill = {}
+        for block in self.order:
+            defined = {phi.dest for phi in block.phis}
+            used = set()
+            for inst in sequences[block]:
+                for arg in inst.args:
+                    if self.in_slot(arg) and arg not in defined:
+                        used.add(arg)
+                if inst.dest is not None and inst.dest not in self.stacked:
+                    defined.add(inst.dest)
+            gen[block], kill[block] = used, defined
+        live_in = {block: set() for block in self.order}
+        live_out = {block: set() for block in self.order}
+        changed = True
+        while changed:
+            changed = False
+            for block in reversed(self.order):
+                out = set(edge_uses[block])
+                for succ in block.succs:
+                    out |= live_in[succ] - {phi.dest for phi in succ.phis}
+                new_in = gen[block] | (out - kill[block])
+                if new_in != live_in[block] or out != live_out[block]:
+                    live_in[block], live_out[block] = new_in, out
+                    changed = True
+        return live_in, live_out
+
+    def interference(self, sequences: dict, live_out: dict, related: set) -> dict:
+        # Pares de valores ligados a phis que estão vivos ao mesmo tempo (um vivo na definição do outro)
+        interferes = {value: set() for value in related}
+
+        def define(dest, live):
+            if dest in related:
+                for value in live:
+                    if value in related and value is not dest:
+                        interferes[dest].add(value)
+                        interferes[value].add(dest)
+
+        for block in self.order:
+            live = set(live_out[block])
+            for inst in reversed(sequences[block]):
+                dest = inst.dest
+                if dest is not None and dest not in self.stacked:
+                    live.discard(dest)
+                    define(dest, live)
+                for arg in inst.args:
+                    if self.in_slot(arg):
+                        live.add(arg)
+            # Phis (e, na entrada, os parâmetros) são definidos juntos, no começo do bloco
+            starts = [phi.dest for phi in block.phis]
+            if block is self.order[0]:
+                starts.extend(self.function.params)
+            live -= set(starts)
+            for dest in starts:
+                define(dest, live | set(starts))
+        return interferes
+
+    def assign_slots(self):
+        sequences = {block: self.linear(block) for block in self.order}
+        self.sequences = sequences
+        _, live_out = self.liveness(sequences)
+        related = set()
+        for block in self.order:
+            for phi in block.phis:
+                related.add(phi.dest)
+                related.update(arg for arg in phi.args if isinstance(arg, Value))
+        interferes = self.interference(sequences, live_out, related)
+
+        # União dos phis com os operandos que não interferem (dois parâmetros nunca dividem um slot)
+        parent = {}
+        members = {}
+        params = set(self.function.params)
+
+        def find(value):
+            root = value
+            while parent.get(root, root) is not root:
+                root = parent[root]
+            while value is not root:
+                parent[value], value = root, parent.get(value, value)
+            return root
+
+        def group(root) -> list:
+            return members.get(root, [root])
+
+        for block in self.order:
+            for phi in block.phis:
+                for arg in phi.args:
+                    if not isinstance(arg, Value):
+                        continue
+                    a, b = find(arg), find(phi.dest)
+                    if a is b:
+                        continue
+                    first, second = group(a), group(b)
+                    if any(v in params for v in first) and any(v in params for v in second):
+                        continue
+                    if any(other in interferes[v] for v in first for other in second):
+                        continue
+                    parent[a] = b
+                    members[b] = second + first
+                    members.pop(a, None)
+
+        root_slots = {}
+
+        def slot_for(value) -> int:
+            root = find(value)
+            slot = root_slots.get(root)
+            if slot is None:
+                slot = root_slots[root] = len(self.slot_types)
+                self.slot_types.append(value.type)
+                self.slot_names.append(repr(value))
+            self.slots[value] = slot
+            return slot
+
+        # Os parâmetros ocupam os primeiros slots, na ordem (é onde o CALL os coloca)
+        for value in self.function.params:
+            slot_for(value)
+        for block in self.order:
+            for phi in block.phis:
+                slot_for(phi.dest)
+            for inst in sequences[block]:
+                if inst.dest is not None and inst.dest not in self.stacked and self.uses[inst.dest]:
+                    slot_for(inst.dest)
+
+    # --- Código ---
+
+    def emit_blocks(self):
+        # Blocos vazios que só saltam (sobras dos passes) não geram código: as arestas vão direto ao destino
+        self.forwarders = {block for block in self.order[1:]
+                           if not block.phis and not block.body and isinstance(block.terminator, Jump)}
+        for block in list(self.forwarders):
+            if self.edge(block, block)[1] is block:
+                self.forwarders.discard(block)  # Laço só de saltos
+        emitted = [block for block in self.order if block not in self.forwarders]
+        stubs = []
+        for position, block in enumerate(emitted):
+            self.labels[block] = len(self.code)
+            following = emitted[position + 1] if position + 1 < len(emitted) else None
+            for inst in block.body:
+                if inst.dest is None or inst.dest not in self.stacked:
+                    self.tree(inst)
+            term = block.terminator
+            if isinstance(term, Jump):
+                source, target = self.edge(block, term.target)
+                self.copies(source, target)
+                if target is not following:
+                    self.jump(target)
+            elif isinstance(term, Branch):
+                # O salto condicional leva a uma das arestas e a outra segue no código. Se só a do
+                # ramo falso tem cópias, ou ele vem a seguir, a condição é invertida para ele seguir
+                edges = [self.edge(block, term.if_true), self.edge(block, term.if_false)]
+                negate = not edges[0][1].phis and (edges[1][1].phis or edges[1][1] is following)
+                if negate:
+                    edges.reverse()
+                jump = self.branch(term, negate)
+                (source, target), (jump_source, jump_target) = edges
+                self.copies(source, target)
+                if target is not following:
+                    self.jump(target)
+                if jump_target.phis:
+                    stubs.append((jump, jump_source, jump_target))
+                else:
+                    self.fixups.append((jump, jump_target))
+            else:
+                self.tree(term)
+        # Arestas do salto de um Branch para um bloco com phis: cópias num trecho à parte
+        for jump, source, target in stubs:
+            self.patch(jump)
+            self.copies(source, target)
+            self.jump(target)
+        for position, block in self.fixups:
+            self.code[position] = self.labels[block]
+
+    def edge(self, source, target) -> tuple:
+        # (predecessor, destino) de uma aresta depois de pular os blocos vazios; os operandos dos phis
+        # do destino são os do último bloco pulado, que valem igual no fim de source
+        seen = set()
+        while target in self.forwarders and target not in seen:
+            seen.add(target)
+            source, target = target, target.terminator.target
+        return source, target
+
+    def jump(self, target):
+        self.fixups.append((self.emit(JUMP), target))
+
+    def copies(self, block, target):
+        if not target.phis:
+            return
+        index = target.preds.index(block)
+        pairs = [(self.slots[phi.dest], phi.args[index]) for phi in target.phis]
+        pairs = [(slot, arg) for slot, arg in pairs if not (isinstance(arg, Value) and self.slots.get(arg) == slot)]
+        for _, arg in pairs:
+            self.load(arg)
+        for slot, _ in reversed(pairs):
+            self.emit(STORE_LOCAL, slot)
+
+    def load(self, operand):
+        if isinstance(operand, Const):
+            self.emit(LOAD_CONST, self.const(operand.value))
+        else:
+            self.emit(LOAD_LOCAL, self.slots[operand])
+
+    def fused(self, term) -> Binary | None:
+        # A comparação calculada só para o Branch, que então vira um salto condicional único
+        cond = term.args[0]
+        if isinstance(cond, Value) and cond in self.stacked:
+            definition = self.definitions[cond]
+            if isinstance(definition, Binary) and definition.op in JUMP_OFFSET:
+                return definition
+        return None
+
+    def increment(self, inst) -> tuple[int, int] | None:
+        # dest = left +/- constante, com dest e left no mesmo slot: um INCREMENT
+        if inst.op not in ('+', '-') or inst.dest in self.stacked or not self.uses[inst.dest]:
+            return None
+        left, right = inst.args
+        if not self.in_slot(left) or not isinstance(right, Const) or right.type not in NUMERIC:
+            return None
+        slot = self.slots[left]
+        if self.slots.get(inst.dest) != slot:
+            return None
+        step = right.value if inst.op == '+' else -right.value
+        return slot, self.const(float(step) if inst.dest.type == 'float' else step)
+
+    def pushed(self, inst) -> list:
+        # Operandos que a instrução tira da pilha, na ordem em que são empilhados
+        if isinstance(inst, Binary):
+            left, right = inst.args
+            if inst.op in JUMP_OFFSET:
+                return [left, right]
+            if self.increment(inst) is not None:
+                return []
+            return [left, right] if isinstance(right, Value) and right in self.stacked else [left]
+        if isinstance(inst, Branch):
+            compare = self.fused(inst)
+            if compare is None:
+                return [inst.args[0]]
+            left, right = compare.args
+            if self.in_slot(left) and not (isinstance(right, Value) and right in self.stacked):
+                return []
+            return [left, right]
+        return list(inst.args)
+
+    def tree(self, root):
+        # Emite root e, antes, as instruções dos operandos que estão na pilha (pós-ordem iterativa)
+        stack = [(root, 0, self.pushed(root))]
+        while stack:
+            inst, step, operands = stack.pop()
+            if step < len(operands):
+                stack.append((inst, step + 1, operands))
+                operand = operands[step]
+                if isinstance(operand, Value) and operand in self.stacked:
+                    definition = self.definitions[operand]
+                    stack.append((definition, 0, self.pushed(definition)))
+                else:
+                    self.load(operand)
+                continue
+            self.finish(inst, operands)
+
+    def finish(self, inst, operands: list):
+        if isinstance(inst, Binary):
+            if inst.op in JUMP_OFFSET:
+                self.emit(COMPARE, COMPARISONS.index(inst.op))
+            else:
+                increment = self.increment(inst)
+                if increment is not None:
+                    self.emit(INCREMENT, *increment)
+                    return
+                offset = ARITHMETIC_OFFSET.get(inst.op, 3 if inst.op == '/i' else 4)
+                right = inst.args[1]
+                if len(operands) == 2:
+                    self.emit(ADD + offset)
+                elif isinstance(right, Const):
+                    self.emit(ADD_CONST + offset, self.const(right.value))
+                else:
+                    self.emit(ADD_LOCAL + offset, self.slots[right])
+        elif isinstance(inst, Convert):
+            self.emit(TO_FLOAT if inst.to == 'float' else TO_INT)
+        elif isinstance(inst, Call):
+            self.emit(CALL, self.index[inst.function])
+            if inst.dest is None:
+                self.emit(POP)
+                return
+        elif isinstance(inst, Print):
+            self.emit(PRINT, self.const(inst.parts))
+            return
+        elif isinstance(inst, Return):
+            self.emit(RETURN)
+            return
+        # Copy: o valor já está na pilha
+        self.store(inst.dest)
+
+    def store(self, dest: Value):
+        if dest in self.stacked:
+            return  # Fica na pilha para o consumidor
+        if not self.uses[dest]:
+            self.emit(POP)
+        else:
+            self.emit(STORE_LOCAL, self.slots[dest])
+
+    def branch(self, term, negate: bool = False) -> int:
+        # Salto para quando a condição é falsa (com negate, verdadeira); devolve a posição do destino
+        operands = self.pushed(term)
+        compare = self.fused(term)
+        if compare is None:
+            self.tree_operands(operands)
+            if negate:
+                self.emit(LOAD_CONST, self.const(0))
+                return self.emit(JUMP_IF_NOT_EQ)
+            return self.emit(JUMP_IF_FALSE)
+        offset = JUMP_OFFSET[NEGATED[compare.op] if negate else compare.op]
+        if not operands:
+            left, right = compare.args
+            if isinstance(right, Const):
+                return self.emit(JUMP_IF_NOT_LT_LC + offset, self.slots[left], self.const(right.value), 0)
+            return self.emit(JUMP_IF_NOT_LT_LL + offset, self.slots[left], self.slots[right], 0)
+        self.tree_operands(operands)
+        return self.emit(JUMP_IF_NOT_LT + offset)
+
+    def tree_operands(self, operands: list):
+        for operand in operands:
+            if isinstance(operand, Value) and operand in self.stacked:
+                self.tree(self.definitions[operand])
+            else:
+                self.load(operand)
+
+
+def compile_ir_program(program: IrProgram) -> BytecodeProgram:
+    index = {name: position for position, name in enumerate(program.functions)}
+    functions = [IrFunctionCompiler(function, index).compile() for function in program.functions.values()]
+    return BytecodeProgram(functions, index)
@@ -0,0 +1,237 @@
+# Arquivo: ir_passes.py
+# Passes de otimização sobre a IR em SSA de ir.py e o gerenciador que os executa, medindo o tempo
+# de cada um. Cada passe recebe uma IrFunction, a altera no lugar e devolve quantas mudanças fez:
+#  - copy_propagation: troca os usos de cada Copy (e de cada phi trivial, com todos os operandos
+#    iguais) pelo valor copiado, o que também propaga as constantes atribuídas a variáveis;
+#  - cse: eliminação de subexpressões comuns pela árvore de dominadores: um Binary/Convert igual a
+#    outro que o domina (mesma operação, mesmos operandos) reaproveita o resultado dele, inclusive
+#    entre comandos diferentes;
+#  - licm: move para o pré-cabeçalho de cada laço as instruções puras cujos operandos não mudam
+#    dentro dele (laços internos primeiro, então uma expressão pode sair de vários níveis);
+#  - dce: remove as instruções puras cujo resultado ninguém usa (marcação a partir das chamadas,
+#    println, divisões que podem falhar e terminadores).
+# As instruções puras (Instruction.pure) são as que não têm efeito nem podem dar erro em execução;
+# só elas são removidas ou movidas, então a saída e os erros do programa não mudam.
+import time
+from dataclasses import dataclass
+
+from ir import (Binary, Convert, Copy, IrFunction, IrProgram, Value, dominator_tree, dominators, dominates,
+                operand_key, replace_uses, reverse_postorder)
+
+COMMUTATIVE = frozenset(('+', '*', '==', '!='))
+
+
+def copy_propagation(function: IrFunction) -> int:
+    mapping = {}
+
+    def resolve(operand):
+        while isinstance(operand, Value) and operand in mapping:
+            operand = mapping[operand]
+        return operand
+
+    for block in function.blocks:
+        kept = []
+        for inst in block.body:
+            if isinstance(inst, Copy):
+                mapping[inst.dest] = inst.args[0]
+            else:
+                kept.append(inst)
+        block.body = kept
+
+    # Phis triviais: todos os operandos (fora o próprio phi) iguais; remover um pode tornar outro trivial
+    changed = True
+    while changed:
+        changed = False
+        for block in function.blocks:
+            kept = []
+            for phi in block.phis:
+                same = None
+                for arg in phi.args:
+                    arg = resolve(arg)
+                    if arg is phi.dest or (same is not None and operand_key(arg) == operand_key(same)):
+                        continue
+                    if same is not None:
+                        break
+                    same = arg
+                else:
+                    if same is not None:
+                        mapping[phi.dest] = same
+                        changed = True
+                        continue
+                kept.append(phi)
+            block.phis = kept
+    replace_uses(function, mapping)
+    return len(mapping)
+
+
+def expression_key(inst) -> tuple:
+    if isinstance(inst, Convert):
+        return ('convert', inst.to, operand_key(inst.args[0]))
+    left, right = (operand_key(arg) for arg in inst.args)
+    if inst.op in COMMUTATIVE and sort_key(right) < sort_key(left):
+        left, right = right, left
+    return (inst.op, left, right)
+
+
+def sort_key(key) -> tuple:
+    # Ordem estável entre operandos de uma operação comutativa
+    return (0, key.id, '') if isinstance(key, Value) else (1, key[0], key[1])
+
+
+def cse(function: IrFunction) -> int:
+    order = reverse_postorder(function)
+    children = dominator_tree(dominators(function, order))
+    mapping = {}
+    available = {}
+    # Percurso da árvore de dominadores com pilha explícita; ao sair de um bloco as expressões
+    # que ele disponibilizou saem da tabela
+    stack = [(order[0], None)]
+    while stack:
+        block, added = stack.pop()
+        if added is not None:
+            for key in added:
+                del available[key]
+            continue
+        added = []
+        kept = []
+        for inst in block.body:
+            inst.args = [mapping.get(arg, arg) if isinstance(arg, Value) else arg for arg in inst.args]
+            if isinstance(inst, (Binary, Convert)):
+                # Também as divisões que podem falhar: a primeira já falharia antes da repetição
+                key = expression_key(inst)
+                previous = available.get(key)
+                if previous is not None:
+                    mapping[inst.dest] = previous
+                    continue
+                available[key] = inst.dest
+                added.append(key)
+            kept.append(inst)
+        block.body = kept
+        stack.append((block, added))
+        stack.extend((child, None) for child in children[block])
+    replace_uses(function, mapping)
+    return len(mapping)
+
+
+def dce(function: IrFunction) -> int:
+    definitions = {}
+    for block in function.blocks:
+        for inst in block.instructions():
+            if inst.dest is not None:
+                definitions[inst.dest] = inst
+
+    live = set()
+    work = [inst for block in function.blocks for inst in block.instructions() if not inst.pure]
+    while work:
+        inst = work.pop()
+        if inst in live:
+            continue
+        live.add(inst)
+        for arg in inst.args:
+            definition = definitions.get(arg) if isinstance(arg, Value) else None
+            if definition is not None and definition not in live:
+                work.append(definition)
+
+    removed = 0
+    for block in function.blocks:
+        phis = [phi for phi in block.phis if phi in live]
+        body = [inst for inst in block.body if inst in live]
+        removed += len(block.phis) - len(phis) + len(block.body) - len(body)
+        block.phis, block.body = phis, body
+    return removed
+
+
+def natural_loops(function: IrFunction, order: list, idom: dict) -> dict:
+    # cabeçalho -> blocos do laço; uma aresta b -> h em que h domina b é uma aresta de volta
+    loops = {}
+    for block in order:
+        for succ in block.succs:
+            if succ in idom and dominates(idom, succ, block):
+                body = loops.setdefault(succ, {succ})
+                stack = [block]
+                while stack:
+                    member = stack.pop()
+                    if member not in body:
+                        body.add(member)
+                        stack.extend(member.preds)
+    return loops
+
+
+def licm(function: IrFunction) -> int:
+    order = reverse_postorder(function)
+    idom = dominators(function, order)
+    where = {value: function.entry for value in function.params}
+    for block in order:
+        for inst in block.instructions():
+            if inst.dest is not None:
+                where[inst.dest] = block
+
+    moved = 0
+    # Laços internos (menores) primeiro: o que sai deles vai para um bloco do laço de fora
+    for header, body in sorted(natural_loops(function, order, idom).items(), key=lambda item: len(item[1])):
+        outside = [pred for pred in header.preds if pred not in body]
+        if len(outside) != 1 or len(outside[0].succs) != 1:
+            continue  # Sem pré-cabeçalho (o ir.py sempre cria um: o bloco que salta para o while)
+        preheader = outside[0]
+        # Em pós-ordem reversa as definições vêm antes dos usos, então uma passada basta
+        for block in order:
+            if block not in body:
+                continue
+            kept = []
+            for inst in block.body:
+                if inst.pure and all(not isinstance(arg, Value) or where[arg] not in body for arg in inst.args):
+                    preheader.body.append(inst)
+                    where[inst.dest] = preheader
+                    moved += 1
+                else:
+                    kept.append(inst)
+            block.body = kept
+    return moved
+
+
+PASSES = {
+    'copy_propagation': copy_propagation,
+    'cse': cse,
+    'licm': licm,
+    'dce': dce,
+}
+DEFAULT_PIPELINE = ('copy_propagation', 'cse', 'licm', 'dce')
+
+
+@dataclass
+class PassReport:
+    name: str
+    time: float = 0.0  # Soma do tempo do passe em todas as funções
+    changes: int = 0
+    instructions: int = 0  # Instruções do programa depois do passe
+
+
+class PassManager:
+    """Executa os passes de pipeline, em ordem, em cada função de um IrProgram."""
+
+    def __init__(self, pipeline: tuple = DEFAULT_PIPELINE):
+        unknown = [name for name in pipeline if name not in PASSES]
+        if unknown:
+            raise ValueError(f"Passes desconhecidos: {', '.join(unknown)} (opções: {', '.join(PASSES)})")
+        self.pipeline = tuple(pipeline)
+
+    def run(self, program: IrProgram) -> list[PassReport]:
+        reports = [PassReport(name) for name in self.pipeline]
+        for function in program.functions.values():
+            self.run_function(function, reports)
+        return reports
+
+    def run_function(self, function: IrFunction, reports: list[PassReport]):
+        for report in reports:
+            start = time.perf_counter()
+            report.changes += PASSES[report.name](function)
+            report.time += time.perf_counter() - start
+            report.instructions += function.instruction_count()
+
+
+def format_report(reports: list[PassReport], instructions_before: int) -> str:
+    lines = [f"Passes da IR ({instructions_before} instruções):"]
+    for report in reports:
+        lines.append(f"  {report.name:<18} {report.time * 1000:8.2f} ms  {report.changes:>6} mudanças  "
+                     f"-> {report.instructions} instruções")
+    return '\n'.join(lines)
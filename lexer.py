@@ -1,6 +1,14 @@
+import os
 import re
+import mmap
+from array import array
+from bisect import bisect_right
+from contextlib import contextmanager
 from enum import Enum, auto
-from dataclasses import dataclass
+from dataclasses import dataclass, field
+from typing import Iterator
+
+from diagnostics import Diagnostic, DiagnosticList
 
 # Definição dos Tipos de Token
 class TokenType(Enum):
@@ -45,102 +53,544 @@ class TokenType(Enum):
     MULT = auto()         # *
     DIV = auto()          # /
 
-# Estrutura do Token
+# Índice dos offsets de início de cada linha, montado numa passada com find('\n') na primeira
+# vez que uma linha é pedida. Linha e coluna de um offset são resolvidas por busca binária.
+class LineIndex:
+    def __init__(self, source: str | bytes | mmap.mmap):
+        self.source = source
+        self.is_bytes = not isinstance(source, str)
+        self._starts = None
+
+    @property
+    def starts(self) -> array:
+        if self._starts is None:
+            newline = b'\n' if self.is_bytes else '\n'
+            starts = array('Q', [0])
+            find = self.source.find
+            pos = find(newline)
+            while pos != -1:
+                starts.append(pos + 1)
+                pos = find(newline, pos + 1)
+            self._starts = starts
+        return self._starts
+
+    def line_of(self, offset: int) -> int:
+        return bisect_right(self.starts, offset)
+
+    def column_of(self, offset: int) -> int:
+        line_start = self.starts[self.line_of(offset) - 1]
+        if self.is_bytes:
+            # Coluna em caracteres, não em bytes
+            return len(bytes(self.source[line_start:offset]).decode('utf-8', errors='replace')) + 1
+        return offset - line_start + 1
+
+    def position(self, offset: int) -> str:
+        return f"linha {self.line_of(offset)}, coluna {self.column_of(offset)}"
+
+
+# Estrutura do Token: guarda só o offset; linha e coluna vêm do LineIndex quando necessárias
 @dataclass
 class Token:
     lexeme: str
     token_type: TokenType
-    line: int
+    offset: int
+    line_index: LineIndex = field(default=None, compare=False, repr=False)
+
+    @property
+    def line(self) -> int:
+        return self.line_index.line_of(self.offset)
+
+    @property
+    def column(self) -> int:
+        return self.line_index.column_of(self.offset)
 
     def __str__(self):
         return f"Token(Lexema: '{self.lexeme}', Tipo: {self.token_type.name}, Linha: {self.line})"
 
+# Tipo de token a partir do código inteiro guardado no TokenStream (código = TokenType.value)
+TOKEN_TYPE_BY_CODE = (None,) + tuple(TokenType)
+
+
+# Tokens em estrutura de arrays: um código de tipo (1 byte) e início/fim no fonte por token.
+# O lexema só é fatiado do fonte quando alguém o pede. Com fonte em bytes (ex: mmap) os
+# offsets são em bytes e o lexema é decodificado de UTF-8 nesse momento.
+class TokenStream:
+    def __init__(self, source: str | bytes | mmap.mmap, line_index: LineIndex | None = None):
+        self.source = source
+        self.is_bytes = not isinstance(source, str)
+        self.kinds = array('B')
+        self.starts = array('I')
+        self.ends = array('I')
+        self.line_index = line_index or LineIndex(source)
+
+    def __len__(self) -> int:
+        return len(self.kinds)
+
+    def __getitem__(self, index: int) -> 'TokenRef':
+        size = len(self.kinds)
+        if index < 0:
+            index += size
+        if not 0 <= index < size:
+            raise IndexError("list index out of range")
+        return TokenRef(self, index)
+
+    def __iter__(self):
+        for i in range(len(self.kinds)):
+            yield TokenRef(self, i)
+
+    def token_type(self, index: int) -> TokenType:
+        return TOKEN_TYPE_BY_CODE[self.kinds[index]]
+
+    def lexeme(self, index: int) -> str:
+        text = self.source[self.starts[index]:self.ends[index]]
+        return text.decode('utf-8') if self.is_bytes else text
+
+    def to_tokens(self) -> list[Token]:
+        line_index = self.line_index
+        return [Token(self.lexeme(i), self.token_type(i), self.starts[i], line_index) for i in range(len(self.kinds))]
+
+
+def token_arrays(tokens: list['Token'] | TokenStream):
+    # (fonte, códigos, inícios, fins) dos tokens, no formato do TokenStream
+    if isinstance(tokens, TokenStream):
+        return tokens.source, tokens.kinds, tokens.starts, tokens.ends
+    kinds = array('B', [tok.token_type.value for tok in tokens])
+    starts = array('I', [tok.offset for tok in tokens])
+    ends = array('I', [tok.offset + len(tok.lexeme) for tok in tokens])
+    return (tokens[0].line_index.source if tokens else None), kinds, starts, ends
+
+
+# Visão leve de uma posição do TokenStream, com a mesma interface de leitura do Token
+class TokenRef:
+    __slots__ = ('stream', 'index')
+
+    def __init__(self, stream: TokenStream, index: int):
+        self.stream = stream
+        self.index = index
+
+    @property
+    def lexeme(self) -> str:
+        return self.stream.lexeme(self.index)
+
+    @property
+    def token_type(self) -> TokenType:
+        return TOKEN_TYPE_BY_CODE[self.stream.kinds[self.index]]
+
+    @property
+    def offset(self) -> int:
+        return self.stream.starts[self.index]
+
+    @property
+    def line(self) -> int:
+        return self.stream.line_index.line_of(self.stream.starts[self.index])
+
+    @property
+    def column(self) -> int:
+        return self.stream.line_index.column_of(self.stream.starts[self.index])
+
+    def __str__(self):
+        return f"Token(Lexema: '{self.lexeme}', Tipo: {self.token_type.name}, Linha: {self.line})"
+
+
+# Tabelas do scanner dirigido por tabela (engine='table')
+KEYWORDS = {
+    'fn': TokenType.FUNCTION,
+    'main': TokenType.MAIN,
+    'let': TokenType.LET,
+    'int': TokenType.INT,
+    'float': TokenType.FLOAT,
+    'char': TokenType.CHAR,
+    'if': TokenType.IF,
+    'else': TokenType.ELSE,
+    'while': TokenType.WHILE,
+    'println': TokenType.PRINTLN,
+    'return': TokenType.RETURN,
+}
+
+SINGLE_CHAR_TOKENS = {
+    '(': TokenType.LBRACKET,
+    ')': TokenType.RBRACKET,
+    '{': TokenType.LBRACE,
+    '}': TokenType.RBRACE,
+    ':': TokenType.COLON,
+    ';': TokenType.SEMICOLON,
+    ',': TokenType.COMMA,
+    '+': TokenType.PLUS,
+    '*': TokenType.MULT,
+}
+
+# Operadores de um caractere que podem formar um operador de dois: c -> (tipo simples, segundo char, tipo duplo)
+PREFIX_OPERATORS = {
+    '-': (TokenType.MINUS, '>', TokenType.ARROW),
+    '=': (TokenType.ASSIGN, '=', TokenType.EQ),
+    '!': (None, '=', TokenType.NE),
+    '>': (TokenType.GT, '=', TokenType.GE),
+    '<': (TokenType.LT, '=', TokenType.LE),
+}
+
+# Classes de caractere usadas no despacho pelo primeiro caractere do token
+C_OTHER, C_SPACE, C_LETTER, C_DIGIT, C_SINGLE, C_OPERATOR, C_SLASH, C_QUOTE, C_APOSTROPHE = range(9)
+
+CHAR_CLASS = {}
+for _c in ' \t\r\f\v\n':
+    CHAR_CLASS[_c] = C_SPACE
+for _c in 'abcdefghijklmnopqrstuvwxyzABCDEFGHIJKLMNOPQRSTUVWXYZ':
+    CHAR_CLASS[_c] = C_LETTER
+for _c in '0123456789':
+    CHAR_CLASS[_c] = C_DIGIT
+for _c in SINGLE_CHAR_TOKENS:
+    CHAR_CLASS[_c] = C_SINGLE
+for _c in PREFIX_OPERATORS:
+    CHAR_CLASS[_c] = C_OPERATOR
+CHAR_CLASS['/'] = C_SLASH
+CHAR_CLASS['"'] = C_QUOTE
+CHAR_CLASS["'"] = C_APOSTROPHE
+
+# Padrões pequenos para consumir o restante de cada classe a partir do primeiro caractere
+SPACE_RUN = re.compile(r'[ \t\r\f\v\n]+')
+IDENT_RUN = re.compile(r'[a-zA-Z][a-zA-Z0-9_]*')
+NUMBER_RUN = re.compile(r'[0-9]+(\.[0-9]+)?')
+COMMENT_RUN = re.compile(r'//.*')
+FMT_STRING_RUN = re.compile(r'"[^"]*"')
+CHAR_LITERAL_RUN = re.compile(r"'([^'\\]|\\.)'")
+
+
+def _is_word_char(c: str) -> bool:
+    # Mesmo critério do \b das expressões regulares em str
+    return c.isalnum() or c == '_'
+
+
+# Padrão em bytes para fontes mapeados em memória. Palavras reservadas saem como ID e são
+# resolvidas por KEYWORDS, já que o \b em bytes só reconhece letras ASCII.
+BYTES_TOKENIZER = re.compile(b'|'.join(b'(?P<%s>%s)' % (name.encode(), pattern) for name, pattern in [
+    ('SKIP', rb'[ \t\r\f\v\n]+'),
+    ('COMMENT', rb'//.*'),
+    ('FLOAT_CONST', rb'[0-9]+\.[0-9]+'),
+    ('INT_CONST', rb'[0-9]+'),
+    ('FMT_STRING', rb'"[^"]*"'),
+    # Um caractere UTF-8 (1 a 4 bytes), escapado ou não
+    ('CHAR_LITERAL', rb"'(?:[^'\\\x80-\xff]|[\xc0-\xff][\x80-\xbf]{1,3}|\\(?:[^\n\x80-\xff]|[\xc0-\xff][\x80-\xbf]{1,3}))'"),
+    ('ID', rb'[a-zA-Z][a-zA-Z0-9_]*'),
+    ('ARROW', rb'->'),
+    ('EQ', rb'=='),
+    ('NE', rb'!='),
+    ('GE', rb'>='),
+    ('LE', rb'<='),
+    ('ASSIGN', rb'='),
+    ('GT', rb'>'),
+    ('LT', rb'<'),
+    ('PLUS', rb'\+'),
+    ('MINUS', rb'-'),
+    ('MULT', rb'\*'),
+    ('DIV', rb'/'),
+    ('LBRACKET', rb'\('),
+    ('RBRACKET', rb'\)'),
+    ('LBRACE', rb'\{'),
+    ('RBRACE', rb'\}'),
+    ('COLON', rb':'),
+    ('SEMICOLON', rb';'),
+    ('COMMA', rb','),
+    ('MISMATCH', rb'.'),
+]))
+
+BYTES_KEYWORDS = {word.encode(): token_type for word, token_type in KEYWORDS.items()}
+
+
+def _utf8_length(lead: int) -> int:
+    if lead >= 0xf0:
+        return 4
+    if lead >= 0xe0:
+        return 3
+    if lead >= 0xc0:
+        return 2
+    return 1
+
+
+def _bytes_char_at(buf, pos: int) -> str:
+    # Decodifica o caractere UTF-8 que começa em pos
+    return bytes(buf[pos:pos + _utf8_length(buf[pos])]).decode('utf-8', errors='replace')
+
+
+def _bytes_char_before(buf, pos: int) -> str:
+    # Decodifica o caractere UTF-8 que termina logo antes de pos
+    start = pos - 1
+    while start > 0 and pos - start < 4 and 0x80 <= buf[start] < 0xc0:
+        start -= 1
+    return bytes(buf[start:pos]).decode('utf-8', errors='replace')
+
+
+@contextmanager
+def map_source_file(path: str) -> Iterator[mmap.mmap | bytes]:
+    # Mapeia o arquivo somente para leitura, sem copiá-lo para um str (arquivos vazios não podem ser
+    # mapeados). O mapa é fechado na saída do with, então tokens e lexemas lidos dele só valem dentro
+    with open(path, 'rb') as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            mapped = None
+        else:
+            mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    if mapped is None:
+        yield b''
+        return
+    with mapped:
+        yield mapped
+
+
 # Analisador Léxico
 class Lexer:
-    def __init__(self, source_code: str):
+    ENGINES = ('regex', 'table')
+
+    # Padrões do engine regex, compilados uma vez por processo (guardados na classe)
+    token_specs = [
+        # Ignorar espaços em branco (inclusive quebras de linha: as linhas vêm do LineIndex)
+        ('SKIP', r'[ \t\r\f\v\n]+'),
+        
+        # Comentários
+        ('COMMENT', r'//.*'),
+
+        # Palavras Reservadas
+        ('FUNCTION', r'\bfn\b'),
+        ('MAIN', r'\bmain\b'),
+        ('LET', r'\blet\b'),
+        ('INT', r'\bint\b'),
+        ('FLOAT', r'\bfloat\b'),
+        ('CHAR', r'\bchar\b'),
+        ('IF', r'\bif\b'),
+        ('ELSE', r'\belse\b'),
+        ('WHILE', r'\bwhile\b'),
+        ('PRINTLN', r'\bprintln\b'),
+        ('RETURN', r'\breturn\b'),
+        
+        # Constantes e Literais
+        ('FLOAT_CONST', r'[0-9]+\.[0-9]+'),
+        ('INT_CONST', r'[0-9]+'),
+        ('FMT_STRING', r'"[^"]*"'), 
+        ('CHAR_LITERAL', r"'([^'\\]|\\.)'"), # Aceita caracteres escapados como '\''
+
+        # Identificador
+        ('ID', r'[a-zA-Z][a-zA-Z0-9_]*'),
+
+        # Operadores e Pontuação
+        ('ARROW', r'->'),
+        ('EQ', r'=='),
+        ('NE', r'!='),
+        ('GE', r'>='),
+        ('LE', r'<='),
+        ('ASSIGN', r'='),
+        ('GT', r'>'),
+        ('LT', r'<'),
+        ('PLUS', r'\+'),
+        ('MINUS', r'-'),
+        ('MULT', r'\*'),
+        ('DIV', r'/'),
+        ('LBRACKET', r'\('),
+        ('RBRACKET', r'\)'),
+        ('LBRACE', r'\{'),
+        ('RBRACE', r'\}'),
+        ('COLON', r':'),
+        ('SEMICOLON', r';'),
+        ('COMMA', r','),
+
+        # Erro
+        ('MISMATCH', r'.'),
+    ]
+    tokenizer_regex = re.compile('|'.join('(?P<%s>%s)' % pair for pair in token_specs))
+
+    # Com source_code em bytes (ou mmap) o scan é feito por BYTES_TOKENIZER, qualquer que seja o engine
+    def __init__(self, source_code: str | bytes | mmap.mmap, engine: str = 'regex', max_errors: int | None = None):
+        if engine not in self.ENGINES:
+            raise ValueError(f"Engine léxico desconhecido '{engine}'. Opções: {', '.join(self.ENGINES)}")
+
         self.source = source_code
-        self.line = 1
+        self.engine = engine
+        self.is_bytes = not isinstance(source_code, str)
+        self.line_index = LineIndex(source_code)
         self.position = 0
+        # O scan para no primeiro limite de token em ou depois de stop (usado no léxico paralelo)
+        self.stop = len(source_code)
         self.tokens = []
-        self.errors = []
-
-        self.token_specs = [
-            # Ignorar espaços em branco e comentários
-            ('SKIP', r'[ \t\r\f\v]+'),
-            ('NEWLINE', r'\n'),
-            
-            # Comentários
-            ('COMMENT', r'//.*'),
-
-            # Palavras Reservadas
-            ('FUNCTION', r'\bfn\b'),
-            ('MAIN', r'\bmain\b'),
-            ('LET', r'\blet\b'),
-            ('INT', r'\bint\b'),
-            ('FLOAT', r'\bfloat\b'),
-            ('CHAR', r'\bchar\b'),
-            ('IF', r'\bif\b'),
-            ('ELSE', r'\belse\b'),
-            ('WHILE', r'\bwhile\b'),
-            ('PRINTLN', r'\bprintln\b'),
-            ('RETURN', r'\breturn\b'),
-            
-            # Constantes e Literais
-            ('FLOAT_CONST', r'[0-9]+\.[0-9]+'),
-            ('INT_CONST', r'[0-9]+'),
-            ('FMT_STRING', r'"[^"]*"'), 
-            ('CHAR_LITERAL', r"'([^'\\]|\\.)'"), # Aceita caracteres escapados como '\''
-
-            # Identificador
-            ('ID', r'[a-zA-Z][a-zA-Z0-9_]*'),
-
-            # Operadores e Pontuação
-            ('ARROW', r'->'),
-            ('EQ', r'=='),
-            ('NE', r'!='),
-            ('GE', r'>='),
-            ('LE', r'<='),
-            ('ASSIGN', r'='),
-            ('GT', r'>'),
-            ('LT', r'<'),
-            ('PLUS', r'\+'),
-            ('MINUS', r'-'),
-            ('MULT', r'\*'),
-            ('DIV', r'/'),
-            ('LBRACKET', r'\('),
-            ('RBRACKET', r'\)'),
-            ('LBRACE', r'\{'),
-            ('RBRACE', r'\}'),
-            ('COLON', r':'),
-            ('SEMICOLON', r';'),
-            ('COMMA', r','),
-
-            # Erro
-            ('MISMATCH', r'.'),
-        ]
-        self.tokenizer_regex = re.compile('|'.join('(?P<%s>%s)' % pair for pair in self.token_specs))
-
-    def scan_tokens(self) -> tuple[list[Token], list[str]]:
-        while self.position < len(self.source):
+        # Com max_errors o scan para assim que o limite é atingido
+        self.errors = DiagnosticList(max_errors)
+        # Último erro de caractere e onde ele termina: caracteres inválidos seguidos viram um só erro
+        self._last_error = None
+        self._error_end = -1
+
+    def _error(self, text: str, start: int, end: int) -> bool:
+        # Registra caracteres inválidos em [start, end); devolve False se o limite de erros foi atingido
+        last = self._last_error
+        if last is not None and self._error_end == start:
+            last.code = 'L002'
+            last.args = (last.args[0] + text,)
+        else:
+            last = self._last_error = Diagnostic('L001', (text,), self.line_index, start)
+            if not self.errors.report(last):
+                return False
+        self._error_end = end
+        return True
+
+    def scan_tokens(self) -> tuple[list[Token], DiagnosticList]:
+        src = self.source
+        lines = self.line_index
+        if self.is_bytes:
+            self.tokens.extend(self.iter_tokens())
+        else:
+            self.tokens.extend([Token(src[start:end], token_type, start, lines)
+                                for token_type, start, end in self._spans()])
+        return self.tokens, self.errors
+
+    def iter_tokens(self):
+        # Gera os tokens sob demanda; os erros léxicos vão se acumulando em self.errors
+        src = self.source
+        lines = self.line_index
+        if self.is_bytes:
+            for token_type, start, end in self._spans():
+                yield Token(src[start:end].decode('utf-8'), token_type, start, lines)
+        else:
+            for token_type, start, end in self._spans():
+                yield Token(src[start:end], token_type, start, lines)
+
+    def scan_stream(self) -> tuple['TokenStream', DiagnosticList]:
+        # Mesmos tokens de scan_tokens, mas em estrutura de arrays (sem um objeto por token)
+        stream = TokenStream(self.source, self.line_index)
+        kinds, starts, ends = stream.kinds, stream.starts, stream.ends
+        for token_type, start, end in self._spans():
+            kinds.append(token_type.value)
+            starts.append(start)
+            ends.append(end)
+        return stream, self.errors
+
+    def _spans(self):
+        # Gera (tipo, início, fim) para cada token do engine escolhido
+        if self.is_bytes:
+            return self._bytes_spans()
+        if self.engine == 'table':
+            return self._table_spans()
+        return self._regex_spans()
+
+    def _regex_spans(self):
+        while self.position < self.stop:
             match = self.tokenizer_regex.match(self.source, self.position)
-            
+
             if not match:
-                self.errors.append(f"Erro léxico inesperado na linha {self.line}.")
+                if not self.errors.report(Diagnostic('L003', (), self.line_index, self.position)):
+                    return
                 self.position += 1
                 continue
 
             kind = match.lastgroup
-            value = match.group()
+            start = self.position
             self.position = match.end()
 
             if kind == 'SKIP' or kind == 'COMMENT':
                 continue
-            elif kind == 'NEWLINE':
-                self.line += 1
             elif kind == 'MISMATCH':
-                self.errors.append(f"Erro Léxico: Caractere inesperado '{value}' na linha {self.line}.")
+                if not self._error(match.group(), start, self.position):
+                    return
+            else:
+                yield TokenType[kind], start, self.position
+
+    def _table_spans(self):
+        # Mesmo conjunto de tokens do engine regex, mas despachando pela classe do primeiro
+        # caractere e resolvendo palavras reservadas por dicionário depois de ler o identificador.
+        src = self.source
+        n = len(src)
+        pos = self.position
+        char_class = CHAR_CLASS
+        keywords = KEYWORDS
+        single = SINGLE_CHAR_TOKENS
+        ident_type = TokenType.ID
+
+        stop = self.stop
+        while pos < stop:
+            c = src[pos]
+            cls = char_class.get(c, C_OTHER)
+
+            if cls == C_LETTER:
+                end = IDENT_RUN.match(src, pos).end()
+                kw = keywords.get(src[pos:end])
+                # Palavra reservada só vale com fronteira de palavra dos dois lados (como \bfn\b)
+                if kw is not None and not (pos > 0 and _is_word_char(src[pos - 1])) \
+                        and not (end < n and _is_word_char(src[end])):
+                    yield kw, pos, end
+                else:
+                    yield ident_type, pos, end
+                pos = end
+            elif cls == C_SPACE:
+                pos = SPACE_RUN.match(src, pos).end()
+            elif cls == C_SINGLE:
+                yield single[c], pos, pos + 1
+                pos += 1
+            elif cls == C_DIGIT:
+                m = NUMBER_RUN.match(src, pos)
+                kind = TokenType.FLOAT_CONST if m.group(1) else TokenType.INT_CONST
+                yield kind, pos, m.end()
+                pos = m.end()
+            elif cls == C_OPERATOR:
+                simple, second, double = PREFIX_OPERATORS[c]
+                if src.startswith(second, pos + 1):
+                    yield double, pos, pos + 2
+                    pos += 2
+                elif simple is not None:
+                    yield simple, pos, pos + 1
+                    pos += 1
+                else:
+                    pos += 1
+                    if not self._error(c, pos - 1, pos):
+                        break
+            elif cls == C_SLASH:
+                if src.startswith('/', pos + 1):
+                    pos = COMMENT_RUN.match(src, pos).end()
+                else:
+                    yield TokenType.DIV, pos, pos + 1
+                    pos += 1
+            elif cls == C_QUOTE or cls == C_APOSTROPHE:
+                m = (FMT_STRING_RUN if cls == C_QUOTE else CHAR_LITERAL_RUN).match(src, pos)
+                if m:
+                    kind = TokenType.FMT_STRING if cls == C_QUOTE else TokenType.CHAR_LITERAL
+                    yield kind, pos, m.end()
+                    pos = m.end()
+                else:
+                    pos += 1
+                    if not self._error(c, pos - 1, pos):
+                        break
+            else:
+                pos += 1
+                if not self._error(c, pos - 1, pos):
+                    break
+
+        self.position = pos
+
+    def _bytes_spans(self):
+        buf = self.source
+        n = len(buf)
+        pos = self.position
+        tokenizer = BYTES_TOKENIZER
+        keywords = BYTES_KEYWORDS
+        token_types = TokenType.__members__
+        ident_type = TokenType.ID
+
+        stop = self.stop
+        while pos < stop:
+            match = tokenizer.match(buf, pos)
+            kind = match.lastgroup
+            end = match.end()
+
+            if kind == 'ID':
+                kw = keywords.get(match.group())
+                if kw is not None and not (pos > 0 and _is_word_char(_bytes_char_before(buf, pos))) \
+                        and not (end < n and _is_word_char(_bytes_char_at(buf, end))):
+                    yield kw, pos, end
+                else:
+                    yield ident_type, pos, end
+            elif kind == 'SKIP' or kind == 'COMMENT':
+                pass
+            elif kind == 'MISMATCH':
+                # O erro é por caractere, não por byte
+                end = pos + _utf8_length(buf[pos])
+                if not self._error(_bytes_char_at(buf, pos), pos, end):
+                    pos = end
+                    break
             else:
-                token_type = TokenType[kind]
-                self.tokens.append(Token(value, token_type, self.line))
+                yield token_types[kind], pos, end
+            pos = end
 
-        return self.tokens, self.errors
\ No newline at end of file
+        self.position = pos
@@ -0,0 +1,494 @@
+# Arquivo: ll1_parser.py
+# Parser LL(1) dirigido por tabela: a gramática da Linguagem P é descrita como dados, os conjuntos
+# FIRST/FOLLOW e a tabela LL(1) são calculados uma vez (e guardados em disco) e o parse roda numa
+# pilha explícita, construindo as mesmas classes de ast_nodes com os mesmos ganchos da SymbolTable.
+import hashlib
+import os
+import pickle
+
+from diagnostics import CompileError, Diagnostic, DiagnosticList, diagnostic_of
+from lexer import Token, TokenStream, TokenType
+from symbol_table import SymbolTable, TableEntry
+import ast_nodes as ast
+
+# Símbolos: terminais são nomes de TokenType (maiúsculas), não-terminais começam com maiúscula
+# seguida de minúsculas e ações semânticas começam com '@'. Produção vazia = lista vazia.
+GRAMMAR = {
+    'Program': [['Function', 'Program'], []],
+    'Function': [['FUNCTION', 'FuncName', '@func_begin', 'LBRACKET', '@mark', 'Params', 'RBRACKET',
+                  'RetType', 'LBRACE', 'Block', 'RBRACE', '@func_end']],
+    'FuncName': [['ID'], ['MAIN']],
+    'Params': [['Param', 'ParamsTail'], []],
+    'ParamsTail': [['COMMA', 'Param', 'ParamsTail'], []],
+    'Param': [['ID', 'COLON', 'Type', '@param']],
+    'RetType': [['ARROW', 'Type', '@ret_type'], ['@void_type']],
+    'Type': [['INT'], ['FLOAT'], ['CHAR']],
+    'Block': [['@mark', 'Stmts', '@block']],
+    'Stmts': [['Stmt', 'Stmts'], []],
+    'Stmt': [['Decl'], ['Cmd']],
+    'Decl': [['LET', '@mark', 'ID', 'IdList', 'COLON', 'Type', 'SEMICOLON', '@var_decl']],
+    'IdList': [['COMMA', 'ID', 'IdList'], []],
+    'Cmd': [['ID', '@check_id', 'CmdTail'], ['If'], ['While'], ['Println'], ['Return'],
+            ['LBRACE', 'Block', 'RBRACE']],
+    'CmdTail': [['ASSIGN', 'Expr', 'SEMICOLON', '@assign'],
+                ['LBRACKET', '@mark', 'Args', 'RBRACKET', 'SEMICOLON', '@call']],
+    'If': [['IF', 'Expr', 'LBRACE', 'Block', 'RBRACE', 'Else', '@if']],
+    'Else': [['ELSE', 'ElseTail'], ['@none']],
+    'ElseTail': [['If'], ['LBRACE', 'Block', 'RBRACE']],
+    'While': [['WHILE', 'Expr', 'LBRACE', 'Block', 'RBRACE', '@while']],
+    'Println': [['PRINTLN', 'LBRACKET', 'FMT_STRING', '@mark', 'PrintArgs', 'RBRACKET', 'SEMICOLON', '@println']],
+    'PrintArgs': [['COMMA', 'Args'], []],
+    'Return': [['RETURN', 'Expr', 'SEMICOLON', '@return']],
+    'Args': [['Expr', 'ArgsTail'], []],
+    'ArgsTail': [['COMMA', 'Expr', 'ArgsTail'], []],
+    'Expr': [['Add', 'RelTail']],
+    'RelTail': [['RelOp', 'Add', '@binop', 'RelTail'], []],
+    'RelOp': [['LT'], ['LE'], ['GT'], ['GE'], ['EQ'], ['NE']],
+    'Add': [['Term', 'AddTail']],
+    'AddTail': [['AddOp', 'Term', '@binop', 'AddTail'], []],
+    'AddOp': [['PLUS'], ['MINUS']],
+    'Term': [['Factor', 'TermTail']],
+    'TermTail': [['MulOp', 'Factor', '@binop', 'TermTail'], []],
+    'MulOp': [['MULT'], ['DIV']],
+    'Factor': [['ID', '@check_id', 'FactorTail'], ['INT_CONST', '@int'], ['FLOAT_CONST', '@float'],
+               ['CHAR_LITERAL', '@char'], ['LBRACKET', 'Expr', 'RBRACKET']],
+    'FactorTail': [['LBRACKET', '@mark', 'Args', 'RBRACKET', '@call'], ['@var']],
+}
+
+START_SYMBOL = 'Program'
+EOF = '$'
+
+# Não-terminais onde o modo pânico se recupera: um comando com erro é descartado; um erro fora
+# de comandos descarta a função inteira.
+RECOVERY_POINTS = ('Stmt', 'Function')
+
+# Terminais que não vão para a pilha de valores (só estruturam a frase)
+PUNCTUATION = frozenset(['FUNCTION', 'LBRACKET', 'RBRACKET', 'LBRACE', 'RBRACE', 'ARROW', 'COLON', 'SEMICOLON',
+                         'COMMA', 'ASSIGN', 'LET', 'IF', 'ELSE', 'WHILE', 'PRINTLN', 'RETURN'])
+
+TOKEN_DISPLAY = {
+    'FUNCTION': 'fn', 'MAIN': 'main', 'LET': 'let', 'INT': 'int', 'FLOAT': 'float', 'CHAR': 'char',
+    'IF': 'if', 'ELSE': 'else', 'WHILE': 'while', 'PRINTLN': 'println', 'RETURN': 'return',
+    'ID': 'identificador', 'INT_CONST': 'constante inteira', 'FLOAT_CONST': 'constante float',
+    'CHAR_LITERAL': 'caractere', 'FMT_STRING': 'string', 'LBRACKET': '(', 'RBRACKET': ')', 'LBRACE': '{',
+    'RBRACE': '}', 'ARROW': '->', 'COLON': ':', 'SEMICOLON': ';', 'COMMA': ',', 'ASSIGN': '=', 'EQ': '==',
+    'NE': '!=', 'GT': '>', 'GE': '>=', 'LT': '<', 'LE': '<=', 'PLUS': '+', 'MINUS': '-', 'MULT': '*', 'DIV': '/',
+    EOF: 'fim do arquivo',
+}
+
+CACHE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '__pycache__')
+
+
+def is_terminal(symbol: str) -> bool:
+    return symbol.isupper() or symbol == EOF
+
+
+def is_action(symbol: str) -> bool:
+    return symbol.startswith('@')
+
+
+def compute_first(grammar: dict) -> dict[str, set]:
+    # FIRST de cada não-terminal; '' representa ε
+    first = {nt: set() for nt in grammar}
+    changed = True
+    while changed:
+        changed = False
+        for nt, productions in grammar.items():
+            for production in productions:
+                before = len(first[nt])
+                first[nt] |= first_of_sequence(production, first)
+                changed |= len(first[nt]) != before
+    return first
+
+
+def first_of_sequence(symbols: list[str], first: dict) -> set:
+    result = set()
+    for symbol in symbols:
+        if is_action(symbol):
+            continue
+        if is_terminal(symbol):
+            result.add(symbol)
+            return result
+        result |= first[symbol] - {''}
+        if '' not in first[symbol]:
+            return result
+    result.add('')
+    return result
+
+
+def compute_follow(grammar: dict, first: dict) -> dict[str, set]:
+    follow = {nt: set() for nt in grammar}
+    follow[START_SYMBOL].add(EOF)
+    changed = True
+    while changed:
+        changed = False
+        for nt, productions in grammar.items():
+            for production in productions:
+                for i, symbol in enumerate(production):
+                    if is_action(symbol) or is_terminal(symbol):
+                        continue
+                    before = len(follow[symbol])
+                    rest = first_of_sequence(production[i + 1:], first)
+                    follow[symbol] |= rest - {''}
+                    if '' in rest:
+                        follow[symbol] |= follow[nt]
+                    changed |= len(follow[symbol]) != before
+    return follow
+
+
+def build_table(grammar: dict) -> dict:
+    # Tabela LL(1) com nomes de símbolos (serializável): {não-terminal: {terminal: produção}}
+    first = compute_first(grammar)
+    follow = compute_follow(grammar, first)
+    table = {nt: {} for nt in grammar}
+    for nt, productions in grammar.items():
+        for production in productions:
+            lookaheads = first_of_sequence(production, first)
+            if '' in lookaheads:
+                lookaheads = (lookaheads - {''}) | follow[nt]
+            for terminal in lookaheads:
+                if terminal in table[nt]:
+                    raise Exception(f"Gramática não é LL(1): conflito em {nt} com '{terminal}'")
+                table[nt][terminal] = production
+    return {'table': table, 'first': first, 'follow': follow}
+
+
+def expand(table: dict, production: list[str], terminal: str) -> list[str]:
+    # Com o mesmo lookahead, um não-terminal no início da produção seria expandido logo em seguida:
+    # a expansão é feita aqui, uma vez, para cortar as cadeias Expr -> Add -> Term -> Factor.
+    # Pontos de recuperação e não-terminais sem entrada (erro) ficam na pilha como estão.
+    result = list(production)
+    while result and not is_terminal(result[0]) and not is_action(result[0]) \
+            and result[0] not in RECOVERY_POINTS and terminal in table[result[0]]:
+        result[:1] = table[result[0]][terminal]
+    return result
+
+
+def load_table(grammar: dict = GRAMMAR, cache_dir: str = CACHE_DIR) -> dict:
+    # A tabela é recalculada só quando a gramática muda (a chave do cache é o hash da gramática)
+    digest = hashlib.sha256(repr(sorted(grammar.items())).encode('utf-8')).hexdigest()[:16]
+    cache_file = os.path.join(cache_dir, f"ll1_table.{digest}.pickle")
+    try:
+        with open(cache_file, 'rb') as f:
+            return pickle.load(f)
+    except (OSError, pickle.UnpicklingError, EOFError):
+        pass
+
+    data = build_table(grammar)
+    try:
+        os.makedirs(cache_dir, exist_ok=True)
+        with open(cache_file + '.tmp', 'wb') as f:
+            pickle.dump(data, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(cache_file + '.tmp', cache_file)
+    except OSError:
+        pass
+    return data
+
+
+MARK = object()  # Marcador de início de lista na pilha de valores
+
+
+class ExpectedTokens:
+    # Lista de terminais esperados, só convertida em texto quando a mensagem é lida
+    __slots__ = ('expected',)
+
+    def __init__(self, expected):
+        self.expected = expected
+
+    def __str__(self):
+        names = sorted(TOKEN_DISPLAY[EOF if t is None else t.name] for t in self.expected)
+        return 'Esperado ' + ' ou '.join(f"'{name}'" for name in names)
+
+
+class LL1Parser:
+    """Parser LL(1) com pilha explícita, com a mesma interface de resultados do Parser.
+
+    A recuperação de erros usa os conjuntos reais da gramática: ao errar dentro de um comando,
+    o comando é descartado e os tokens são pulados até um ';' (consumido), um token de
+    FOLLOW(Stmt) ou um que inicie outro comando; fora de comandos, a função é descartada e os
+    tokens são pulados até FOLLOW(Function).
+    """
+
+    def __init__(self, tokens: list[Token] | TokenStream, max_errors: int | None = None, nodes=ast):
+        self.tokens = tokens
+        self.current = 0
+        self.errors = DiagnosticList(max_errors)
+        self.symbol_table = SymbolTable()
+        self.nodes = nodes
+
+        self.function_tables = {}
+        self.function_asts = {}
+        self.current_entry = None
+        self.current_function = None
+
+        self.stack = []
+        self.values = []
+        # Pontos de recuperação abertos: (não-terminal, tamanho da pilha, tamanho dos valores, nº de escopos)
+        self.recovery = []
+
+        data = load_table()
+        self.first = data['first']
+        self.follow = data['follow']
+
+        # Tabela em forma de execução: terminais viram TokenType (EOF vira None), ações viram
+        # métodos ligados e as produções já ficam invertidas para empilhar de uma vez.
+        def runtime_symbol(symbol):
+            if is_action(symbol):
+                return getattr(self, 'act_' + symbol[1:])
+            if symbol == EOF:
+                return None
+            if is_terminal(symbol):
+                return TokenType[symbol]
+            return symbol
+
+        grammar_table = data['table']
+        self.table = {
+            nt: {runtime_symbol(t): tuple(runtime_symbol(s) for s in reversed(expand(grammar_table, production, t)))
+                 for t, production in row.items()}
+            for nt, row in grammar_table.items()
+        }
+
+        # Sincronização do modo pânico: FOLLOW do ponto de recuperação mais os tokens que iniciam
+        # outra frase dele, exceto ID, que também aparece no meio de expressões
+        self.sync_sets = {}
+        for nt in RECOVERY_POINTS:
+            sync = (self.follow[nt] | self.first[nt]) - {'', 'ID'}
+            self.sync_sets[nt] = frozenset(runtime_symbol(t) for t in sync)
+
+        self.punctuation = frozenset(TokenType[name] for name in PUNCTUATION)
+
+    # --- Utilitários ---
+    def current_token(self) -> Token | None:
+        # None no fim do arquivo (o Diagnostic mostra "fim do arquivo" como posição)
+        if self.current >= len(self.tokens):
+            return None
+        return self.tokens[self.current]
+
+    def found(self) -> str:
+        tok = self.current_token()
+        return TOKEN_DISPLAY[EOF] if tok is None else tok.lexeme
+
+    def expected_error(self, expected) -> CompileError:
+        return CompileError(Diagnostic('S001', (ExpectedTokens(expected), self.found()), self.current_token()))
+
+    # --- Parsing ---
+    def parse_program(self):
+        stack = self.stack
+        values = self.values
+        recovery = self.recovery
+        table = self.table
+        tokens = self.tokens
+        size = len(tokens)
+        punctuation = self.punctuation
+        end_recovery = self.end_recovery
+        pop = stack.pop
+        push = stack.append
+        extend = stack.extend
+
+        push(START_SYMBOL)
+        while stack:
+            # current e la ficam em variáveis locais; self.current só é atualizado nos erros, que são
+            # o único ponto que o consulta
+            current = self.current
+            la = tokens[current].token_type if current < size else None
+            try:
+                while stack:
+                    top = pop()
+
+                    if top.__class__ is str:
+                        production = table[top].get(la)
+                        if production is None:
+                            self.current = current
+                            if top == START_SYMBOL:
+                                raise CompileError(Diagnostic('S007', (self.found(),), self.current_token()))
+                            raise self.expected_error(table[top])
+                        if top in RECOVERY_POINTS:
+                            recovery.append((top, len(stack), len(values), self.symbol_table.depth))
+                            push(end_recovery)
+                        extend(production)
+                    elif top.__class__ is TokenType:
+                        if la is not top:
+                            self.current = current
+                            raise self.expected_error([top])
+                        if top not in punctuation:
+                            values.append(tokens[current])
+                        current += 1
+                        la = tokens[current].token_type if current < size else None
+                    else:
+                        top()
+            except Exception as e:
+                self.current = current
+                if not self.errors.report(diagnostic_of(e)):
+                    break
+                self.recover()
+
+        self.current = current
+        return self.errors, self.function_tables, self.function_asts
+
+    def end_recovery(self):
+        self.recovery.pop()
+
+    def restore(self, frame: tuple):
+        _, stack_size, values_size, depth = frame
+        del self.stack[stack_size:]
+        del self.values[values_size:]
+        if self.symbol_table.depth > depth and self.current_function is not None:
+            # A função é descartada, mas a tabela guarda o que ela declarou até o erro
+            self.function_tables[self.current_function] = self.symbol_table.get_current_scope()
+            self.current_function = None
+        self.symbol_table.exit_to(depth)
+
+    def recover(self):
+        tokens = self.tokens
+        size = len(tokens)
+        recovery = self.recovery
+
+        if not recovery:
+            # Erro no nível do programa: pula até o próximo 'fn' e recomeça
+            self.current += 1
+            while self.current < size and tokens[self.current].token_type != TokenType.FUNCTION:
+                self.current += 1
+            self.stack[:] = [START_SYMBOL]
+            return
+
+        if recovery[-1][0] == 'Stmt':
+            sync = self.sync_sets['Stmt']
+            while self.current < size:
+                tt = tokens[self.current].token_type
+                if tt == TokenType.SEMICOLON:
+                    self.current += 1
+                    self.restore(recovery.pop())
+                    return
+                if tt in sync or tt == TokenType.FUNCTION:
+                    break
+                self.current += 1
+
+            if self.current < size and tokens[self.current].token_type != TokenType.FUNCTION:
+                self.restore(recovery.pop())
+                return
+
+            # Um 'fn' (ou o fim do arquivo) antes de fechar a função: recupera no nível da função
+            while recovery[-1][0] != 'Function':
+                recovery.pop()
+
+        self.restore(recovery.pop())
+        sync = self.sync_sets['Function']
+        while self.current < size and tokens[self.current].token_type not in sync:
+            self.current += 1
+
+    # --- Ações semânticas ---
+    def pop_list(self) -> list:
+        # Retira da pilha de valores tudo o que foi empilhado depois do último MARK
+        values = self.values
+        i = len(values) - 1
+        while values[i] is not MARK:
+            i -= 1
+        items = values[i + 1:]
+        del values[i:]
+        return items
+
+    def act_mark(self):
+        self.values.append(MARK)
+
+    def act_func_begin(self):
+        name_tok = self.values[-1]
+        entry = TableEntry(name_tok.lexeme, 'void', name_tok.line, 'function')
+        self.symbol_table.add_entry(entry, name_tok.column)
+        self.current_entry = entry
+
+        self.symbol_table.enter_scope()
+        self.current_function = entry.lexema
+
+    def act_func_end(self):
+        values = self.values
+        body = values.pop()
+        return_type = values.pop()
+        params = self.pop_list()
+        name = values.pop().lexeme
+
+        self.function_tables[self.current_function] = self.symbol_table.get_current_scope()
+        self.current_function = None
+        self.symbol_table.exit_scope()
+        self.function_asts[name] = self.nodes.FunctionDecl(name=name, params=params, return_type=return_type, body=body)
+
+    def act_param(self):
+        values = self.values
+        ptype = values.pop().lexeme
+        name_tok = values.pop()
+        self.symbol_table.add_entry(TableEntry(name_tok.lexeme, ptype, name_tok.line, 'parameter'), name_tok.column)
+        values.append(self.nodes.Param(name=name_tok.lexeme, type=ptype))
+
+    def act_ret_type(self):
+        return_type = self.values.pop().lexeme
+        self.current_entry.tipo = return_type
+        self.values.append(return_type)
+
+    def act_void_type(self):
+        self.values.append('void')
+
+    def act_block(self):
+        self.values.append(self.nodes.Block(statements=self.pop_list()))
+
+    def act_var_decl(self):
+        vtype = self.values.pop().lexeme
+        names = []
+        for tok in self.pop_list():
+            self.symbol_table.add_entry(TableEntry(tok.lexeme, vtype, tok.line, 'variable'), tok.column)
+            names.append(tok.lexeme)
+        self.values.append(self.nodes.VarDecl(names=names, type=vtype))
+
+    def act_check_id(self):
+        # Troca o token do identificador pela sua Binding na pilha de valores
+        tok = self.values[-1]
+        binding = self.symbol_table.resolve(tok.lexeme)
+        if binding is None:
+            raise CompileError(Diagnostic('E001', (tok.lexeme,), tok))
+        self.values[-1] = binding
+
+    def act_assign(self):
+        value = self.values.pop()
+        binding = self.values.pop()
+        self.values.append(self.nodes.Assign(name=binding.entry.lexema, value=value, resolved=binding.address))
+
+    def act_call(self):
+        args = self.pop_list()
+        self.values.append(self.nodes.FunctionCall(name=self.values.pop().entry.lexema, args=args))
+
+    def act_var(self):
+        binding = self.values.pop()
+        self.values.append(self.nodes.VarAccess(name=binding.entry.lexema, resolved=binding.address))
+
+    def act_none(self):
+        self.values.append(None)
+
+    def act_if(self):
+        values = self.values
+        else_branch = values.pop()
+        then_branch = values.pop()
+        values.append(self.nodes.IfStmt(condition=values.pop(), then_branch=then_branch, else_branch=else_branch))
+
+    def act_while(self):
+        body = self.values.pop()
+        self.values.append(self.nodes.WhileStmt(condition=self.values.pop(), body=body))
+
+    def act_println(self):
+        args = self.pop_list()
+        self.values.append(self.nodes.PrintlnStmt(fmt_string=self.values.pop().lexeme, args=args))
+
+    def act_return(self):
+        self.values.append(self.nodes.ReturnStmt(value=self.values.pop()))
+
+    def act_binop(self):
+        values = self.values
+        right = values.pop()
+        op = values.pop().lexeme
+        values[-1] = self.nodes.BinOp(left=values[-1], op=op, right=right)
+
+    def act_int(self):
+        self.values.append(self.nodes.Literal(value=int(self.values.pop().lexeme), type='int'))
+
+    def act_float(self):
+        self.values.append(self.nodes.Literal(value=float(self.values.pop().lexeme), type='float'))
+
+    def act_char(self):
+        self.values.append(self.nodes.Literal(value=self.values.pop().lexeme, type='char'))
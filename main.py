@@ -1,56 +1,249 @@
 import sys
 import os
+import glob
 import json
-from dataclasses import asdict
-from lexer import Lexer, Token
-from parser import Parser
-from symbol_table import TableEntry
+import time
+import argparse
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import ExitStack
+from dataclasses import dataclass, asdict
+from itertools import repeat
+from lexer import Lexer, Token, map_source_file, token_arrays
+from parser import Parser, StreamingParser
+from ll1_parser import LL1Parser
+from parallel_lexer import ParallelLexer
+from parallel_parser import ParallelParser
+from compact_ast import SLOTTED_NODES, AstArena
+from compile_cache import DEFAULT_CACHE_DIR, DEFAULT_MAX_SIZE, CacheEntry, CompileCache
+from server import DEFAULT_MAX_ENTRIES, CompileServer, serve_stdio, serve_unix
+from symbol_index import SymbolIndex
+from profiler import NULL_PROFILER, Profiler, count_nodes
+from optimizer import Optimizer
+from bytecode import BytecodeError, compile_program
+from vm import DEFAULT_MEMO_SIZE, VM, VMError, format_memo_stats
+from transpiler import PythonProgram, TranspileError, compile_source, dumps_code, loads_code, transpile_program
+from ir import IrError, build_program
+from ir_passes import DEFAULT_PIPELINE, PASSES, PassManager, format_report
+from ir_bytecode import compile_ir_program
 import ast_nodes
+import serializer
 
+AST_FORMS = ('dataclass', 'slots', 'arena')
+BACKENDS = ('vm', 'python')
+QUERIES = ('declaracao', 'tipo', 'chamadas')
+OUTPUT_FORMATS = ('json', 'compact', 'binary')
+SAIDAS_DIR = "saidas"
+ERROS_DIR = "erros"
 
-def write_json(filename: str, data: dict):
-    """Escreve dados (ASTs e Tabelas) em JSON formatado."""
 
-    def serializer(obj):
-        if isinstance(obj, TableEntry):
-            return obj.__dict__
+@dataclass
+class CompileResult:
+    """Resumo da compilação de um arquivo (o que o modo batch agrega)."""
+    source: str
+    tokens: int = 0
+    lexical_errors: int = 0
+    syntactic_errors: int = 0
+    elapsed: float = 0.0
+    failure: str | None = None  # Erro de leitura ou exceção inesperada
+    cached: bool = False  # Saídas restauradas do cache, sem léxico/sintático
 
-        # Se for um nó da ASA (dataclass), converte para dicionário
-        if hasattr(obj, '__dataclass_fields__'):
-            d = asdict(obj)
-            # Campo extra para saber o tipo do nó
-            d['_node_type'] = obj.__class__.__name__
-            return d
 
-        raise TypeError(f"Objeto {type(obj)} não serializável")
+def make_nodes(ast_form: str):
+    # Fábrica de nós passada ao parser para cada forma de AST
+    if ast_form == 'slots':
+        return SLOTTED_NODES
+    if ast_form == 'arena':
+        return AstArena()
+    return ast_nodes
 
+
+def export_node(nodes, node):
+    # Na arena o parser devolve ids; para o JSON a subárvore é reconstruída como objetos
+    return nodes.to_node(node) if isinstance(nodes, AstArena) else node
+
+
+def make_optimizer(nodes) -> Optimizer:
+    # O otimizador trabalha nas árvores exportadas (a arena é reconstruída com as classes de ast_nodes)
+    return Optimizer(ast_nodes if isinstance(nodes, AstArena) else nodes)
+
+
+def log_optimization(stats, log=print):
+    log(f"Otimização: {stats.eliminated} nós eliminados ({stats.nodes_before} -> {stats.nodes_after}); "
+        f"{stats.folded} constantes dobradas, {stats.simplified} identidades, "
+        f"{stats.dead_statements} comandos inalcançáveis, {stats.pruned} if/while podados.")
+
+
+def output_extension(output_format: str) -> str:
+    return '.bin' if output_format == 'binary' else '.json'
+
+
+def quiet(*args):
+    # Substitui o print nos processos do modo batch
+    pass
+
+
+def write_json(filename: str, data: dict, output_format: str = 'json', log=print):
+    """Escreve dados (ASTs e Tabelas) em JSON formatado, JSON compacto ou binário."""
     try:
-        with open(filename, 'w', encoding='utf-8') as f:
-            json.dump(data, f, default=serializer, indent=2, ensure_ascii=False)
-        print(f"Arquivo gerado com sucesso: {filename}")
+        if output_format == 'binary':
+            with open(filename, 'wb') as f:
+                serializer.dump_binary(data, f)
+        else:
+            with open(filename, 'w', encoding='utf-8') as f:
+                serializer.dump(data, f, indent=None if output_format == 'compact' else 2)
+        log(f"Arquivo gerado com sucesso: {filename}")
     except Exception as e:
         print(f"Erro ao salvar JSON {filename}: {e}")
 
 
-def write_errors(filename: str, errors: list):
+def write_bytes(filename: str, payload: bytes, log=print):
+    try:
+        with open(filename, 'wb') as f:
+            f.write(payload)
+        log(f"Arquivo gerado com sucesso: {filename}")
+    except Exception as e:
+        print(f"Erro ao salvar {filename}: {e}")
+
+
+def write_errors(filename: str, errors: list, log=print):
     try:
         with open(filename, 'w', encoding='utf-8') as f:
             for err in errors:
                 f.write(str(err) + '\n')
-        print(f"Log de erros gerado: {filename}")
+        log(f"Log de erros gerado: {filename}")
     except Exception as e:
         print(f"Erro ao salvar erros {filename}: {e}")
 
 
-def main():
-    if len(sys.argv) != 2:
-        print("Uso: python main.py <caminho_para_arquivo_fonte>")
-        sys.exit(1)
+class JsonObjectWriter:
+    """Escreve um objeto JSON de primeiro nível item a item, no mesmo formato de write_json."""
+
+    def __init__(self, filename: str, indent: int | None = 2):
+        self.file = open(filename, 'w', encoding='utf-8')
+        self.indent = indent
+        self.empty = True
+        self.file.write('{')
+
+    def write_item(self, key: str, value):
+        if self.indent is None:
+            self.file.write('' if self.empty else ',')
+            self.file.write(serializer.dumps(key) + ':' + serializer.dumps(value, None))
+        else:
+            self.file.write('\n  ' if self.empty else ',\n  ')
+            self.file.write(serializer.dumps(key) + ': ' + serializer.dumps(value, self.indent, level=1))
+        self.empty = False
+
+    def close(self):
+        self.file.write('}' if self.empty or self.indent is None else '\n}')
+        self.file.close()
+
+
+def compile_streaming(source_code: str, engine: str, lexical_errors_file: str, syntactic_errors_file: str,
+                      symbol_tables_file: str, ast_file: str, result: CompileResult, max_errors: int | None = None,
+                      ast_form: str = 'dataclass', output_format: str = 'json', log=print,
+                      optimize: bool = False) -> CompileResult:
+    # Léxico e sintático intercalados: cada função é escrita assim que termina e depois descartada.
+    # As saídas vão para arquivos temporários e só substituem as finais se não houver erro léxico.
+    log("--- Análise Léxica e Sintática (streaming) ---")
+    lexer = Lexer(source_code, engine=engine, max_errors=max_errors)
+    nodes = make_nodes(ast_form)
+    parser = StreamingParser(lexer.iter_tokens(), max_errors, nodes)
+    optimizer = make_optimizer(nodes) if optimize else None
 
-    source_file_path = sys.argv[1]
+    tables_tmp = symbol_tables_file + '.tmp'
+    ast_tmp = ast_file + '.tmp'
+    indent = None if output_format == 'compact' else 2
+    tables_writer = JsonObjectWriter(tables_tmp, indent)
+    ast_writer = JsonObjectWriter(ast_tmp, indent)
+    try:
+        for func_name, table, func_node in parser.iter_functions():
+            tables_writer.write_item(func_name, table)
+            if func_node is not None:
+                func_node = export_node(nodes, func_node)
+                if optimizer is not None:
+                    func_node = optimizer.optimize_function(func_node, table)
+                ast_writer.write_item(func_name, func_node)
+            del parser.function_tables[func_name]
+            if lexer.errors:
+                break
+    finally:
+        tables_writer.close()
+        ast_writer.close()
+
+    # Esgota o léxico para reportar todos os erros léxicos, como no modo completo
+    for _ in parser.token_iter:
+        pass
+
+    write_errors(lexical_errors_file, lexer.errors, log)
+    result.tokens = parser.current
+
+    if lexer.errors:
+        os.remove(tables_tmp)
+        os.remove(ast_tmp)
+        result.lexical_errors = lexer.errors.error_count()
+        log(f"Encontrados {result.lexical_errors} erros léxicos. Parando.")
+        return result
+    else:
+        log(f"Sucesso! {parser.current} tokens consumidos.")
+
+    write_errors(syntactic_errors_file, parser.errors, log)
+    result.syntactic_errors = parser.errors.error_count()
+
+    if parser.errors:
+        log(f"Encontrados {result.syntactic_errors} erros sintáticos/semânticos.")
+    else:
+        log("Sucesso! Nenhum erro sintático encontrado.")
+    if optimizer is not None:
+        log_optimization(optimizer.stats, log)
+
+    os.replace(tables_tmp, symbol_tables_file)
+    os.replace(ast_tmp, ast_file)
+    log(f"Arquivo gerado com sucesso: {symbol_tables_file}")
+    log(f"Arquivo gerado com sucesso: {ast_file}")
+    log("Processo concluído.")
+    return result
+
+
+def restore_cached(entry: CacheEntry, lexical_errors_file: str, syntactic_errors_file: str, symbol_tables_file: str,
+                   ast_file: str, output_format: str, result: CompileResult, log=print):
+    # Regrava as saídas de uma compilação anterior do mesmo conteúdo
+    log("--- Cache: saídas restauradas sem análise léxica/sintática ---")
+    result.cached = True
+    result.tokens = entry.token_count
+    write_errors(lexical_errors_file, entry.lexical_errors, log)
+    if entry.lexical_count:
+        result.lexical_errors = entry.lexical_count
+        log(f"Encontrados {entry.lexical_count} erros léxicos. Parando.")
+        return
+
+    write_errors(syntactic_errors_file, entry.syntactic_errors, log)
+    result.syntactic_errors = entry.syntactic_count
+    if entry.syntactic_count:
+        log(f"Encontrados {entry.syntactic_count} erros sintáticos/semânticos.")
+
+    if output_format == 'binary':
+        # O cache já guarda tabelas e ASTs no formato dos arquivos .bin
+        write_bytes(symbol_tables_file, entry.tables, log)
+        write_bytes(ast_file, entry.asts, log)
+    else:
+        write_json(symbol_tables_file, serializer.loads_binary(entry.tables), output_format, log)
+        write_json(ast_file, serializer.loads_binary(entry.asts), output_format, log)
+    log("Processo concluído.")
+
+
+def compile_file(source_file_path: str, options, log=print, cache: CompileCache | None = None,
+                 profiler=NULL_PROFILER) -> CompileResult:
+    """Compila um arquivo com as opções da linha de comando, gravando saidas/ e erros/."""
+    # Com --mmap, o mapa do fonte fica aberto até o fim da compilação: os lexemas são lidos dele sob demanda
+    with ExitStack() as resources:
+        return _compile_file(source_file_path, options, log, cache, profiler, resources)
+
+
+def _compile_file(source_file_path: str, options, log, cache: CompileCache | None, profiler,
+                  resources: ExitStack) -> CompileResult:
+    start = time.perf_counter()
+    result = CompileResult(source_file_path)
 
-    SAIDAS_DIR = "saidas"
-    ERROS_DIR = "erros"
     os.makedirs(SAIDAS_DIR, exist_ok=True)
     os.makedirs(ERROS_DIR, exist_ok=True)
 
@@ -59,50 +252,583 @@ def main():
     # Nomes dos arquivos
     lexical_errors_file = os.path.join(ERROS_DIR, f"{base_name}_lexical_errors.txt")
     syntactic_errors_file = os.path.join(ERROS_DIR, f"{base_name}_syntactic_errors.txt")
-    symbol_tables_file = os.path.join(SAIDAS_DIR, f"{base_name}_symbol_tables.json")
-    ast_file = os.path.join(SAIDAS_DIR, f"{base_name}_ast.json")
+    extension = output_extension(options.output_format)
+    symbol_tables_file = os.path.join(SAIDAS_DIR, f"{base_name}_symbol_tables{extension}")
+    ast_file = os.path.join(SAIDAS_DIR, f"{base_name}_ast{extension}")
 
-    # 1. Leitura
+    # 1. Leitura (com --mmap o fonte não é copiado para um str)
     try:
-        with open(source_file_path, 'r', encoding='utf-8') as f:
-            source_code = f.read()
+        with profiler.phase('read', file=source_file_path) as record:
+            if options.mmap:
+                source_code = resources.enter_context(map_source_file(source_file_path))
+            else:
+                with open(source_file_path, 'r', encoding='utf-8') as f:
+                    source_code = f.read()
+            record['chars'] = len(source_code)
     except Exception as e:
-        print(f"Erro ao ler arquivo: {e}")
-        sys.exit(1)
+        result.failure = f"Erro ao ler arquivo: {e}"
+        log(result.failure)
+        return result
+
+    # Mesmo conteúdo, mesmas opções que mudam a saída e mesma versão do compilador: só restaura
+    cache_key = None
+    if cache is not None:
+        with profiler.phase('cache_lookup') as record:
+            cache_key = cache.key(source_code, options.parser, options.max_errors, options.optimize)
+            entry = cache.get(cache_key)
+            record['hit'] = entry is not None
+        if entry is not None:
+            with profiler.phase('cache_restore'):
+                restore_cached(entry, lexical_errors_file, syntactic_errors_file, symbol_tables_file, ast_file,
+                               options.output_format, result, log)
+            if options.run and not (result.lexical_errors or result.syntactic_errors):
+                execute(lambda: (serializer.loads_binary(entry.asts), serializer.loads_binary(entry.tables)),
+                        result, options, log, profiler, cache, cache_key)
+            result.elapsed = time.perf_counter() - start
+            return result
+
+    if options.stream:
+        # O streaming descarta cada função depois de gravá-la, então não alimenta o cache
+        with profiler.phase('stream') as record:
+            compile_streaming(source_code, options.lexer, lexical_errors_file, syntactic_errors_file,
+                              symbol_tables_file, ast_file, result, options.max_errors, options.ast,
+                              options.output_format, log, options.optimize)
+            record['tokens'] = result.tokens
+        result.elapsed = time.perf_counter() - start
+        return result
 
     # 2. Análise Léxica
-    print("--- Análise Léxica ---")
-    lexer = Lexer(source_code)
-    tokens, lexical_errors = lexer.scan_tokens()
+    log("--- Análise Léxica ---")
+    with profiler.phase('lex', engine=options.lexer) as lex_record:
+        if options.lex_workers:
+            lexer = ParallelLexer(source_code, engine=options.lexer, workers=options.lex_workers,
+                                  max_errors=options.max_errors)
+        else:
+            lexer = Lexer(source_code, engine=options.lexer, max_errors=options.max_errors)
+        if options.lex_workers or options.mmap:
+            # Com --mmap, offsets em bytes; lexemas decodificados só quando o parser os usa
+            tokens, lexical_errors = lexer.scan_stream()
+        else:
+            tokens, lexical_errors = lexer.scan_tokens()
+    if profiler.enabled:
+        lex_record.update(tokens=len(tokens), lexical_errors=lexical_errors.error_count(),
+                          tokens_per_sec=len(tokens) / lex_record['wall'] if lex_record['wall'] else None)
 
-    write_errors(lexical_errors_file, lexical_errors)
+    with profiler.phase('write_errors', file=lexical_errors_file):
+        write_errors(lexical_errors_file, lexical_errors, log)
+    result.tokens = len(tokens)
 
     if lexical_errors:
-        print(f"Encontrados {len(lexical_errors)} erros léxicos. Parando.")
-        sys.exit(1)
+        result.lexical_errors = lexical_errors.error_count()
+        if cache_key is not None:
+            cache.put(cache_key, CacheEntry(*token_arrays(tokens)[1:], [str(e) for e in lexical_errors],
+                                            result.lexical_errors))
+        result.elapsed = time.perf_counter() - start
+        log(f"Encontrados {result.lexical_errors} erros léxicos. Parando.")
+        return result
     else:
-        print(f"Sucesso! {len(tokens)} tokens gerados.")
+        log(f"Sucesso! {len(tokens)} tokens gerados.")
 
     # 3. Análise Sintática e Semântica (ASA)
-    print("--- Análise Sintática e Semântica ---")
-    parser = Parser(tokens)
+    log("--- Análise Sintática e Semântica ---")
+    with profiler.phase('parse', parser=options.parser) as parse_record:
+        nodes = make_nodes(options.ast)
+        if options.parser == 'll1':
+            parser = LL1Parser(tokens, options.max_errors, nodes)
+        elif options.parse_workers:
+            parser = ParallelParser(tokens, options.max_errors, nodes, workers=options.parse_workers)
+        else:
+            parser = Parser(tokens, options.max_errors, nodes)
 
-    # O parser retorna ASAs
-    syntactic_errors, function_tables, function_asts = parser.parse_program()
+        # O parser retorna ASAs
+        syntactic_errors, function_tables, function_asts = profiler.parse_program(parser)
 
-    write_errors(syntactic_errors_file, syntactic_errors)
+    with profiler.phase('write_errors', file=syntactic_errors_file):
+        write_errors(syntactic_errors_file, syntactic_errors, log)
+    result.syntactic_errors = syntactic_errors.error_count()
 
     if syntactic_errors:
-        print(f"Encontrados {len(syntactic_errors)} erros sintáticos/semânticos.")
+        log(f"Encontrados {result.syntactic_errors} erros sintáticos/semânticos.")
+    else:
+        log("Sucesso! Nenhum erro sintático encontrado.")
+
+    asts = {name: export_node(nodes, node) for name, node in function_asts.items()}
+
+    # 4. Otimização da AST (dobra de constantes, identidades, código inalcançável)
+    if options.optimize:
+        with profiler.phase('optimize') as record:
+            stats = make_optimizer(nodes).optimize(asts, function_tables)
+        if profiler.enabled:
+            record.update(nodes_before=stats.nodes_before, nodes_after=stats.nodes_after,
+                          eliminated=stats.eliminated, folded=stats.folded, simplified=stats.simplified,
+                          dead_statements=stats.dead_statements, pruned=stats.pruned)
+        log_optimization(stats, log)
+
+    # 5. Escrever Saídas (JSON ou binário)
+    if profiler.enabled:
+        # Contado fora da fase para não entrar no tempo do sintático
+        node_counts = count_nodes(asts)
+        table_sizes = [len(table) for table in function_tables.values()]
+        parse_record.update(
+            tokens_per_sec=len(tokens) / parse_record['wall'] if parse_record['wall'] else None,
+            syntactic_errors=result.syntactic_errors, functions=len(function_tables),
+            symbols=sum(table_sizes), largest_table=max(table_sizes, default=0),
+            ast_nodes=sum(node_counts.values()), ast_nodes_by_type=dict(node_counts.most_common()))
+
+    tables_payload = asts_payload = None
+    if cache_key is not None:
+        # O cache guarda tabelas e ASTs no formato .bin; com --output-format binary elas são gravadas uma vez só
+        with profiler.phase('serialize_cache'):
+            tables_payload = serializer.dumps_binary(function_tables)
+            asts_payload = serializer.dumps_binary(asts)
+    for filename, data, payload in ((symbol_tables_file, function_tables, tables_payload),
+                                    (ast_file, asts, asts_payload)):
+        with profiler.phase('write_json', file=filename, format=options.output_format):
+            if payload is not None and options.output_format == 'binary':
+                write_bytes(filename, payload, log)
+            else:
+                write_json(filename, data, options.output_format, log)
+    if cache_key is not None:
+        cache.put(cache_key, CacheEntry(*token_arrays(tokens)[1:], [str(e) for e in lexical_errors], 0,
+                                        [str(e) for e in syntactic_errors], result.syntactic_errors,
+                                        tables_payload, asts_payload))
+
+    log("Processo concluído.")
+    if options.run and not syntactic_errors:
+        execute(lambda: (asts, function_tables), result, options, log, profiler, cache, cache_key)
+    result.elapsed = time.perf_counter() - start
+    return result
+
+
+def execute(load_program, result: CompileResult, options, log=print, profiler=NULL_PROFILER,
+            cache: CompileCache | None = None, cache_key: str | None = None):
+    # Roda a main no backend de options.backend; a saída do programa vai para a saída padrão.
+    # load_program() devolve (function_asts, function_tables) e só é chamada se for preciso compilar:
+    # com o backend python e o code object no cache, o programa roda sem ASTs.
+    code = None
+    if options.backend == 'python' and cache_key is not None:
+        with profiler.phase('code_cache') as record:
+            payload = cache.get_code(cache_key)
+            try:
+                code = loads_code(payload) if payload is not None else None
+            except (ValueError, EOFError, TypeError):
+                code = None  # De outra versão do Python ou corrompido: traduz de novo
+            record['hit'] = code is not None
+    if code is None:
+        function_asts, function_tables = load_program()
+        if 'main' not in function_asts:
+            result.failure = "Programa sem função main para executar."
+            log(result.failure)
+            return
+    log("--- Execução ---")
+    memo_size = options.memo_size if options.memo else 0
+    try:
+        if options.backend == 'python':
+            if code is None:
+                with profiler.phase('transpile') as record:
+                    source = transpile_program(function_asts, function_tables)
+                    code = compile_source(source)
+                    record['lines'] = source.count('\n')
+                if cache_key is not None:
+                    cache.put_code(cache_key, dumps_code(code))
+            program = PythonProgram(code, memo_size=memo_size)
+        elif options.ir:
+            with profiler.phase('ir_build') as record:
+                ir_program = build_program(function_asts, function_tables)
+                record['instructions'] = instructions = ir_program.instruction_count()
+            with profiler.phase('ir_passes', passes=list(options.ir_passes)) as record:
+                reports = PassManager(options.ir_passes).run(ir_program)
+                record['reports'] = [asdict(report) for report in reports]
+            log(format_report(reports, instructions))
+            with profiler.phase('bytecode') as record:
+                bytecode = compile_ir_program(ir_program)
+                record['instructions'] = sum(len(f.code) for f in bytecode.functions)
+            program = VM(bytecode, memo_size=memo_size)
+        else:
+            with profiler.phase('bytecode') as record:
+                bytecode = compile_program(function_asts, function_tables)
+                record['instructions'] = sum(len(f.code) for f in bytecode.functions)
+            program = VM(bytecode, memo_size=memo_size)
+        with profiler.phase('run', backend=options.backend) as record:
+            program.run()
+            if memo_size:
+                memo_stats = program.memo_stats()
+                record['memo'] = {name: asdict(stats) for name, stats in memo_stats.items()}
+        if memo_size:
+            log(format_memo_stats(memo_stats))
+    except (BytecodeError, TranspileError, IrError, VMError) as e:
+        result.failure = str(e)
+        print(result.failure, file=sys.stderr)
+
+
+# --- Modo batch ---
+
+def is_batch(sources: list[str]) -> bool:
+    return len(sources) > 1 or any(os.path.isdir(s) or glob.has_magic(s) for s in sources)
+
+
+def expand_sources(sources: list[str]) -> list[str]:
+    # Diretórios (recursivos, só *.p) e globs viram arquivos; a ordem é a da linha de comando e,
+    # dentro de cada padrão, alfabética. Repetidos aparecem uma vez só.
+    paths = []
+    for source in sources:
+        if os.path.isdir(source):
+            paths.extend(sorted(glob.glob(os.path.join(source, '**', '*.p'), recursive=True)))
+        elif glob.has_magic(source):
+            paths.extend(sorted(p for p in glob.glob(source, recursive=True) if os.path.isfile(p)))
+        else:
+            paths.append(source)
+
+    seen = set()
+    unique = []
+    for path in paths:
+        key = os.path.abspath(path)
+        if key not in seen:
+            seen.add(key)
+            unique.append(path)
+    return unique
+
+
+_worker_cache = None
+
+
+def _compile_quiet(source_file_path: str, options) -> CompileResult:
+    # Um arquivo problemático não derruba o lote: a exceção vira uma falha no resumo
+    global _worker_cache
+    if options.cache and _worker_cache is None:
+        # Sem limite nos processos: o descarte é feito uma vez, no fim do lote
+        _worker_cache = CompileCache(options.cache_dir, max_size=None)
+    try:
+        return compile_file(source_file_path, options, quiet, _worker_cache)
+    except Exception as e:
+        return CompileResult(source_file_path, failure=f"{type(e).__name__}: {e}")
+
+
+def compile_batch(paths: list[str], options, workers: int) -> list[CompileResult]:
+    """Compila os arquivos em até `workers` processos; os resultados vêm na ordem de `paths`."""
+    if workers == 1 or len(paths) == 1:
+        return [_compile_quiet(path, options) for path in paths]
+    # Lotes de vários arquivos por envio: milhares de fontes pequenos não pagam um IPC cada
+    chunksize = max(1, len(paths) // (workers * 8))
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        return list(pool.map(_compile_quiet, paths, repeat(options), chunksize=chunksize))
+
+
+def print_cache_stats(cache: CompileCache):
+    stats = cache.stats()
+    print(f"Cache ({cache.directory}): {stats['entries']} entradas, {stats['size'] / 2 ** 20:.1f} MB de "
+          f"{stats['max_size'] / 2 ** 20:.0f} MB | acertos {stats['hits']}, faltas {stats['misses']}, "
+          f"gravações {stats['stores']}, descartes {stats['evictions']}")
+
+
+def print_summary(results: list[CompileResult], workers: int, wall_time: float):
+    print(f"--- Resumo: {len(results)} arquivos, {workers} processos ---")
+    for r in results:
+        if r.failure:
+            print(f"  {r.source}: FALHA ({r.failure})")
+        elif r.lexical_errors or r.syntactic_errors:
+            print(f"  {r.source}: {r.lexical_errors} erros léxicos, {r.syntactic_errors} erros sintáticos/semânticos")
+
+    failed = sum(1 for r in results if r.failure)
+    lexical = sum(1 for r in results if r.lexical_errors)
+    syntactic = sum(1 for r in results if r.syntactic_errors)
+    ok = sum(1 for r in results if not (r.failure or r.lexical_errors or r.syntactic_errors))
+    tokens = sum(r.tokens for r in results)
+    print(f"Sem erros: {ok} | com erros léxicos: {lexical} | com erros sintáticos/semânticos: {syntactic} | "
+          f"falhas: {failed}")
+    print(f"Erros: {sum(r.lexical_errors for r in results)} léxicos, "
+          f"{sum(r.syntactic_errors for r in results)} sintáticos/semânticos")
+    print(f"Tempo: {wall_time:.2f}s total, {sum(r.elapsed for r in results):.2f}s somando os arquivos | "
+          f"{len(results) / wall_time:.1f} arquivos/s, {tokens / wall_time:.0f} tokens/s")
+    cached = sum(1 for r in results if r.cached)
+    if cached:
+        print(f"Cache: {cached} de {len(results)} arquivos restaurados sem análise")
+
+
+def write_summary(filename: str, results: list[CompileResult], workers: int, wall_time: float):
+    summary = {
+        'files': [asdict(r) for r in results],
+        'workers': workers,
+        'wall_time': wall_time,
+        'tokens': sum(r.tokens for r in results),
+        'lexical_errors': sum(r.lexical_errors for r in results),
+        'syntactic_errors': sum(r.syntactic_errors for r in results),
+        'failures': sum(1 for r in results if r.failure),
+        'cached': sum(1 for r in results if r.cached),
+    }
+    with open(filename, 'w', encoding='utf-8') as f:
+        json.dump(summary, f, indent=2, ensure_ascii=False)
+    print(f"Resumo gerado: {filename}")
+
+
+def run_index(args, arg_parser):
+    # Modo índice: atualiza o banco com os arquivos informados e/ou responde uma consulta
+    index = SymbolIndex(args.index)
+    try:
+        if args.sources:
+            paths = expand_sources(args.sources)
+            if not paths:
+                arg_parser.error("nenhum arquivo .p encontrado")
+            start = time.perf_counter()
+            report = index.update(paths, min(args.workers, len(paths)))
+            stats = index.stats()
+            print(f"Índice {args.index}: {report['indexed']} arquivos indexados, {report['unchanged']} sem mudança, "
+                  f"{report['removed']} removidos em {time.perf_counter() - start:.2f}s "
+                  f"({stats['files']} arquivos, {stats['symbols']} símbolos, {stats['calls']} chamadas)")
+            for path, message in report['failed']:
+                print(f"  {path}: FALHA ({message})")
+        if args.query:
+            print_query(index, *args.query, args.kind)
+    finally:
+        index.close()
+
+
+def print_query(index: SymbolIndex, query: str, value: str, kind: str | None = None):
+    start = time.perf_counter()
+    if query == 'chamadas':
+        rows = index.call_sites(value)
+        for path, line, column, caller in rows:
+            print(f"{os.path.relpath(path)}:{line}:{column}: chamada de {value} em {caller}")
     else:
-        print("Sucesso! Nenhum erro sintático encontrado.")
+        if query == 'declaracao':
+            rows = [row for row in index.declarations(value) if kind is None or row[5] == kind]
+        else:
+            rows = index.by_type(value, kind)
+        for path, line, function, lexeme, type_name, row_kind in rows:
+            scope = f"em {function}" if function else "global"
+            print(f"{os.path.relpath(path)}:{line}: {row_kind} {lexeme}: {type_name} ({scope})")
+    print(f"{len(rows)} resultados em {(time.perf_counter() - start) * 1000:.2f} ms")
+
 
-    # 4. Escrever Saídas (JSON)
-    write_json(symbol_tables_file, function_tables)
-    write_json(ast_file, function_asts)
+def print_profile(report: dict):
+    memory = report['tracemalloc']
+    print(f"--- Perfil ({report['wall'] * 1000:.1f} ms, CPU {report['cpu'] * 1000:.1f} ms"
+          + (f", pico {report['peak_memory'] / 2 ** 20:.1f} MB" if memory else "") + ") ---")
+    for phase in report['phases']:
+        name = phase['name'] + (f" {os.path.basename(phase['file'])}" if 'file' in phase else '')
+        line = f"  {name:<40} {phase['wall'] * 1000:9.2f} ms  CPU {phase['cpu'] * 1000:9.2f} ms"
+        if memory:
+            line += f"  pico {phase['peak_memory'] / 2 ** 20:8.2f} MB"
+        if phase.get('tokens_per_sec'):
+            line += f"  {phase['tokens_per_sec']:,.0f} tokens/s"
+        if 'ast_nodes' in phase:
+            line += f"  {phase['ast_nodes']} nós, {phase['symbols']} símbolos"
+        print(line)
+    slowest = sorted(report['functions'], key=lambda f: f['wall'], reverse=True)[:5]
+    for function in slowest:
+        print(f"  fn {function['name']:<37} {function['wall'] * 1000:9.2f} ms  {function['tokens']} tokens")
 
-    print("Processo concluído.")
+
+def pass_list(text: str) -> tuple[str, ...]:
+    # Valor de --ir-passes: nomes de PASSES separados por vírgula
+    names = tuple(name.strip() for name in text.split(',') if name.strip())
+    unknown = [name for name in names if name not in PASSES]
+    if unknown:
+        raise argparse.ArgumentTypeError(f"passes desconhecidos: {', '.join(unknown)} (opções: {', '.join(PASSES)})")
+    return names
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description="Compilador para a Linguagem P.")
+    arg_parser.add_argument('sources', nargs='*', metavar='caminho_para_arquivo_fonte',
+                            help="arquivo .p; com vários arquivos, diretórios ou globs entra no modo batch")
+    arg_parser.add_argument('--lexer', choices=Lexer.ENGINES, default='regex',
+                            help="engine do analisador léxico (padrão: regex)")
+    arg_parser.add_argument('--parser', choices=('rd', 'll1'), default='rd',
+                            help="engine do analisador sintático: descendente recursivo ou tabela LL(1) (padrão: rd)")
+    arg_parser.add_argument('--stream', action='store_true',
+                            help="léxico/sintático sob demanda, gravando cada função assim que é analisada")
+    arg_parser.add_argument('--mmap', action='store_true',
+                            help="mapeia o arquivo em memória e faz o léxico direto sobre os bytes")
+    arg_parser.add_argument('--lex-workers', type=int, metavar='N',
+                            help="faz o léxico em paralelo, repartindo o arquivo entre N processos")
+    arg_parser.add_argument('--parse-workers', type=int, metavar='N',
+                            help="analisa as funções de primeiro nível em paralelo, entre N processos")
+    arg_parser.add_argument('--ast', choices=AST_FORMS, default='dataclass',
+                            help="forma da AST em memória: dataclasses, nós com __slots__ ou arena de arrays "
+                                 "(padrão: dataclass; o JSON é o mesmo)")
+    arg_parser.add_argument('--output-format', choices=OUTPUT_FORMATS, default='json',
+                            help="formato das ASTs e tabelas: JSON indentado, JSON compacto ou binário "
+                                 "(.bin, lido com serializer.load_binary) (padrão: json)")
+    arg_parser.add_argument('--optimize', '-O', action='store_true',
+                            help="otimiza as ASTs antes de gravá-las: dobra constantes, simplifica identidades "
+                                 "e remove código inalcançável e if/while com condição constante")
+    arg_parser.add_argument('--run', action='store_true',
+                            help="depois de compilar sem erros, executa a main no backend de --backend")
+    arg_parser.add_argument('--backend', choices=BACKENDS, default='vm',
+                            help="backend do --run: bytecode na VM de pilha ou tradução para code objects "
+                                 "Python (com --cache, guardados para as próximas execuções) (padrão: vm)")
+    arg_parser.add_argument('--memo', action='store_true',
+                            help="com --run, guarda os resultados das funções puras (sem println, só chamando "
+                                 "funções puras) pelos argumentos e mostra os acertos e faltas de cada uma")
+    arg_parser.add_argument('--memo-size', type=int, metavar='N', default=DEFAULT_MEMO_SIZE,
+                            help=f"resultados guardados por função com --memo; os usados há mais tempo saem "
+                                 f"primeiro (padrão: {DEFAULT_MEMO_SIZE})")
+    arg_parser.add_argument('--ir', action='store_true',
+                            help="com --backend vm, gera o bytecode a partir da IR em SSA depois dos passes de "
+                                 "--ir-passes, e mostra o tempo de cada passe")
+    arg_parser.add_argument('--ir-passes', type=pass_list, metavar='P1,P2', default=DEFAULT_PIPELINE,
+                            help=f"passes da IR, em ordem, separados por vírgula; vazio para nenhum "
+                                 f"(opções: {', '.join(PASSES)}; padrão: {','.join(DEFAULT_PIPELINE)})")
+    arg_parser.add_argument('--max-errors', type=int, metavar='N',
+                            help="interrompe o léxico/sintático depois de N erros")
+    arg_parser.add_argument('--workers', type=int, metavar='N', default=os.cpu_count(),
+                            help="processos do modo batch (padrão: número de CPUs)")
+    arg_parser.add_argument('--summary', metavar='ARQUIVO',
+                            help="no modo batch, grava também o resumo (contagens e tempos) em JSON")
+    arg_parser.add_argument('--cache', action='store_true',
+                            help="reaproveita compilações anteriores do mesmo conteúdo (cache em disco)")
+    arg_parser.add_argument('--cache-dir', metavar='DIR', default=DEFAULT_CACHE_DIR,
+                            help=f"diretório do cache (padrão: {DEFAULT_CACHE_DIR})")
+    arg_parser.add_argument('--cache-size', type=int, metavar='MB', default=DEFAULT_MAX_SIZE // (1024 * 1024),
+                            help="tamanho máximo do cache; as entradas usadas há mais tempo saem primeiro "
+                                 f"(padrão: {DEFAULT_MAX_SIZE // (1024 * 1024)})")
+    arg_parser.add_argument('--cache-stats', action='store_true',
+                            help="mostra entradas, tamanho e contadores de acertos/faltas do cache")
+    arg_parser.add_argument('--cache-clear', action='store_true',
+                            help="apaga o cache (antes de compilar, se houver arquivos)")
+    arg_parser.add_argument('--serve', action='store_true',
+                            help="modo servidor: atende pedidos JSON-RPC (um por linha) pela entrada/saída padrão")
+    arg_parser.add_argument('--socket', metavar='CAMINHO',
+                            help="com --serve, atende num socket Unix em vez da entrada/saída padrão")
+    arg_parser.add_argument('--server-entries', type=int, metavar='N', default=DEFAULT_MAX_ENTRIES,
+                            help=f"resultados guardados em memória pelo servidor (padrão: {DEFAULT_MAX_ENTRIES})")
+    arg_parser.add_argument('--index', metavar='BANCO',
+                            help="modo índice: grava os símbolos e chamadas dos arquivos num banco SQLite "
+                                 "(só os arquivos que mudaram são reanalisados)")
+    arg_parser.add_argument('--query', nargs=2, metavar=('CONSULTA', 'VALOR'),
+                            help="com --index, consulta o banco: declaracao NOME, tipo TIPO ou chamadas NOME")
+    arg_parser.add_argument('--kind', choices=('function', 'parameter', 'variable'),
+                            help="com --query declaracao/tipo, filtra pelo kind do símbolo")
+    arg_parser.add_argument('--profile', metavar='ARQUIVO',
+                            help="mede cada fase (tempo, CPU, memória, tokens/s, nós da AST, símbolos) e grava "
+                                 "o relatório em JSON")
+    arg_parser.add_argument('--profile-functions', action='store_true',
+                            help="com --profile, mede também o sintático de cada função (só --parser rd, "
+                                 "sem --parse-workers)")
+    arg_parser.add_argument('--no-profile-memory', dest='profile_memory', action='store_false',
+                            help="com --profile, não liga o tracemalloc (tempos sem a sobrecarga dele)")
+    args = arg_parser.parse_args()
+    if (args.profile_functions or not args.profile_memory) and not args.profile:
+        arg_parser.error("--profile-functions/--no-profile-memory só valem com --profile")
+    if args.profile and (args.serve or args.index or is_batch(args.sources)):
+        arg_parser.error("--profile só está disponível na compilação de um arquivo")
+    if args.query and not args.index:
+        arg_parser.error("--query só vale com --index")
+    if args.query and args.query[0] not in QUERIES:
+        arg_parser.error(f"consulta desconhecida '{args.query[0]}' (opções: {', '.join(QUERIES)})")
+    if args.index:
+        if not (args.sources or args.query):
+            arg_parser.error("--index precisa de arquivos fonte ou de --query")
+        run_index(args, arg_parser)
+        return
+    if args.serve:
+        if args.sources:
+            arg_parser.error("--serve não recebe arquivos (eles vêm nos pedidos)")
+        if args.server_entries < 1:
+            arg_parser.error("--server-entries deve ser pelo menos 1")
+        server = CompileServer(args.server_entries)
+        if args.socket:
+            serve_unix(server, args.socket)
+        else:
+            serve_stdio(server)
+        return
+    if args.socket:
+        arg_parser.error("--socket só vale com --serve")
+    if not args.sources and not (args.cache_stats or args.cache_clear):
+        arg_parser.error("informe ao menos um arquivo fonte")
+    if args.cache_size < 1:
+        arg_parser.error("--cache-size deve ser pelo menos 1")
+    if args.max_errors is not None and args.max_errors < 1:
+        arg_parser.error("--max-errors deve ser pelo menos 1")
+    if args.stream and args.parser != 'rd':
+        arg_parser.error("--stream só está disponível com --parser rd")
+    if args.run and (args.stream or is_batch(args.sources)):
+        arg_parser.error("--run só está disponível na compilação de um arquivo, sem --stream")
+    if args.backend != 'vm' and not args.run:
+        arg_parser.error("--backend só vale com --run")
+    if args.memo and not args.run:
+        arg_parser.error("--memo só vale com --run")
+    if args.memo_size < 1:
+        arg_parser.error("--memo-size deve ser pelo menos 1")
+    if args.ir and (not args.run or args.backend != 'vm'):
+        arg_parser.error("--ir só vale com --run e --backend vm")
+    if args.ir_passes != DEFAULT_PIPELINE and not args.ir:
+        arg_parser.error("--ir-passes só vale com --ir")
+    if args.stream and args.output_format == 'binary':
+        arg_parser.error("--stream não suporta --output-format binary")
+    if args.parse_workers and (args.stream or args.parser != 'rd'):
+        arg_parser.error("--parse-workers só está disponível com --parser rd, sem --stream")
+    if args.workers < 1:
+        arg_parser.error("--workers deve ser pelo menos 1")
+
+    cache = CompileCache(args.cache_dir, args.cache_size * 1024 * 1024) if args.cache or args.cache_stats else None
+    if args.cache_clear:
+        removed = CompileCache(args.cache_dir).clear()
+        print(f"Cache ({args.cache_dir}) limpo: {removed} entradas removidas.")
+    if not args.sources:
+        if args.cache_stats:
+            print_cache_stats(cache)
+        return
+
+    if is_batch(args.sources):
+        if args.lex_workers or args.parse_workers:
+            arg_parser.error("--lex-workers/--parse-workers não combinam com o modo batch (use --workers)")
+        paths = expand_sources(args.sources)
+        if not paths:
+            arg_parser.error("nenhum arquivo .p encontrado")
+        # Arquivos com o mesmo nome escreveriam as mesmas saídas, e o resultado dependeria da ordem
+        # em que os processos terminam
+        names = {}
+        for path in paths:
+            names.setdefault(os.path.splitext(os.path.basename(path))[0], []).append(path)
+        clashes = [group for group in names.values() if len(group) > 1]
+        if clashes:
+            arg_parser.error("arquivos com o mesmo nome de saída: " + "; ".join(", ".join(g) for g in clashes))
+
+        workers = min(args.workers, len(paths))
+        start = time.perf_counter()
+        results = compile_batch(paths, args, workers)
+        wall_time = time.perf_counter() - start
+        print_summary(results, workers, wall_time)
+        if args.cache:
+            # Os processos não descartam nem salvam contadores; o lote é contabilizado aqui
+            cache.hits += sum(1 for r in results if r.cached)
+            cache.misses += sum(1 for r in results if not (r.cached or r.failure))
+            if not args.stream:
+                cache.stores += cache.misses
+            cache.evict()
+            cache.save_stats()
+        if args.cache_stats:
+            print_cache_stats(cache)
+        if args.summary:
+            write_summary(args.summary, results, workers, wall_time)
+        if any(r.failure or r.lexical_errors for r in results):
+            sys.exit(1)
+        return
+
+    if args.profile:
+        profiler = Profiler(args.profile_memory, args.profile_functions)
+        profiler.start()
+        result = compile_file(args.sources[0], args, cache=cache if args.cache else None, profiler=profiler)
+        profiler.stop()
+        options = ('lexer', 'parser', 'stream', 'mmap', 'lex_workers', 'parse_workers', 'ast', 'output_format',
+                   'max_errors', 'cache', 'optimize', 'run', 'backend', 'ir', 'memo')
+        profiler.info.update(source=args.sources[0], options={name: getattr(args, name) for name in options},
+                             result=asdict(result))
+        profiler.write(args.profile)
+        print_profile(profiler.report())
+        print(f"Perfil gravado: {args.profile}")
+    else:
+        result = compile_file(args.sources[0], args, cache=cache if args.cache else None)
+    if args.cache:
+        cache.save_stats()
+    if args.cache_stats:
+        print_cache_stats(cache)
+    if result.failure or result.lexical_errors:
+        sys.exit(1)
 
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
+
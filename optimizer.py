@@ -0,0 +1,307 @@
+# Arquivo: optimizer.py
+# Otimizador da AST, entre o sintático e as saídas: dobra subárvores de constantes (com a semântica
+# de int/float da linguagem: divisão inteira truncada em direção a zero), simplifica identidades
+# (x * 1, x + 0...), remove os comandos depois de um comando que nunca termina normalmente (return,
+# if/else em que os dois ramos retornam, while com condição sempre verdadeira) e poda if/while
+# com condição constante. As declarações (let) de código removido são mantidas, porque as tabelas
+# de símbolos continuam com elas. Funciona nas classes de ast_nodes e nas de SLOTTED_NODES.
+from dataclasses import dataclass
+
+import ast_nodes as ast
+from profiler import count_nodes
+
+ARITHMETIC = frozenset('+-*/')
+RELATIONAL = {
+    '==': lambda a, b: a == b,
+    '!=': lambda a, b: a != b,
+    '<': lambda a, b: a < b,
+    '<=': lambda a, b: a <= b,
+    '>': lambda a, b: a > b,
+    '>=': lambda a, b: a >= b,
+}
+NUMERIC = ('int', 'float')
+
+
+@dataclass
+class OptimizationStats:
+    folded: int = 0  # operações entre constantes substituídas pelo resultado
+    simplified: int = 0  # identidades removidas (x * 1, x + 0, x - 0, x / 1)
+    dead_statements: int = 0  # comandos inalcançáveis removidos
+    pruned: int = 0  # if/while com condição constante resolvidos
+    nodes_before: int = 0
+    nodes_after: int = 0
+
+    @property
+    def eliminated(self) -> int:
+        return self.nodes_before - self.nodes_after
+
+
+def fold_constants(left, op: str, right):
+    """Resultado de 'left op right' para valores de Literal numéricos, ou None se não dobra."""
+    if op in RELATIONAL:
+        return None
+    if isinstance(left, int) and isinstance(right, int):
+        if op == '+':
+            return left + right
+        if op == '-':
+            return left - right
+        if op == '*':
+            return left * right
+        if right == 0:
+            return None  # Divisão por zero fica para a execução
+        quotient = abs(left) // abs(right)
+        return quotient if (left < 0) == (right < 0) else -quotient
+    left, right = float(left), float(right)
+    if op == '+':
+        return left + right
+    if op == '-':
+        return left - right
+    if op == '*':
+        return left * right
+    return left / right if right else None
+
+
+def compare_constants(left, left_type: str, op: str, right, right_type: str) -> bool | None:
+    # Valor de uma condição entre dois literais, ou None se não é possível decidir em compilação
+    if op not in RELATIONAL:
+        return None
+    if left_type in NUMERIC and right_type in NUMERIC:
+        return RELATIONAL[op](left, right)
+    if left_type == right_type == 'char' and op in ('==', '!='):
+        return RELATIONAL[op](left, right)
+    return None
+
+
+class Optimizer:
+    """Otimiza as ASTs de um programa, função a função e na ordem do fonte.
+
+    nodes é a família de classes usada para os literais criados (ast_nodes ou SLOTTED_NODES). Os
+    tipos das variáveis vêm da tabela de símbolos de cada função, e os das chamadas, dos retornos
+    das funções já otimizadas; as identidades só são simplificadas quando o tipo do operando é
+    conhecido e numérico, para não mudar o tipo da expressão.
+    """
+
+    def __init__(self, nodes=ast):
+        self.nodes = nodes
+        self.stats = OptimizationStats()
+        self.return_types = {}
+        self._types = {}
+
+    def optimize(self, function_asts: dict, function_tables: dict) -> OptimizationStats:
+        for name, func in function_asts.items():
+            function_asts[name] = self.optimize_function(func, function_tables.get(name, {}))
+        return self.stats
+
+    def optimize_function(self, func, table: dict):
+        stats = self.stats
+        before = sum(count_nodes({func.name: func}).values())
+        self.return_types[func.name] = func.return_type
+        self._types = {name: entry.tipo for name, entry in table.items()}
+        func.body.statements = self.block(func.body.statements)
+        stats.nodes_before += before
+        stats.nodes_after += sum(count_nodes({func.name: func}).values())
+        return func
+
+    # --- Comandos ---
+
+    def block(self, statements: list) -> list:
+        result = []
+        reachable = True
+        for stmt in statements:
+            if not reachable:
+                result.extend(self.declarations([stmt]))
+                continue
+            replacement = self.statement(stmt)
+            result.extend(replacement)
+            if replacement and not self.falls_through(replacement[-1]):
+                reachable = False
+        return result
+
+    def statement(self, stmt) -> list:
+        # Lista dos comandos que substituem stmt (vazia, ele mesmo ou os de um ramo escolhido)
+        kind = type(stmt).__name__
+        if kind == 'Assign':
+            stmt.value = self.expression(stmt.value)
+        elif kind in ('ReturnStmt', 'FunctionCall', 'PrintlnStmt'):
+            if kind == 'ReturnStmt':
+                stmt.value = self.expression(stmt.value)
+            else:
+                stmt.args = [self.expression(arg) for arg in stmt.args]
+        elif kind == 'IfStmt':
+            return self.if_statement(stmt)
+        elif kind == 'WhileStmt':
+            stmt.condition = self.expression(stmt.condition)
+            if self.constant_condition(stmt.condition) is False:
+                self.stats.pruned += 1
+                return self.declarations(stmt.body.statements)
+            stmt.body.statements = self.block(stmt.body.statements)
+        return [stmt]
+
+    def if_statement(self, stmt) -> list:
+        stmt.condition = self.expression(stmt.condition)
+        decided = self.constant_condition(stmt.condition)
+        if decided is None:
+            stmt.then_branch.statements = self.block(stmt.then_branch.statements)
+            if stmt.else_branch is not None:
+                stmt.else_branch = self.else_branch(stmt.else_branch)
+            return [stmt]
+
+        # O ramo escolhido entra no lugar do if (a função tem um escopo só, então não há nomes a isolar)
+        self.stats.pruned += 1
+        taken, dropped = stmt.then_branch, stmt.else_branch
+        if not decided:
+            taken, dropped = dropped, taken
+        kept = self.declarations(self.branch_statements(dropped))
+        if taken is None:
+            return kept
+        if type(taken).__name__ == 'IfStmt':
+            return kept + self.if_statement(taken)
+        return kept + self.block(taken.statements)
+
+    def else_branch(self, branch):
+        if type(branch).__name__ == 'IfStmt':
+            replacement = self.if_statement(branch)
+            if len(replacement) == 1 and type(replacement[0]).__name__ == 'IfStmt':
+                return replacement[0]
+            return self.nodes.Block(statements=replacement) if replacement else None
+        branch.statements = self.block(branch.statements)
+        return branch
+
+    @staticmethod
+    def branch_statements(branch) -> list:
+        if branch is None:
+            return []
+        if type(branch).__name__ == 'IfStmt':
+            return ([branch.then_branch] + ([branch.else_branch] if branch.else_branch is not None else []))
+        return branch.statements
+
+    def declarations(self, statements: list) -> list:
+        # Os let de um trecho removido (inclusive dos blocos aninhados); o resto conta como eliminado
+        kept = []
+        stack = list(reversed(statements))
+        while stack:
+            stmt = stack.pop()
+            kind = type(stmt).__name__
+            if kind == 'VarDecl':
+                kept.append(stmt)
+            elif kind == 'Block':
+                stack.extend(reversed(stmt.statements))
+            elif kind in ('IfStmt', 'WhileStmt'):
+                self.stats.dead_statements += 1
+                nested = [stmt.body] if kind == 'WhileStmt' else self.branch_statements(stmt)
+                stack.extend(reversed(nested))
+            else:
+                self.stats.dead_statements += 1
+        return kept
+
+    def falls_through(self, stmt) -> bool:
+        # False se a execução nunca passa do comando para o seguinte
+        kind = type(stmt).__name__
+        if kind == 'ReturnStmt':
+            return False
+        if kind == 'WhileStmt':
+            return self.constant_condition(stmt.condition) is not True
+        if kind == 'IfStmt':
+            if stmt.else_branch is None:
+                return True
+            return self.block_falls_through(stmt.then_branch) or self.branch_falls_through(stmt.else_branch)
+        return True
+
+    def block_falls_through(self, block) -> bool:
+        return not block.statements or self.falls_through(block.statements[-1])
+
+    def branch_falls_through(self, branch) -> bool:
+        if type(branch).__name__ == 'IfStmt':
+            return self.falls_through(branch)
+        return self.block_falls_through(branch)
+
+    # --- Expressões ---
+
+    def constant_condition(self, condition) -> bool | None:
+        if type(condition).__name__ != 'BinOp':
+            return None
+        left, right = condition.left, condition.right
+        if type(left).__name__ != 'Literal' or type(right).__name__ != 'Literal':
+            return None
+        return compare_constants(left.value, left.type, condition.op, right.value, right.type)
+
+    def expression(self, root):
+        # Pós-ordem com pilha explícita: as cadeias longas de BinOp não gastam a pilha do Python
+        stack = [(root, False)]
+        done = []
+        while stack:
+            node, visited = stack.pop()
+            kind = type(node).__name__
+            if kind == 'BinOp':
+                if visited:
+                    right = done.pop()
+                    node.left = done.pop()
+                    node.right = right
+                    done.append(self.binop(node))
+                else:
+                    stack.append((node, True))
+                    stack.append((node.right, False))
+                    stack.append((node.left, False))
+            elif kind == 'FunctionCall':
+                if visited:
+                    count = len(node.args)
+                    node.args = done[len(done) - count:]
+                    del done[len(done) - count:]
+                    done.append(node)
+                else:
+                    stack.append((node, True))
+                    stack.extend((arg, False) for arg in reversed(node.args))
+            else:
+                done.append(node)
+        return done.pop()
+
+    def binop(self, node):
+        left, right, op = node.left, node.right, node.op
+        left_literal = type(left).__name__ == 'Literal'
+        right_literal = type(right).__name__ == 'Literal'
+        if op not in ARITHMETIC:
+            return node
+        if left_literal and right_literal:
+            if left.type in NUMERIC and right.type in NUMERIC:
+                value = fold_constants(left.value, op, right.value)
+                if value is not None:
+                    self.stats.folded += 1
+                    return self.nodes.Literal(value=value, type='float' if isinstance(value, float) else 'int')
+            return node
+        # Identidades só com o literal inteiro: com 1.0 ou 0.0 o resultado viraria float
+        if right_literal and right.type == 'int' and self.static_type(left) in NUMERIC:
+            if (right.value == 0 and op in '+-') or (right.value == 1 and op in '*/'):
+                self.stats.simplified += 1
+                return left
+        if left_literal and left.type == 'int' and self.static_type(right) in NUMERIC:
+            if (left.value == 0 and op == '+') or (left.value == 1 and op == '*'):
+                self.stats.simplified += 1
+                return right
+        return node
+
+    def static_type(self, node) -> str | None:
+        # Tipo de uma expressão, quando todas as folhas têm tipo conhecido
+        stack = [node]
+        result = 'int'
+        while stack:
+            node = stack.pop()
+            kind = type(node).__name__
+            if kind == 'BinOp':
+                if node.op not in ARITHMETIC:
+                    return None
+                stack.append(node.left)
+                stack.append(node.right)
+                continue
+            if kind == 'Literal':
+                leaf = node.type
+            elif kind == 'VarAccess':
+                leaf = self._types.get(node.name)
+            elif kind == 'FunctionCall':
+                leaf = self.return_types.get(node.name)
+            else:
+                leaf = None
+            if leaf not in NUMERIC:
+                return None
+            if leaf == 'float':
+                result = 'float'
+        return result
@@ -0,0 +1,121 @@
+# Arquivo: parallel_lexer.py
+# Léxico paralelo de um único arquivo: o fonte é dividido em blocos que terminam em '\n',
+# cada bloco é analisado num processo separado e os resultados são costurados na ordem.
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+from diagnostics import DiagnosticList
+from lexer import Lexer, Token, TokenStream
+
+# Abaixo disso não compensa abrir um pool de processos
+MIN_CHUNK_SIZE = 256 * 1024
+
+_worker_source = None
+
+
+def _init_worker(source):
+    global _worker_source
+    _worker_source = source
+
+
+def _scan_chunk(engine: str, start: int, stop: int, max_errors: int | None):
+    return _scan_range(_worker_source, engine, start, stop, max_errors)
+
+
+def _scan_range(source, engine: str, start: int, stop: int, max_errors: int | None = None):
+    # Analisa de start até o primeiro limite de token em ou depois de stop
+    lexer = Lexer(source, engine=engine, max_errors=max_errors)
+    lexer.position = start
+    lexer.stop = stop
+    stream, errors = lexer.scan_stream()
+    return stream.kinds, stream.starts, stream.ends, errors, lexer.position
+
+
+class ParallelLexer:
+    """Léxico de um arquivo grande repartido entre vários processos.
+
+    Cada bloco começa logo após um '\\n'. Como as linhas vêm do LineIndex, o único estado do
+    léxico é a posição, e o início de um bloco só é inválido quando o bloco anterior termina
+    dentro de um FMT_STRING (ou CHAR_LITERAL) que atravessa linhas; comentários '//' nunca
+    passam de um '\\n'. Na costura, a posição em que o bloco anterior realmente parou é
+    comparada com o início do bloco: se divergir, o bloco é refeito a partir dela. O
+    resultado é idêntico ao Lexer sequencial.
+    """
+
+    def __init__(self, source_code: str | bytes, engine: str = 'regex', workers: int | None = None,
+                 chunk_size: int | None = None, max_errors: int | None = None):
+        self.source = source_code
+        self.engine = engine
+        self.max_errors = max_errors
+        self.workers = workers or os.cpu_count() or 1
+        self.chunk_size = chunk_size
+        self.rescanned_chunks = 0
+
+    def split_points(self) -> list[int]:
+        source = self.source
+        size = len(source)
+        chunk_size = self.chunk_size or max(MIN_CHUNK_SIZE, size // (self.workers * 4) + 1)
+        newline = '\n' if isinstance(source, str) else b'\n'
+
+        points = [0]
+        target = chunk_size
+        while target < size:
+            cut = source.find(newline, target)
+            if cut == -1:
+                break
+            points.append(cut + 1)
+            target = cut + 1 + chunk_size
+        points.append(size)
+        return points
+
+    def scan_stream(self) -> tuple[TokenStream, DiagnosticList]:
+        source = self.source
+        points = self.split_points()
+        jobs = list(zip(points, points[1:]))
+
+        if len(jobs) == 1:
+            results = [_scan_range(source, self.engine, *jobs[0], self.max_errors)]
+        else:
+            with ProcessPoolExecutor(max_workers=self.workers, initializer=_init_worker,
+                                     initargs=(source,)) as pool:
+                futures = [pool.submit(_scan_chunk, self.engine, *job, self.max_errors) for job in jobs]
+                results = [future.result() for future in futures]
+
+        stream = TokenStream(source)
+        errors = DiagnosticList(self.max_errors)
+        position = 0
+        for (start, stop), result in zip(jobs, results):
+            kinds, starts, ends, chunk_errors, end_position = result
+
+            if position >= stop:
+                # O bloco anterior já consumiu este bloco inteiro (ex: uma string enorme)
+                continue
+            if position != start:
+                self.rescanned_chunks += 1
+                kinds, starts, ends, chunk_errors, end_position = _scan_range(source, self.engine, position, stop,
+                                                                              self.max_errors)
+
+            if self.max_errors is not None:
+                remaining = self.max_errors - len(errors)
+                if sum(error.code != 'G001' for error in chunk_errors) >= remaining:
+                    # O limite cai dentro deste bloco: refeito com o que sobra do limite, o bloco para
+                    # no erro que atinge o limite, como o Lexer sequencial
+                    kinds, starts, ends, chunk_errors, end_position = _scan_range(source, self.engine, position, stop,
+                                                                                  remaining)
+
+            stream.kinds.extend(kinds)
+            stream.starts.extend(starts)
+            stream.ends.extend(ends)
+            for error in chunk_errors:
+                # O aviso de limite de cada bloco é refeito na lista final
+                if error.code != 'G001' and not errors.report(error):
+                    break
+            if errors.limit_reached:
+                break
+            position = end_position
+
+        return stream, errors
+
+    def scan_tokens(self) -> tuple[list[Token], DiagnosticList]:
+        stream, errors = self.scan_stream()
+        return stream.to_tokens(), errors
@@ -0,0 +1,155 @@
+# Arquivo: parallel_parser.py
+# Sintático paralelo de um único arquivo: as funções de primeiro nível são localizadas por uma
+# varredura das chaves nos códigos dos tokens, repartidas em lotes e analisadas em processos
+# separados. Os resultados voltam no formato binário do serializer e são juntados na ordem.
+import os
+from array import array
+from concurrent.futures import ProcessPoolExecutor
+
+from lexer import Token, TokenStream, TokenType, token_arrays
+from parser import Parser
+from symbol_table import TableEntry
+import ast_nodes as ast
+import serializer
+
+# Abaixo disso não compensa abrir um pool de processos
+MIN_FUNCTIONS = 64
+
+_FUNCTION = bytes([TokenType.FUNCTION.value])
+_LBRACE = bytes([TokenType.LBRACE.value])
+_RBRACE = bytes([TokenType.RBRACE.value])
+_NAME_CODES = frozenset([TokenType.ID.value, TokenType.MAIN.value])
+
+_worker_state = None
+
+
+def function_spans(kinds: array, lexeme) -> list[tuple[int, int, str]]:
+    """(início, fim, nome) das funções de primeiro nível, na ordem do fonte.
+
+    Só olha 'fn', o nome e o equilíbrio das chaves; para na primeira coisa fora do padrão
+    (ou num nome repetido), e o resto fica para o parser sequencial.
+    """
+    codes = kinds.tobytes()
+    size = len(codes)
+    spans = []
+    seen = set()
+    pos = 0
+    while pos + 1 < size and codes[pos:pos + 1] == _FUNCTION and codes[pos + 1] in _NAME_CODES:
+        name = lexeme(pos + 1)
+        if name in seen:
+            break
+        brace = codes.find(_LBRACE, pos)
+        if brace == -1:
+            break
+        depth = 1
+        cursor = brace + 1
+        while depth:
+            opening = codes.find(_LBRACE, cursor)
+            closing = codes.find(_RBRACE, cursor)
+            if closing == -1:
+                break
+            if opening != -1 and opening < closing:
+                depth += 1
+                cursor = opening + 1
+            else:
+                depth -= 1
+                cursor = closing + 1
+        if depth:
+            break
+        seen.add(name)
+        spans.append((pos, cursor, name))
+        pos = cursor
+    return spans
+
+
+def _init_worker(source, kinds, starts, ends, names):
+    global _worker_state
+    stream = TokenStream(source)
+    stream.kinds, stream.starts, stream.ends = kinds, starts, ends
+    _worker_state = stream, names
+
+
+def _parse_chunk(first: int, spans: list[tuple[int, int, str]]):
+    stream, names = _worker_state
+    return _parse_range(stream, names, first, spans)
+
+
+def _parse_range(tokens, names: list[str], first: int, spans: list[tuple[int, int, str]]):
+    # Analisa as funções de spans com o escopo global igual ao do parser sequencial nesse ponto
+    # (as funções anteriores, na ordem). Para na primeira que não terminar limpa exatamente no fim
+    # do seu trecho: dali em diante quem decide é a recuperação de erros do parser sequencial.
+    parser = Parser(tokens)
+    for name in names[:first]:
+        parser.symbol_table.add_entry(TableEntry(name, 'void', 0, 'function'))
+
+    tables = {}
+    asts = {}
+    for start, end, name in spans:
+        parser.current = start
+        try:
+            node = parser.parse_function()
+        except Exception:
+            break
+        if parser.current != end:
+            break
+        tables[name] = parser.function_tables[name]
+        asts[name] = node
+    return len(asts), serializer.dumps_binary((tables, asts))
+
+
+class ParallelParser(Parser):
+    """Parser que analisa as funções de primeiro nível em vários processos.
+
+    As funções só se enxergam na ordem do fonte (uma função chama as anteriores e a si mesma),
+    então cada lote recebe os nomes de todas as funções que vêm antes dele. O prefixo de funções
+    analisadas sem erro é juntado na ordem; a partir da primeira função com erro (ou fora do
+    padrão da varredura), o restante segue pelo Parser sequencial. O resultado é idêntico ao
+    de Parser.parse_program.
+    """
+
+    def __init__(self, tokens: list[Token] | TokenStream, max_errors: int | None = None, nodes=ast,
+                 workers: int | None = None, min_functions: int = MIN_FUNCTIONS):
+        super().__init__(tokens, max_errors, nodes)
+        self.workers = workers or os.cpu_count() or 1
+        self.min_functions = min_functions
+        self.parallel_functions = 0
+
+    def parse_program(self):
+        if len(self.tokens) and self.workers > 1:
+            self._parse_prefix()
+        return super().parse_program()
+
+    def _parse_prefix(self):
+        source, kinds, starts, ends = token_arrays(self.tokens)
+        tokens = self.tokens
+        spans = function_spans(kinds, lambda i: tokens[i].lexeme)
+        if len(spans) < self.min_functions:
+            return
+
+        names = [name for _, _, name in spans]
+        size = max(1, len(spans) // (self.workers * 4))
+        jobs = [(first, spans[first:first + size]) for first in range(0, len(spans), size)]
+        with ProcessPoolExecutor(max_workers=self.workers, initializer=_init_worker,
+                                 initargs=(source, kinds, starts, ends, names)) as pool:
+            futures = [pool.submit(_parse_chunk, first, chunk) for first, chunk in jobs]
+            try:
+                for (first, chunk), future in zip(jobs, futures):
+                    done, payload = future.result()
+                    self._merge(chunk[:done], payload)
+                    if done < len(chunk):
+                        break
+            finally:
+                for future in futures:
+                    future.cancel()
+
+    def _merge(self, spans: list[tuple[int, int, str]], payload: bytes):
+        # Junta um lote como se o parser sequencial o tivesse acabado de analisar
+        tables, asts = serializer.loads_binary(payload, self.nodes)
+        self.function_tables.update(tables)
+        self.function_asts.update(asts)
+        for start, end, name in spans:
+            # A entrada global só serve para resolver nomes (o tipo de retorno não é consultado)
+            name_tok = self.tokens[start + 1]
+            self.symbol_table.add_entry(TableEntry(name, 'void', name_tok.line, 'function'), name_tok.column)
+            self.current = end
+        self.parallel_functions += len(spans)
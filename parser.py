@@ -1,18 +1,38 @@
-from lexer import Token, TokenType
+from collections import deque
+from typing import Iterable, Iterator
+
+from diagnostics import CompileError, Diagnostic, DiagnosticList, diagnostic_of
+from lexer import Token, TokenStream, TokenType
 from symbol_table import SymbolTable, TableEntry
 import ast_nodes as ast
 
+# Precedência dos operadores binários (todos associativos à esquerda)
+BINDING_POWER = {
+    TokenType.LT: 1, TokenType.LE: 1, TokenType.GT: 1, TokenType.GE: 1, TokenType.EQ: 1, TokenType.NE: 1,
+    TokenType.PLUS: 2, TokenType.MINUS: 2,
+    TokenType.MULT: 3, TokenType.DIV: 3,
+}
+
+SYNC_TOKENS = frozenset([TokenType.FUNCTION, TokenType.LET, TokenType.IF, TokenType.WHILE,
+                         TokenType.RETURN, TokenType.RBRACE])
+
+FUNCTION_NAME_TOKENS = frozenset([TokenType.ID, TokenType.MAIN])
+
 
 class Parser:
-    def __init__(self, tokens: list[Token]):
+    def __init__(self, tokens: list[Token] | TokenStream, max_errors: int | None = None, nodes=ast):
         self.tokens = tokens
         self.current = 0
-        self.errors = []
+        self.errors = DiagnosticList(max_errors)
         self.symbol_table = SymbolTable()
+        # Fábrica dos nós: ast_nodes (padrão), compact_ast.SLOTTED_NODES ou uma compact_ast.AstArena
+        self.nodes = nodes
 
         # Guardar resultados
         self.function_tables = {}
         self.function_asts = {}  # Guardar as ASTs
+        self.current_function = None  # Nome da última função registrada na tabela global
+        self.function_depth = 0  # Profundidade do escopo de current_function
 
     # --- Utilitários ---
     def peek(self) -> Token:
@@ -33,52 +53,80 @@ class Parser:
         return False
 
     def consume(self, token_type: TokenType, msg: str) -> Token:
-        if self.peek().token_type == token_type:
+        tok = self.peek()
+        if tok.token_type == token_type:
             return self.advance()
-        raise Exception(f"Erro Sintático na linha {self.peek().line}: {msg} (Encontrado '{self.peek().lexeme}')")
+        raise CompileError(Diagnostic('S001', (msg, tok.lexeme), tok))
 
     def synchronize(self):
         while not self.is_at_end():
             if self.peek().token_type == TokenType.SEMICOLON:
                 self.advance()
                 return
-            if self.peek().token_type in [TokenType.FUNCTION, TokenType.LET, TokenType.IF, TokenType.WHILE,
-                                          TokenType.RETURN, TokenType.RBRACE]:
+            if self.peek().token_type in SYNC_TOKENS:
                 return
             self.advance()
 
     # --- Parsing ---
 
     def parse_program(self):
-        while not self.is_at_end() and self.peek().token_type == TokenType.FUNCTION:
-            try:
-                func_node = self.parse_function()
-                if func_node:
-                    self.function_asts[func_node.name] = func_node
-            except Exception as e:
-                self.errors.append(str(e))
-                self.synchronize()
-
-        if not self.is_at_end():
-            self.errors.append(f"Erro Sintático: Token inesperado '{self.peek().lexeme}' na linha {self.peek().line}.")
+        for func_name, _, func_node in self.iter_functions():
+            if func_node is not None:
+                self.function_asts[func_name] = func_node
 
         return self.errors, self.function_tables, self.function_asts
 
+    def iter_functions(self) -> Iterator[tuple[str, dict[str, TableEntry], ast.FunctionDecl | None]]:
+        # Gera (nome, tabela, ASA) de cada função assim que parse_function retorna.
+        # A ASA é None quando a função teve erro depois de ter seu escopo registrado.
+        # O escopo de uma função com erro continua aberto, como sempre foi: as funções seguintes são
+        # declaradas dentro dele, e a tabela dela (o mesmo dicionário já gerado) recebe no fim o que
+        # entrou nesse escopo depois do erro.
+        abandoned = []
+        try:
+            while not self.is_at_end() and self.peek().token_type == TokenType.FUNCTION:
+                self.current_function = None
+                func_node = None
+                keep_going = True
+                try:
+                    func_node = self.parse_function()
+                except Exception as e:
+                    keep_going = self.errors.report(diagnostic_of(e))
+                    if self.current_function is not None:
+                        table = self.symbol_table.get_scope(self.function_depth)
+                        self.function_tables[self.current_function] = table
+                        abandoned.append((table, self.function_depth))
+                    if keep_going:
+                        self.synchronize()
+
+                if self.current_function is not None:
+                    yield self.current_function, self.function_tables[self.current_function], func_node
+                if not keep_going:
+                    return
+        finally:
+            for table, depth in abandoned:
+                table.update(self.symbol_table.get_scope(depth))
+
+        if not self.is_at_end():
+            tok = self.peek()
+            self.errors.report(Diagnostic('S007', (tok.lexeme,), tok))
+
     def parse_function(self) -> ast.FunctionDecl:
         self.consume(TokenType.FUNCTION, "Esperado 'fn'")
 
         name_tok = self.peek()
-        if name_tok.token_type in [TokenType.ID, TokenType.MAIN]:
+        if name_tok.token_type in FUNCTION_NAME_TOKENS:
             self.advance()
             func_name = name_tok.lexeme
         else:
-            raise Exception(f"Esperado nome de função na linha {name_tok.line}")
+            raise CompileError(Diagnostic('S002', (), name_tok))
 
         entry = TableEntry(func_name, 'void', name_tok.line, 'function')
-        self.symbol_table.add_entry(entry)
+        self.symbol_table.add_entry(entry, name_tok.column)
 
         self.symbol_table.enter_scope()
-        self.function_tables[func_name] = self.symbol_table.get_current_scope()
+        self.current_function = func_name
+        self.function_depth = self.symbol_table.depth
 
         self.consume(TokenType.LBRACKET, "Esperado '('")
         params = self.parse_lista_params()
@@ -93,9 +141,10 @@ class Parser:
         body = self.parse_bloco()
         self.consume(TokenType.RBRACE, "Esperado '}'")
 
+        self.function_tables[func_name] = self.symbol_table.get_current_scope()
         self.symbol_table.exit_scope()
 
-        return ast.FunctionDecl(name=func_name, params=params, return_type=return_type, body=body)
+        return self.nodes.FunctionDecl(name=func_name, params=params, return_type=return_type, body=body)
 
     def parse_lista_params(self) -> list[ast.Param]:
         params = []
@@ -110,14 +159,14 @@ class Parser:
         self.consume(TokenType.COLON, "Esperado ':'")
         ptype = self.parse_type()
 
-        self.symbol_table.add_entry(TableEntry(name_tok.lexeme, ptype, name_tok.line, 'parameter'))
-        return ast.Param(name=name_tok.lexeme, type=ptype)
+        self.symbol_table.add_entry(TableEntry(name_tok.lexeme, ptype, name_tok.line, 'parameter'), name_tok.column)
+        return self.nodes.Param(name=name_tok.lexeme, type=ptype)
 
     def parse_type(self) -> str:
         if self.match(TokenType.INT): return 'int'
         if self.match(TokenType.FLOAT): return 'float'
         if self.match(TokenType.CHAR): return 'char'
-        raise Exception(f"Tipo inválido na linha {self.peek().line}")
+        raise CompileError(Diagnostic('S003', (), self.peek()))
 
     def parse_bloco(self) -> ast.Block:
         stmts = []
@@ -126,7 +175,7 @@ class Parser:
                 stmts.append(self.parse_declaracao())
             else:
                 stmts.append(self.parse_comando())
-        return ast.Block(statements=stmts)
+        return self.nodes.Block(statements=stmts)
 
     def parse_declaracao(self) -> ast.VarDecl:
         self.consume(TokenType.LET, "Esperado 'let'")
@@ -142,10 +191,10 @@ class Parser:
 
         names_str = []
         for tok in names:
-            self.symbol_table.add_entry(TableEntry(tok.lexeme, vtype, tok.line, 'variable'))
+            self.symbol_table.add_entry(TableEntry(tok.lexeme, vtype, tok.line, 'variable'), tok.column)
             names_str.append(tok.lexeme)
 
-        return ast.VarDecl(names=names_str, type=vtype)
+        return self.nodes.VarDecl(names=names_str, type=vtype)
 
     def parse_comando(self) -> ast.AstNode:
         tt = self.peek().token_type
@@ -166,28 +215,31 @@ class Parser:
             self.consume(TokenType.RBRACE, "Esperado '}'")
             return blk
         else:
-            raise Exception(f"Comando inválido '{self.peek().lexeme}' na linha {self.peek().line}")
+            tok = self.peek()
+            raise CompileError(Diagnostic('S004', (tok.lexeme,), tok))
 
     def parse_atribuicao_ou_chamada(self):
         id_tok = self.advance()
 
         # --- VERIFICAÇÃO SEMÂNTICA: Variável Não Declarada ---
-        if not self.symbol_table.lookup(id_tok.lexeme):
-            raise Exception(f"Erro Semântico na linha {id_tok.line}: Identificador '{id_tok.lexeme}' não declarado.")
+        binding = self.symbol_table.resolve(id_tok.lexeme)
+        if binding is None:
+            raise CompileError(Diagnostic('E001', (id_tok.lexeme,), id_tok))
+        name = binding.entry.lexema
 
         if self.match(TokenType.ASSIGN):
             val = self.parse_expr()
             self.consume(TokenType.SEMICOLON, "Esperado ';'")
-            return ast.Assign(name=id_tok.lexeme, value=val)
+            return self.nodes.Assign(name=name, value=val, resolved=binding.address)
 
         elif self.match(TokenType.LBRACKET):
             args = self.parse_lista_args()
             self.consume(TokenType.RBRACKET, "Esperado ')'")
             self.consume(TokenType.SEMICOLON, "Esperado ';'")
-            return ast.FunctionCall(name=id_tok.lexeme, args=args)
+            return self.nodes.FunctionCall(name=name, args=args)
 
         else:
-            raise Exception(f"Esperado '=' ou '(' após ID na linha {id_tok.line}")
+            raise CompileError(Diagnostic('S005', (), id_tok))
 
     def parse_if(self) -> ast.IfStmt:
         self.consume(TokenType.IF, "Esperado 'if'")
@@ -206,7 +258,7 @@ class Parser:
                 else_b = self.parse_bloco()
                 self.consume(TokenType.RBRACE, "Esperado '}'")
 
-        return ast.IfStmt(condition=cond, then_branch=then_b, else_branch=else_b)
+        return self.nodes.IfStmt(condition=cond, then_branch=then_b, else_branch=else_b)
 
     def parse_while(self) -> ast.WhileStmt:
         self.consume(TokenType.WHILE, "Esperado 'while'")
@@ -214,7 +266,7 @@ class Parser:
         self.consume(TokenType.LBRACE, "Esperado '{'")
         body = self.parse_bloco()
         self.consume(TokenType.RBRACE, "Esperado '}'")
-        return ast.WhileStmt(condition=cond, body=body)
+        return self.nodes.WhileStmt(condition=cond, body=body)
 
     def parse_println(self) -> ast.PrintlnStmt:
         self.consume(TokenType.PRINTLN, "Esperado 'println'")
@@ -225,73 +277,90 @@ class Parser:
             args = self.parse_lista_args()
         self.consume(TokenType.RBRACKET, "Esperado ')'")
         self.consume(TokenType.SEMICOLON, "Esperado ';'")
-        return ast.PrintlnStmt(fmt_string=fmt, args=args)
+        return self.nodes.PrintlnStmt(fmt_string=fmt, args=args)
 
     def parse_return(self) -> ast.ReturnStmt:
         self.consume(TokenType.RETURN, "Esperado 'return'")
         val = self.parse_expr()
         self.consume(TokenType.SEMICOLON, "Esperado ';'")
-        return ast.ReturnStmt(value=val)
+        return self.nodes.ReturnStmt(value=val)
 
     def parse_expr(self) -> ast.AstNode:
-        return self.parse_rel()
-
-    def parse_rel(self) -> ast.AstNode:
-        node = self.parse_adicao()
-        while self.peek().token_type in [TokenType.LT, TokenType.LE, TokenType.GT, TokenType.GE, TokenType.EQ,
-                                         TokenType.NE]:
-            op = self.advance().lexeme
-            right = self.parse_adicao()
-            node = ast.BinOp(left=node, op=op, right=right)
-        return node
-
-    def parse_adicao(self) -> ast.AstNode:
-        node = self.parse_termo()
-        while self.peek().token_type in [TokenType.PLUS, TokenType.MINUS]:
-            op = self.advance().lexeme
-            right = self.parse_termo()
-            node = ast.BinOp(left=node, op=op, right=right)
-        return node
-
-    def parse_termo(self) -> ast.AstNode:
-        node = self.parse_fator()
-        while self.peek().token_type in [TokenType.MULT, TokenType.DIV]:
-            op = self.advance().lexeme
-            right = self.parse_fator()
-            node = ast.BinOp(left=node, op=op, right=right)
-        return node
-
-    def parse_fator(self) -> ast.AstNode:
-        tok = self.peek()
-
-        if tok.token_type == TokenType.ID:
-            self.advance()
-
-            if not self.symbol_table.lookup(tok.lexeme):
-                raise Exception(f"Erro Semântico na linha {tok.line}: Identificador '{tok.lexeme}' não declarado.")
-
-            if self.match(TokenType.LBRACKET):
-                args = self.parse_lista_args()
-                self.consume(TokenType.RBRACKET, "Esperado ')'")
-                return ast.FunctionCall(name=tok.lexeme, args=args)
-            return ast.VarAccess(name=tok.lexeme)
-
-        elif tok.token_type == TokenType.INT_CONST:
-            self.advance()
-            return ast.Literal(value=int(tok.lexeme), type='int')
-        elif tok.token_type == TokenType.FLOAT_CONST:
-            self.advance()
-            return ast.Literal(value=float(tok.lexeme), type='float')
-        elif tok.token_type == TokenType.CHAR_LITERAL:
-            self.advance()
-            return ast.Literal(value=tok.lexeme, type='char')
-
-        elif self.match(TokenType.LBRACKET):
-            expr = self.parse_expr()
-            self.consume(TokenType.RBRACKET, "Esperado ')'")
-            return expr
+        # Precedence climbing iterativo (sem recursão em Python): operandos e operadores ficam em
+        # pilhas explícitas. Parênteses e chamadas de função empilham um marcador de grupo com
+        # precedência 0, que barra as reduções até o ')' correspondente.
+        operands = []
+        operators = []  # (precedência, lexema) ou marcador (0, nome da função ou None, base dos args)
+        binding_power = BINDING_POWER
+        resolve = self.symbol_table.resolve
+        nodes = self.nodes
+
+        while True:
+            # --- Operando: ID, chamada de função, constante ou '(' ---
+            tok = self.peek()
+            tt = tok.token_type
+
+            if tt == TokenType.ID:
+                self.advance()
 
-        raise Exception(f"Fator inesperado '{tok.lexeme}' na linha {tok.line}")
+                binding = resolve(tok.lexeme)
+                if binding is None:
+                    raise CompileError(Diagnostic('E001', (tok.lexeme,), tok))
+                name = binding.entry.lexema
+
+                if self.match(TokenType.LBRACKET):
+                    if self.peek().token_type != TokenType.RBRACKET:
+                        operators.append((0, name, len(operands)))
+                        continue
+                    self.advance()
+                    operands.append(nodes.FunctionCall(name=name, args=[]))
+                else:
+                    operands.append(nodes.VarAccess(name=name, resolved=binding.address))
+            elif tt == TokenType.INT_CONST:
+                self.advance()
+                operands.append(nodes.Literal(value=int(tok.lexeme), type='int'))
+            elif tt == TokenType.FLOAT_CONST:
+                self.advance()
+                operands.append(nodes.Literal(value=float(tok.lexeme), type='float'))
+            elif tt == TokenType.CHAR_LITERAL:
+                self.advance()
+                operands.append(nodes.Literal(value=tok.lexeme, type='char'))
+            elif tt == TokenType.LBRACKET:
+                self.advance()
+                operators.append((0, None, 0))
+                continue
+            else:
+                raise CompileError(Diagnostic('S006', (tok.lexeme,), tok))
+
+            # --- Operadores e fechamento de grupos depois de um operando ---
+            while True:
+                power = binding_power.get(self.peek().token_type)
+                if power is not None:
+                    while operators and operators[-1][0] >= power:
+                        right = operands.pop()
+                        operands[-1] = nodes.BinOp(left=operands[-1], op=operators.pop()[1], right=right)
+                    operators.append((power, self.advance().lexeme))
+                    break
+
+                while operators and operators[-1][0] > 0:
+                    right = operands.pop()
+                    operands[-1] = nodes.BinOp(left=operands[-1], op=operators.pop()[1], right=right)
+
+                if not operators:
+                    return operands.pop()
+
+                _, func_name, base = operators[-1]
+                if func_name is None:
+                    self.consume(TokenType.RBRACKET, "Esperado ')'")
+                    operators.pop()
+                elif self.match(TokenType.COMMA):
+                    break
+                else:
+                    self.consume(TokenType.RBRACKET, "Esperado ')'")
+                    operators.pop()
+                    args = operands[base:]
+                    del operands[base:]
+                    operands.append(nodes.FunctionCall(name=func_name, args=args))
 
     def parse_lista_args(self) -> list[ast.AstNode]:
         args = []
@@ -299,4 +368,43 @@ class Parser:
             args.append(self.parse_expr())
             while self.match(TokenType.COMMA):
                 args.append(self.parse_expr())
-        return args
\ No newline at end of file
+        return args
+
+
+class StreamingParser(Parser):
+    """Parser que puxa os tokens de um iterador (ex: Lexer.iter_tokens) sob demanda.
+
+    Só o token atual fica no buffer de lookahead e só o último consumido é lembrado,
+    então a memória não depende do tamanho do arquivo. As tabelas de cada função
+    devem ser retiradas de function_tables por quem consome iter_functions.
+    """
+
+    def __init__(self, tokens: Iterable[Token], max_errors: int | None = None, nodes=ast):
+        super().__init__([], max_errors, nodes)
+        self.token_iter = iter(tokens)
+        self.lookahead = deque()
+        self.previous = None
+
+    def _fill(self) -> bool:
+        if not self.lookahead:
+            tok = next(self.token_iter, None)
+            if tok is None:
+                return False
+            self.lookahead.append(tok)
+        return True
+
+    def peek(self) -> Token:
+        if not self._fill():
+            raise IndexError("list index out of range")
+        return self.lookahead[0]
+
+    def is_at_end(self) -> bool:
+        return not self._fill()
+
+    def advance(self) -> Token:
+        if self._fill():
+            self.previous = self.lookahead.popleft()
+            self.current += 1
+        if self.previous is None:
+            raise IndexError("list index out of range")
+        return self.previous
@@ -0,0 +1,134 @@
+# Arquivo: profiler.py
+# Instrumentação do --profile: cada fase da compilação (leitura, léxico, sintático, cada arquivo
+# gravado) registra tempo de relógio, tempo de CPU, pico de memória (tracemalloc) e as métricas
+# que a fase conhece (tokens/s, nós da AST, tamanho das tabelas...). O relatório sai em JSON.
+import json
+import platform
+import sys
+import time
+import tracemalloc
+from collections import Counter
+from contextlib import contextmanager, nullcontext
+
+from parser import Parser
+import serializer
+
+REPORT_VERSION = 1
+
+
+def count_nodes(asts: dict) -> Counter:
+    # Nós de cada tipo nas ASTs (classes de ast_nodes ou SLOTTED_NODES), sem recursão
+    counts = Counter()
+    stack = list(asts.values())
+    while stack:
+        value = stack.pop()
+        if isinstance(value, list):
+            stack.extend(value)
+            continue
+        names = serializer.node_fields(type(value))
+        if names is None:
+            continue
+        counts[type(value).__name__] += 1
+        for name in names:
+            stack.append(getattr(value, name))
+    return counts
+
+
+class Profiler:
+    """Coleta as fases de uma compilação.
+
+    Com memory=True o tracemalloc fica ligado durante a compilação e cada fase registra o seu pico
+    (os tempos ficam maiores com ele ligado). Com functions=True o Parser sequencial também mede
+    cada função.
+    """
+    enabled = True
+
+    def __init__(self, memory: bool = True, functions: bool = False):
+        self.memory = memory
+        self.per_function = functions
+        self.phases = []
+        self.functions = []
+        self.info = {}
+        self._start = None
+
+    def start(self):
+        if self.memory:
+            tracemalloc.start()
+        self._start = (time.perf_counter(), time.process_time())
+
+    def stop(self):
+        wall, cpu = self._start
+        self.info['wall'] = time.perf_counter() - wall
+        self.info['cpu'] = time.process_time() - cpu
+        if self.memory:
+            self.info['peak_memory'] = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+
+    @contextmanager
+    def phase(self, name: str, **metrics):
+        """Mede o bloco; o dicionário devolvido recebe as métricas que o bloco descobrir."""
+        record = {'name': name, **metrics}
+        if self.memory:
+            tracemalloc.reset_peak()
+            base = tracemalloc.get_traced_memory()[0]
+        wall = time.perf_counter()
+        cpu = time.process_time()
+        try:
+            yield record
+        finally:
+            record['wall'] = time.perf_counter() - wall
+            record['cpu'] = time.process_time() - cpu
+            if self.memory:
+                current, peak = tracemalloc.get_traced_memory()
+                record['peak_memory'] = peak - base
+                record['retained_memory'] = current - base
+            self.phases.append(record)
+
+    def parse_program(self, parser):
+        # Como Parser.parse_program, medindo cada função entre um resultado do iter_functions e o próximo
+        # (os outros parsers não passam função a função pelo iter_functions)
+        if not self.per_function or type(parser) is not Parser:
+            return parser.parse_program()
+        results = parser.iter_functions()
+        while True:
+            start_token = parser.current
+            start = time.perf_counter()
+            item = next(results, None)
+            elapsed = time.perf_counter() - start
+            if item is None:
+                break
+            func_name, table, func_node = item
+            self.functions.append({'name': func_name, 'wall': elapsed, 'tokens': parser.current - start_token,
+                                   'symbols': len(table), 'ok': func_node is not None})
+            if func_node is not None:
+                parser.function_asts[func_name] = func_node
+        return parser.errors, parser.function_tables, parser.function_asts
+
+    def report(self) -> dict:
+        return {
+            'version': REPORT_VERSION,
+            'python': sys.version.split()[0],
+            'platform': platform.platform(),
+            'tracemalloc': self.memory,
+            **self.info,
+            'phases': self.phases,
+            'functions': self.functions,
+        }
+
+    def write(self, filename: str):
+        with open(filename, 'w', encoding='utf-8') as f:
+            json.dump(self.report(), f, indent=2, ensure_ascii=False)
+
+
+class NullProfiler:
+    # Mesma interface, sem medir nada (o caminho normal do compile_file)
+    enabled = False
+
+    def phase(self, name: str, **metrics):
+        return nullcontext({})
+
+    def parse_program(self, parser):
+        return parser.parse_program()
+
+
+NULL_PROFILER = NullProfiler()
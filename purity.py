@@ -0,0 +1,104 @@
+# Arquivo: purity.py
+# Análise de pureza sobre o grafo de chamadas de um programa (as ASTs de function_asts, ast_nodes ou
+# SLOTTED_NODES), usada pelos backends do --run. Na linguagem não há variáveis globais: cada função só
+# lê os seus parâmetros e as suas variáveis locais, que começam com o valor padrão a cada chamada.
+# Então uma função é pura (o resultado depende só dos argumentos e a chamada não tem efeito) quando
+# não tem println e só chama funções puras. O cálculo parte de "todas puras" e tira, pelo grafo de
+# chamadas invertido, as que imprimem e as que chamam (direta ou indiretamente) uma que imprime;
+# funções recursivas ficam puras se nada no ciclo imprime.
+#
+# As chamadas de funções memoizáveis (puras, com retorno e sem parâmetros float, ver memoizable) podem
+# ser guardadas pelos argumentos: a VM e o backend python fazem isso com --memo. A análise também
+# conta as chamadas de cauda da função a ela mesma (return f(...) dentro de f), que os compiladores
+# transformam num salto para o começo da função.
+from dataclasses import dataclass, field
+
+
+@dataclass
+class PurityInfo:
+    calls: dict = field(default_factory=dict)  # função -> funções que ela chama, na ordem da primeira chamada
+    printing: set = field(default_factory=set)  # funções com println no próprio corpo
+    pure: set = field(default_factory=set)
+    memoizable: set = field(default_factory=set)
+    tail_calls: dict = field(default_factory=dict)  # função -> número de return f(...) dentro de f
+
+    def callers(self) -> dict:
+        # Grafo invertido: função -> funções que a chamam
+        callers = {name: [] for name in self.calls}
+        for name, callees in self.calls.items():
+            for callee in callees:
+                callers.setdefault(callee, []).append(name)
+        return callers
+
+
+def is_self_tail_call(stmt, name: str) -> bool:
+    # return f(...) dentro de f: a chamada é a última coisa que a função faz
+    return (type(stmt).__name__ == 'ReturnStmt' and type(stmt.value).__name__ == 'FunctionCall'
+            and stmt.value.name == name)
+
+
+def scan_function(func) -> tuple[list, bool, int]:
+    # (funções chamadas, se tem println, chamadas de cauda a si mesma), com pilha explícita
+    calls = {}
+    prints = False
+    tail_calls = 0
+    stack = list(func.body.statements)
+    while stack:
+        node = stack.pop()
+        kind = type(node).__name__
+        if kind == 'FunctionCall':
+            calls.setdefault(node.name, None)
+            stack.extend(node.args)
+        elif kind == 'BinOp':
+            stack.append(node.right)
+            stack.append(node.left)
+        elif kind == 'Assign':
+            stack.append(node.value)
+        elif kind == 'ReturnStmt':
+            tail_calls += is_self_tail_call(node, func.name)
+            stack.append(node.value)
+        elif kind == 'PrintlnStmt':
+            prints = True
+            stack.extend(node.args)
+        elif kind == 'IfStmt':
+            stack.append(node.condition)
+            stack.extend(node.then_branch.statements)
+            branch = node.else_branch
+            if branch is not None:
+                stack.extend([branch] if type(branch).__name__ == 'IfStmt' else branch.statements)
+        elif kind == 'WhileStmt':
+            stack.append(node.condition)
+            stack.extend(node.body.statements)
+        # VarDecl, VarAccess e Literal não chamam nem imprimem
+    return list(calls), prints, tail_calls
+
+
+def analyze(function_asts: dict) -> PurityInfo:
+    info = PurityInfo()
+    for name, func in function_asts.items():
+        calls, prints, tail_calls = scan_function(func)
+        info.calls[name] = calls
+        if prints:
+            info.printing.add(name)
+        if tail_calls:
+            info.tail_calls[name] = tail_calls
+
+    # Chamar uma função que não existe no programa também conta como impuro
+    impure = set(info.printing)
+    impure.update(name for name, callees in info.calls.items() if any(c not in function_asts for c in callees))
+    callers = info.callers()
+    work = list(impure)
+    while work:
+        for caller in callers.get(work.pop(), ()):
+            if caller not in impure:
+                impure.add(caller)
+                work.append(caller)
+    info.pure = {name for name in function_asts if name not in impure}
+
+    # 0.0 e -0.0 são a mesma chave num dict mas podem dar resultados diferentes (x * 2.0 é -0.0 ou
+    # 0.0, e o println mostra o sinal), então funções com parâmetro float não são memoizadas; as sem
+    # retorno também não, porque não há o que guardar
+    info.memoizable = {name for name in info.pure
+                       if function_asts[name].return_type != 'void'
+                       and all(param.type != 'float' for param in function_asts[name].params)}
+    return info
@@ -0,0 +1,264 @@
+# Arquivo: serializer.py
+# Serialização das saídas (ASTs e tabelas de símbolos) sem cópia intermediária: os nós de
+# ast_nodes e as TableEntry são percorridos uma única vez, de forma iterativa (árvores fundas não
+# esbarram no limite de recursão), e todo nó leva seu "_node_type". Três formatos:
+#  - JSON indentado (o mesmo texto de json.dumps(..., indent=2, ensure_ascii=False));
+#  - JSON compacto (sem espaços);
+#  - binário: sequência pós-ordem de operações + valores, gravada com marshal.
+# Os dois formatos têm carregadores que reconstroem as classes reais dos nós.
+import json
+import marshal
+from dataclasses import fields
+from json.encoder import encode_basestring
+
+from symbol_table import TableEntry
+import ast_nodes
+
+# Campos que não são dataclass fields mas vão no formato binário (endereço resolvido)
+RESOLVABLE = ('Assign', 'VarAccess')
+
+_field_names = {}
+
+
+def node_fields(cls) -> tuple[str, ...] | None:
+    # Nomes dos campos de uma classe de nó (ou None, se não for nó), em cache por classe
+    names = _field_names.get(cls)
+    if names is None and cls not in _field_names:
+        names = tuple(f.name for f in fields(cls)) if hasattr(cls, '__dataclass_fields__') else None
+        _field_names[cls] = names
+    return names
+
+
+def _float_text(value: float) -> str:
+    # Mesmo texto que o json usa para floats
+    if value != value:
+        return 'NaN'
+    if value in (float('inf'), float('-inf')):
+        return 'Infinity' if value > 0 else '-Infinity'
+    return float.__repr__(value)
+
+
+# --- JSON ---
+
+def dumps(data, indent: int | None = 2, level: int = 0) -> str:
+    """Serializa dicionários, listas, escalares, nós da AST e TableEntry em JSON.
+
+    Com indent=None sai o JSON compacto. level é o nível de indentação inicial (usado para
+    escrever itens de um objeto maior, como no modo streaming).
+    """
+    parts = []
+    write = parts.append
+    if indent is None:
+        key_sep = ':'
+        newlines = None
+    else:
+        key_sep = ': '
+        newlines = []
+
+    def newline(depth: int) -> str:
+        while len(newlines) <= depth:
+            newlines.append('\n' + ' ' * (indent * len(newlines)))
+        return newlines[depth]
+
+    # Cada quadro: [iterador de (chave, valor) ou de valores, fechamento, profundidade, vazio?, é objeto?]
+    stack = []
+
+    def open_value(value, depth: int):
+        cls = value.__class__
+        if cls is str:
+            write(encode_basestring(value))
+        elif cls is int:
+            write(int.__repr__(value))
+        elif value is None:
+            write('null')
+        elif cls is float:
+            write(_float_text(value))
+        elif cls is bool:
+            write('true' if value else 'false')
+        elif cls is list or cls is tuple:
+            write('[')
+            stack.append([iter(value), ']', depth, True, False])
+        elif cls is dict:
+            write('{')
+            stack.append([iter(value.items()), '}', depth, True, True])
+        elif cls is TableEntry:
+            write('{')
+            stack.append([iter(value.__dict__.items()), '}', depth, True, True])
+        else:
+            names = node_fields(cls)
+            if names is None:
+                raise TypeError(f"Objeto {cls} não serializável")
+            items = [(name, getattr(value, name)) for name in names]
+            items.append(('_node_type', cls.__name__))
+            write('{')
+            stack.append([iter(items), '}', depth, True, True])
+
+    open_value(data, level)
+    while stack:
+        frame = stack[-1]
+        item = next(frame[0], frame)
+        depth = frame[2]
+        if item is frame:
+            stack.pop()
+            if not frame[3] and newlines is not None:
+                write(newline(depth))
+            write(frame[1])
+            continue
+
+        if frame[3]:
+            frame[3] = False
+        else:
+            write(',')
+        if newlines is not None:
+            write(newline(depth + 1))
+        if frame[4]:
+            key, item = item
+            write(encode_basestring(key))
+            write(key_sep)
+        open_value(item, depth + 1)
+
+    return ''.join(parts)
+
+
+def dump(data, fp, indent: int | None = 2):
+    fp.write(dumps(data, indent))
+
+
+def _object_hook(nodes):
+    def hook(obj: dict):
+        node_type = obj.pop('_node_type', None)
+        if node_type is not None:
+            return getattr(nodes, node_type)(**obj)
+        if len(obj) == 4 and isinstance(obj.get('lexema'), str) and 'num_linha' in obj:
+            return TableEntry(obj['lexema'], obj['tipo'], obj['num_linha'], obj['kind'])
+        return obj
+    return hook
+
+
+def loads(text: str, nodes=ast_nodes):
+    # nodes: ast_nodes ou compact_ast.SLOTTED_NODES
+    return json.loads(text, object_hook=_object_hook(nodes))
+
+
+def load(fp, nodes=ast_nodes):
+    return loads(fp.read(), nodes)
+
+
+# --- Binário ---
+# Pós-ordem: cada valor é emitido depois dos seus filhos e o carregador só precisa de uma pilha.
+# ops (bytes) diz o que fazer; values guarda os escalares e os tamanhos, na ordem de consumo.
+
+BINARY_MAGIC = b'PAST\x01'
+
+OP_NONE, OP_SCALAR, OP_LIST, OP_DICT, OP_ENTRY, OP_TUPLE = range(6)
+OP_NODE = 16  # OP_NODE + índice em NODE_NAMES
+
+NODE_NAMES = ('Program', 'FunctionDecl', 'Param', 'Block', 'VarDecl', 'Assign', 'IfStmt', 'WhileStmt',
+              'PrintlnStmt', 'ReturnStmt', 'BinOp', 'Literal', 'VarAccess', 'FunctionCall')
+NODE_OPS = {name: OP_NODE + i for i, name in enumerate(NODE_NAMES)}
+
+_SCALARS = (str, int, float, bool)
+
+
+def dumps_binary(data) -> bytes:
+    ops = bytearray()
+    values = []
+    op = ops.append
+    value = values.append
+    stack = [(data, False)]
+    while stack:
+        obj, ready = stack.pop()
+        cls = obj.__class__
+        if ready:
+            if cls is list:
+                op(OP_LIST)
+                value(len(obj))
+            elif cls is tuple:
+                op(OP_TUPLE)
+                value(len(obj))
+            elif cls is dict:
+                op(OP_DICT)
+                value(tuple(obj))
+            else:
+                name = cls.__name__
+                op(NODE_OPS[name])
+                if name in RESOLVABLE:
+                    value(obj.resolved)
+            continue
+
+        if cls in _SCALARS:
+            op(OP_SCALAR)
+            value(obj)
+        elif obj is None:
+            op(OP_NONE)
+        elif cls is TableEntry:
+            op(OP_ENTRY)
+            value((obj.lexema, obj.tipo, obj.num_linha, obj.kind))
+        else:
+            if cls is list or cls is tuple:
+                children = obj
+            elif cls is dict:
+                children = list(obj.values())
+            else:
+                names = node_fields(cls)
+                if names is None or cls.__name__ not in NODE_OPS:
+                    raise TypeError(f"Objeto {cls} não serializável")
+                children = [getattr(obj, name) for name in names]
+            stack.append((obj, True))
+            stack.extend((child, False) for child in reversed(children))
+
+    return BINARY_MAGIC + marshal.dumps((bytes(ops), values))
+
+
+def loads_binary(payload: bytes, nodes=ast_nodes):
+    if not payload.startswith(BINARY_MAGIC):
+        raise ValueError("Formato binário desconhecido (cabeçalho inválido)")
+    ops, values = marshal.loads(payload[len(BINARY_MAGIC):])
+
+    # Os campos vão posicionais, na ordem de ast_nodes; "resolved" vai por nome
+    classes = [getattr(nodes, name) for name in NODE_NAMES]
+    arities = [len(fields(getattr(ast_nodes, name))) for name in NODE_NAMES]
+    resolvable = [name in RESOLVABLE for name in NODE_NAMES]
+
+    stack = []
+    push = stack.append
+    next_value = iter(values).__next__
+    for code in ops:
+        if code >= OP_NODE:
+            kind = code - OP_NODE
+            start = len(stack) - arities[kind]
+            args = stack[start:]
+            del stack[start:]
+            if resolvable[kind]:
+                push(classes[kind](*args, resolved=next_value()))
+            else:
+                push(classes[kind](*args))
+        elif code == OP_SCALAR:
+            push(next_value())
+        elif code == OP_NONE:
+            push(None)
+        elif code == OP_LIST or code == OP_TUPLE:
+            n = next_value()
+            items = stack[len(stack) - n:]
+            del stack[len(stack) - n:]
+            push(items if code == OP_LIST else tuple(items))
+        elif code == OP_DICT:
+            keys = next_value()
+            n = len(keys)
+            items = stack[len(stack) - n:]
+            del stack[len(stack) - n:]
+            push(dict(zip(keys, items)))
+        elif code == OP_ENTRY:
+            push(TableEntry(*next_value()))
+        else:
+            raise ValueError(f"Operação desconhecida {code} no formato binário")
+
+    return stack.pop()
+
+
+def dump_binary(data, fp):
+    fp.write(dumps_binary(data))
+
+
+def load_binary(fp, nodes=ast_nodes):
+    return loads_binary(fp.read(), nodes)
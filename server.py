@@ -0,0 +1,364 @@
+# Arquivo: server.py
+# Modo servidor: um processo residente que atende pedidos JSON-RPC 2.0, um objeto JSON por linha,
+# pela entrada/saída padrão ou por um socket Unix. O interpretador, os módulos e as tabelas do
+# léxico são carregados uma vez, e os resultados ficam em memória (LRU) pelo hash do conteúdo:
+# um arquivo que não mudou é respondido sem léxico nem sintático, e nada é gravado em disco.
+#
+# Métodos:
+#   lex      {source | path, lexer?, max_errors?}           -> tokens e erros léxicos
+#   parse    {source | path, parser?, lexer?, max_errors?}  -> erros, tabelas de símbolos e ASTs
+#   compile  {source | path, parser?, lexer?, max_errors?}  -> contagens e erros (sem tabelas/ASTs)
+#   open     {uri, source, max_errors?}                     -> abre um documento (compilação incremental)
+#   edit     {uri, start, end, text}                        -> aplica uma edição ao documento
+#   close    {uri}
+#   stats    {}                                             -> acertos, faltas, entradas, documentos
+#   shutdown {}                                             -> responde e encerra
+import hashlib
+import json
+import os
+import socketserver
+import sys
+import threading
+import time
+from collections import OrderedDict
+
+from incremental import IncrementalCompiler
+from lexer import Lexer, TOKEN_TYPE_BY_CODE
+from ll1_parser import LL1Parser
+from parser import Parser
+import serializer
+
+DEFAULT_MAX_ENTRIES = 256
+
+# Códigos de erro do JSON-RPC 2.0
+PARSE_ERROR = -32700
+INVALID_REQUEST = -32600
+METHOD_NOT_FOUND = -32601
+INVALID_PARAMS = -32602
+INTERNAL_ERROR = -32603
+
+
+class RequestError(Exception):
+    def __init__(self, code: int, message: str):
+        super().__init__(message)
+        self.code = code
+        self.message = message
+
+
+def diagnostic_json(diag) -> dict:
+    # Código, texto e (quando a posição vem de um token ou offset) linha e coluna separadas
+    where = diag.where
+    line = column = None
+    if diag.offset is not None:
+        line, column = where.line_of(diag.offset), where.column_of(diag.offset)
+    elif isinstance(where, tuple):
+        line, column = where
+    elif where is not None and not isinstance(where, str):
+        line, column = where.line, where.column
+    return {'code': diag.code, 'message': str(diag), 'line': line, 'column': column}
+
+
+def _dumps(value) -> str:
+    return json.dumps(value, ensure_ascii=False, separators=(',', ':'))
+
+
+class Analysis:
+    """Resultado de léxico + sintático de um conteúdo, com as partes da resposta já em JSON."""
+    __slots__ = ('tokens', 'lexical_count', 'syntactic_count', 'lexical_errors', 'syntactic_errors',
+                 'tables', 'asts')
+
+    def __init__(self, tokens: int, lexical_errors, syntactic_errors=None, tables=None, asts=None):
+        self.tokens = tokens
+        self.lexical_count = lexical_errors.error_count()
+        self.syntactic_count = syntactic_errors.error_count() if syntactic_errors is not None else 0
+        self.lexical_errors = _dumps([diagnostic_json(d) for d in lexical_errors])
+        self.syntactic_errors = _dumps([diagnostic_json(d) for d in syntactic_errors or ()])
+        self.tables = 'null' if tables is None else serializer.dumps(tables, None)
+        self.asts = 'null' if asts is None else serializer.dumps(asts, None)
+
+    def summary(self, cached: bool) -> str:
+        return (f'{{"tokens":{self.tokens},"lexical_error_count":{self.lexical_count},'
+                f'"syntactic_error_count":{self.syntactic_count},"cached":{"true" if cached else "false"},'
+                f'"lexical_errors":{self.lexical_errors},"syntactic_errors":{self.syntactic_errors}')
+
+    def compile_json(self, cached: bool) -> str:
+        return self.summary(cached) + '}'
+
+    def parse_json(self, cached: bool) -> str:
+        return self.summary(cached) + f',"symbol_tables":{self.tables},"asts":{self.asts}}}'
+
+
+def analyze(source: str, parser: str = 'rd', engine: str = 'regex', max_errors: int | None = None) -> Analysis:
+    # Mesma sequência do main.compile_file: com erro léxico o sintático não roda
+    tokens, lexical_errors = Lexer(source, engine=engine, max_errors=max_errors).scan_stream()
+    if lexical_errors:
+        return Analysis(len(tokens), lexical_errors)
+    parser_class = LL1Parser if parser == 'll1' else Parser
+    syntactic_errors, tables, asts = parser_class(tokens, max_errors).parse_program()
+    return Analysis(len(tokens), lexical_errors, syntactic_errors, tables, asts)
+
+
+def lex_json(source: str, engine: str = 'regex', max_errors: int | None = None) -> str:
+    tokens, lexical_errors = Lexer(source, engine=engine, max_errors=max_errors).scan_stream()
+    lines = tokens.line_index
+    rows = [[TOKEN_TYPE_BY_CODE[kind].name, source[start:end], lines.line_of(start), lines.column_of(start)]
+            for kind, start, end in zip(tokens.kinds, tokens.starts, tokens.ends)]
+    return (f'{{"tokens":{_dumps(rows)},"lexical_error_count":{lexical_errors.error_count()},'
+            f'"lexical_errors":{_dumps([diagnostic_json(d) for d in lexical_errors])}}}')
+
+
+class CompileServer:
+    """Despacha pedidos JSON-RPC; guarda os resultados por conteúdo e os documentos abertos."""
+
+    def __init__(self, max_entries: int = DEFAULT_MAX_ENTRIES):
+        self.max_entries = max_entries
+        # chave (método, hash do conteúdo, opções) -> resultado; a ordem é a do uso (LRU)
+        self.results = OrderedDict()
+        # caminho -> (mtime, tamanho, hash): um arquivo que não mudou nem é relido
+        self.file_digests = {}
+        self.documents = {}
+        self.hits = 0
+        self.misses = 0
+        self.requests = 0
+        self.started = time.time()
+        self.running = True
+        # O socket atende várias conexões em threads; o estado é protegido por um lock só
+        self.lock = threading.Lock()
+        self.methods = {
+            'lex': self.lex,
+            'parse': self.parse,
+            'compile': self.compile,
+            'open': self.open,
+            'edit': self.edit,
+            'close': self.close,
+            'stats': self.stats,
+            'shutdown': self.shutdown,
+        }
+
+    # --- Protocolo ---
+
+    def handle_line(self, line: str | bytes) -> str | None:
+        """Atende uma linha (um pedido); devolve a resposta em JSON ou None para notificações."""
+        try:
+            request = json.loads(line)
+        except ValueError as e:
+            return self._error(None, PARSE_ERROR, f"JSON inválido: {e}")
+        if not isinstance(request, dict) or not isinstance(request.get('method'), str):
+            return self._error(request.get('id') if isinstance(request, dict) else None,
+                               INVALID_REQUEST, "Pedido inválido")
+
+        request_id = request.get('id')
+        # Notificação (sem id): nunca tem resposta, nem de erro
+        notification = 'id' not in request
+        params = request.get('params') or {}
+        method = self.methods.get(request['method'])
+        try:
+            if method is None:
+                raise RequestError(METHOD_NOT_FOUND, f"Método desconhecido '{request['method']}'")
+            if not isinstance(params, dict):
+                raise RequestError(INVALID_PARAMS, "params deve ser um objeto")
+            with self.lock:
+                self.requests += 1
+                result = method(params)
+        except RequestError as e:
+            return None if notification else self._error(request_id, e.code, e.message)
+        except Exception as e:
+            return None if notification else self._error(request_id, INTERNAL_ERROR, f"{type(e).__name__}: {e}")
+        if notification:
+            return None
+        return f'{{"jsonrpc":"2.0","id":{_dumps(request_id)},"result":{result}}}'
+
+    @staticmethod
+    def _error(request_id, code: int, message: str) -> str:
+        return _dumps({'jsonrpc': '2.0', 'id': request_id, 'error': {'code': code, 'message': message}})
+
+    # --- Parâmetros ---
+
+    def _source(self, params: dict) -> tuple[str, str]:
+        # (conteúdo, hash); com path, o hash de um arquivo que não mudou vem do último pedido
+        if 'source' in params:
+            source = params['source']
+            if not isinstance(source, str):
+                raise RequestError(INVALID_PARAMS, "source deve ser um texto")
+            return source, hashlib.sha256(source.encode('utf-8')).hexdigest()
+        path = params.get('path')
+        if not isinstance(path, str):
+            raise RequestError(INVALID_PARAMS, "informe source ou path")
+        try:
+            st = os.stat(path)
+            known = self.file_digests.get(path)
+            if known is not None and known[:2] == (st.st_mtime_ns, st.st_size):
+                return None, known[2]
+            with open(path, 'r', encoding='utf-8') as f:
+                source = f.read()
+        except OSError as e:
+            raise RequestError(INVALID_PARAMS, f"Erro ao ler arquivo: {e}")
+        digest = hashlib.sha256(source.encode('utf-8')).hexdigest()
+        self.file_digests[path] = (st.st_mtime_ns, st.st_size, digest)
+        return source, digest
+
+    @staticmethod
+    def _options(params: dict) -> tuple[str, str, int | None]:
+        parser = params.get('parser', 'rd')
+        engine = params.get('lexer', 'regex')
+        max_errors = params.get('max_errors')
+        if parser not in ('rd', 'll1'):
+            raise RequestError(INVALID_PARAMS, "parser deve ser 'rd' ou 'll1'")
+        if engine not in Lexer.ENGINES:
+            raise RequestError(INVALID_PARAMS, f"lexer deve ser um de: {', '.join(Lexer.ENGINES)}")
+        if max_errors is not None and (not isinstance(max_errors, int) or max_errors < 1):
+            raise RequestError(INVALID_PARAMS, "max_errors deve ser um inteiro maior que zero")
+        return parser, engine, max_errors
+
+    def _cached(self, key: tuple, params: dict, build):
+        # Resultado guardado para a chave, ou build(source) na falta (e guardado)
+        found = self.results.get(key)
+        if found is not None:
+            self.results.move_to_end(key)
+            self.hits += 1
+            return found, True
+        source = params.get('source')
+        if source is None:
+            with open(params['path'], 'r', encoding='utf-8') as f:
+                source = f.read()
+        self.misses += 1
+        value = build(source)
+        self.results[key] = value
+        while len(self.results) > self.max_entries:
+            self.results.popitem(last=False)
+        return value, False
+
+    def _analysis(self, params: dict) -> tuple[Analysis, bool]:
+        source, digest = self._source(params)
+        if source is not None:
+            params = dict(params, source=source)
+        parser, engine, max_errors = self._options(params)
+        # O engine do léxico não muda o resultado, só o tempo: fica fora da chave
+        return self._cached(('analysis', digest, parser, max_errors), params,
+                            lambda text: analyze(text, parser, engine, max_errors))
+
+    # --- Métodos ---
+
+    def lex(self, params: dict) -> str:
+        source, digest = self._source(params)
+        if source is not None:
+            params = dict(params, source=source)
+        _, engine, max_errors = self._options(params)
+        result, _ = self._cached(('lex', digest, max_errors), params,
+                                 lambda text: lex_json(text, engine, max_errors))
+        return result
+
+    def parse(self, params: dict) -> str:
+        analysis, cached = self._analysis(params)
+        return analysis.parse_json(cached)
+
+    def compile(self, params: dict) -> str:
+        analysis, cached = self._analysis(params)
+        return analysis.compile_json(cached)
+
+    def _document(self, params: dict) -> IncrementalCompiler:
+        document = self.documents.get(params.get('uri'))
+        if document is None:
+            raise RequestError(INVALID_PARAMS, f"Documento não aberto: {params.get('uri')!r}")
+        return document
+
+    def _document_json(self, document: IncrementalCompiler) -> str:
+        lexical = document.lexical_errors
+        syntactic = document.errors
+        return _dumps({
+            'tokens': len(document.tokens),
+            'lexical_error_count': lexical.error_count(),
+            'syntactic_error_count': syntactic.error_count(),
+            'lexical_errors': [diagnostic_json(d) for d in lexical],
+            'syntactic_errors': [diagnostic_json(d) for d in syntactic],
+            'edit': document.last_edit,
+        })
+
+    def open(self, params: dict) -> str:
+        uri = params.get('uri')
+        source = params.get('source')
+        if not isinstance(uri, str) or not isinstance(source, str):
+            raise RequestError(INVALID_PARAMS, "open precisa de uri e source")
+        _, engine, max_errors = self._options(dict(params, lexer=params.get('lexer', 'table')))
+        document = self.documents[uri] = IncrementalCompiler(source, engine, max_errors)
+        return self._document_json(document)
+
+    def edit(self, params: dict) -> str:
+        document = self._document(params)
+        start, end, text = params.get('start'), params.get('end'), params.get('text', '')
+        if not (isinstance(start, int) and isinstance(end, int) and isinstance(text, str)):
+            raise RequestError(INVALID_PARAMS, "edit precisa de start, end (inteiros) e text")
+        try:
+            document.edit(start, end, text)
+        except ValueError as e:
+            raise RequestError(INVALID_PARAMS, str(e))
+        return self._document_json(document)
+
+    def close(self, params: dict) -> str:
+        self._document(params)
+        del self.documents[params['uri']]
+        return 'null'
+
+    def stats(self, params: dict) -> str:
+        return _dumps({
+            'requests': self.requests,
+            'hits': self.hits,
+            'misses': self.misses,
+            'entries': len(self.results),
+            'max_entries': self.max_entries,
+            'documents': len(self.documents),
+            'uptime': time.time() - self.started,
+        })
+
+    def shutdown(self, params: dict) -> str:
+        self.running = False
+        return 'null'
+
+
+# --- Transportes ---
+
+def serve_stdio(server: CompileServer, stdin=None, stdout=None):
+    # Lê pedidos linha a linha até o fim da entrada ou um shutdown
+    stdin = stdin or sys.stdin
+    stdout = stdout or sys.stdout
+    for line in stdin:
+        if not line.strip():
+            continue
+        response = server.handle_line(line)
+        if response is not None:
+            stdout.write(response + '\n')
+            stdout.flush()
+        if not server.running:
+            break
+
+
+class _ConnectionHandler(socketserver.StreamRequestHandler):
+    def handle(self):
+        server = self.server.compile_server
+        for line in self.rfile:
+            if not line.strip():
+                continue
+            response = server.handle_line(line)
+            if response is not None:
+                self.wfile.write(response.encode('utf-8') + b'\n')
+                self.wfile.flush()
+            if not server.running:
+                # shutdown() espera o serve_forever, que roda em outra thread
+                threading.Thread(target=self.server.shutdown, daemon=True).start()
+                break
+
+
+class _UnixServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    daemon_threads = True
+
+
+def serve_unix(server: CompileServer, path: str):
+    # Um socket antigo (de um servidor que não saiu limpo) é substituído
+    if os.path.exists(path):
+        os.remove(path)
+    with _UnixServer(path, _ConnectionHandler) as unix_server:
+        unix_server.compile_server = server
+        try:
+            unix_server.serve_forever()
+        finally:
+            os.remove(path)
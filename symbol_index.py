@@ -0,0 +1,239 @@
+# Arquivo: symbol_index.py
+# Índice de símbolos de muitos arquivos num banco SQLite: cada TableEntry (lexema, tipo, kind,
+# linha, função, arquivo) e cada chamada de função (quem chama, quem é chamado, linha e coluna).
+# Os arquivos são analisados em processos (como no modo batch) e inseridos no processo principal,
+# em lotes dentro de transações. Reindexar só reanalisa os arquivos cujo conteúdo mudou.
+import hashlib
+import os
+import sqlite3
+from bisect import bisect_right
+from concurrent.futures import ProcessPoolExecutor
+
+from lexer import Lexer, TokenType
+from parser import Parser
+
+DEFAULT_INDEX = 'simbolos.db'
+
+# Arquivos por transação na inserção
+BATCH_FILES = 500
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS files (
+    id INTEGER PRIMARY KEY,
+    path TEXT NOT NULL UNIQUE,
+    digest TEXT NOT NULL,
+    mtime_ns INTEGER NOT NULL,
+    size INTEGER NOT NULL,
+    lexical_errors INTEGER NOT NULL,
+    syntactic_errors INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS symbols (
+    file_id INTEGER NOT NULL,
+    function TEXT,
+    lexeme TEXT NOT NULL,
+    type TEXT NOT NULL,
+    kind TEXT NOT NULL,
+    line INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS calls (
+    file_id INTEGER NOT NULL,
+    caller TEXT,
+    callee TEXT NOT NULL,
+    line INTEGER NOT NULL,
+    column INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS symbols_lexeme ON symbols (lexeme);
+CREATE INDEX IF NOT EXISTS symbols_type ON symbols (type, kind);
+CREATE INDEX IF NOT EXISTS symbols_file ON symbols (file_id);
+CREATE INDEX IF NOT EXISTS calls_callee ON calls (callee);
+CREATE INDEX IF NOT EXISTS calls_file ON calls (file_id);
+"""
+
+_CALL = bytes([TokenType.ID.value, TokenType.LBRACKET.value])
+_FUNCTION = TokenType.FUNCTION.value
+
+
+def _digest(source: str) -> str:
+    return hashlib.sha256(source.encode('utf-8')).hexdigest()
+
+
+def call_sites(tokens) -> list[tuple[str | None, str, int, int]]:
+    # (função que chama, nome chamado, linha, coluna): um ID seguido de '(' que não vem depois de 'fn'
+    codes = tokens.kinds.tobytes()
+    lexeme = tokens.lexeme
+    lines = tokens.line_index
+    functions = [i for i, code in enumerate(codes) if code == _FUNCTION]
+    names = [lexeme(i + 1) if i + 1 < len(codes) else None for i in functions]
+    sites = []
+    pos = codes.find(_CALL)
+    while pos != -1:
+        if not pos or codes[pos - 1] != _FUNCTION:
+            k = bisect_right(functions, pos) - 1
+            offset = tokens.starts[pos]
+            sites.append((names[k] if k >= 0 else None, lexeme(pos), lines.line_of(offset), lines.column_of(offset)))
+        pos = codes.find(_CALL, pos + 1)
+    return sites
+
+
+def extract(path: str, known_digest: str | None = None):
+    """Lê e analisa um arquivo: (caminho, mtime, tamanho, hash, erros léxicos, erros sintáticos,
+    símbolos, chamadas). Com o hash igual ao já indexado, símbolos e chamadas vêm None."""
+    st = os.stat(path)
+    with open(path, 'r', encoding='utf-8') as f:
+        source = f.read()
+    digest = _digest(source)
+    if digest == known_digest:
+        return path, st.st_mtime_ns, st.st_size, digest, None, None, None, None
+
+    tokens, lexical_errors = Lexer(source, engine='table').scan_stream()
+    if lexical_errors:
+        # Como no main.py, com erro léxico o sintático não roda
+        return path, st.st_mtime_ns, st.st_size, digest, lexical_errors.error_count(), 0, [], []
+
+    parser = Parser(tokens)
+    errors, function_tables, _ = parser.parse_program()
+    # Funções (escopo global, function NULL) e depois parâmetros e variáveis de cada função
+    symbols = [(None, e.lexema, e.tipo, e.kind, e.num_linha)
+               for e in parser.symbol_table.get_current_scope().values()]
+    for function, table in function_tables.items():
+        symbols.extend((function, e.lexema, e.tipo, e.kind, e.num_linha) for e in table.values())
+    return path, st.st_mtime_ns, st.st_size, digest, 0, errors.error_count(), symbols, call_sites(tokens)
+
+
+def _extract_safe(path: str, known_digest: str | None):
+    # Um arquivo ilegível (ou que some no meio) não derruba o lote; volta como (caminho, mensagem)
+    try:
+        return extract(path, known_digest)
+    except Exception as e:
+        return path, f"{type(e).__name__}: {e}"
+
+
+class SymbolIndex:
+    def __init__(self, path: str = DEFAULT_INDEX):
+        self.path = path
+        self.db = sqlite3.connect(path)
+        self.db.execute('PRAGMA journal_mode = WAL')
+        self.db.execute('PRAGMA synchronous = NORMAL')
+        self.db.executescript(SCHEMA)
+
+    def close(self):
+        self.db.close()
+
+    # --- Indexação ---
+
+    def update(self, paths: list[str], workers: int = 1) -> dict:
+        """Indexa os arquivos; os que não mudaram (mesmo mtime e tamanho, ou mesmo hash) são pulados.
+
+        Devolve as contagens: indexed, unchanged, failed (lista de (caminho, mensagem)), removed.
+        """
+        known = {path: (mtime, size, digest) for path, mtime, size, digest
+                 in self.db.execute('SELECT path, mtime_ns, size, digest FROM files')}
+        pending = []
+        unchanged = 0
+        failed = []
+        for path in paths:
+            path = os.path.abspath(path)
+            old = known.get(path)
+            try:
+                st = os.stat(path)
+            except OSError as e:
+                failed.append((path, str(e)))
+                continue
+            if old is not None and old[:2] == (st.st_mtime_ns, st.st_size):
+                unchanged += 1
+            else:
+                pending.append((path, old[2] if old else None))
+
+        indexed = 0
+        for result in self._extract_all(pending, workers):
+            if len(result) == 2:
+                failed.append(result)
+                continue
+            if self._store(result, known.get(result[0])):
+                indexed += 1
+            else:
+                unchanged += 1
+        self.db.commit()
+        return {'indexed': indexed, 'unchanged': unchanged, 'failed': failed, 'removed': self.prune()}
+
+    def _extract_all(self, pending: list[tuple[str, str | None]], workers: int):
+        # Gera os resultados dos processos; a transação é fechada a cada BATCH_FILES arquivos
+        paths = [path for path, _ in pending]
+        digests = [digest for _, digest in pending]
+        if workers == 1 or len(pending) < 2:
+            results = map(_extract_safe, paths, digests)
+            pool = None
+        else:
+            pool = ProcessPoolExecutor(max_workers=workers)
+            results = pool.map(_extract_safe, paths, digests,
+                               chunksize=max(1, len(pending) // (workers * 8)))
+        try:
+            for count, result in enumerate(results, 1):
+                yield result
+                if count % BATCH_FILES == 0:
+                    self.db.commit()
+        finally:
+            if pool is not None:
+                pool.shutdown()
+
+    def _store(self, result, old) -> bool:
+        # Grava um arquivo; devolve False quando só a data mudou (conteúdo igual ao indexado)
+        path, mtime, size, digest, lexical, syntactic, symbols, calls = result
+        db = self.db
+        if symbols is None:
+            db.execute('UPDATE files SET mtime_ns = ?, size = ? WHERE path = ?', (mtime, size, path))
+            return False
+        if old is not None:
+            (file_id,) = db.execute('SELECT id FROM files WHERE path = ?', (path,)).fetchone()
+            db.execute('DELETE FROM symbols WHERE file_id = ?', (file_id,))
+            db.execute('DELETE FROM calls WHERE file_id = ?', (file_id,))
+            db.execute('UPDATE files SET digest = ?, mtime_ns = ?, size = ?, lexical_errors = ?, '
+                       'syntactic_errors = ? WHERE id = ?', (digest, mtime, size, lexical, syntactic, file_id))
+        else:
+            file_id = db.execute('INSERT INTO files (path, digest, mtime_ns, size, lexical_errors, syntactic_errors) '
+                                 'VALUES (?, ?, ?, ?, ?, ?)', (path, digest, mtime, size, lexical, syntactic)).lastrowid
+        db.executemany('INSERT INTO symbols VALUES (?, ?, ?, ?, ?, ?)',
+                       [(file_id, *row) for row in symbols])
+        db.executemany('INSERT INTO calls VALUES (?, ?, ?, ?, ?)',
+                       [(file_id, *row) for row in calls])
+        return True
+
+    def prune(self) -> int:
+        # Tira do índice os arquivos que não existem mais
+        gone = [(file_id,) for file_id, path in self.db.execute('SELECT id, path FROM files')
+                if not os.path.isfile(path)]
+        if gone:
+            self.db.executemany('DELETE FROM symbols WHERE file_id = ?', gone)
+            self.db.executemany('DELETE FROM calls WHERE file_id = ?', gone)
+            self.db.executemany('DELETE FROM files WHERE id = ?', gone)
+            self.db.commit()
+        return len(gone)
+
+    # --- Consultas ---
+
+    def declarations(self, name: str) -> list[tuple]:
+        """(arquivo, linha, função, lexema, tipo, kind) de cada declaração de `name`."""
+        return self.db.execute(
+            'SELECT f.path, s.line, s.function, s.lexeme, s.type, s.kind FROM symbols s '
+            'JOIN files f ON f.id = s.file_id WHERE s.lexeme = ? ORDER BY f.path, s.line', (name,)).fetchall()
+
+    def by_type(self, type_name: str, kind: str | None = None) -> list[tuple]:
+        """Declarações de um tipo (ex: todas as variáveis float), no mesmo formato de declarations."""
+        query = ('SELECT f.path, s.line, s.function, s.lexeme, s.type, s.kind FROM symbols s '
+                 'JOIN files f ON f.id = s.file_id WHERE s.type = ?')
+        args = [type_name]
+        if kind is not None:
+            query += ' AND s.kind = ?'
+            args.append(kind)
+        return self.db.execute(query + ' ORDER BY f.path, s.line', args).fetchall()
+
+    def call_sites(self, name: str) -> list[tuple]:
+        """(arquivo, linha, coluna, função que chama) de cada chamada de `name`."""
+        return self.db.execute(
+            'SELECT f.path, c.line, c.column, c.caller FROM calls c '
+            'JOIN files f ON f.id = c.file_id WHERE c.callee = ? ORDER BY f.path, c.line, c.column',
+            (name,)).fetchall()
+
+    def stats(self) -> dict:
+        return {table: self.db.execute(f'SELECT COUNT(*) FROM {table}').fetchone()[0]
+                for table in ('files', 'symbols', 'calls')}
@@ -1,3 +1,8 @@
+import sys
+
+from diagnostics import CompileError, Diagnostic
+
+
 class TableEntry(object):
 
     def __init__(self, lexema: str, tipo: str, num_linha: int, kind: str):
@@ -11,36 +16,90 @@ class TableEntry(object):
         return f"{{lexema: {self.lexema}, tipo: {self.tipo}, kind: {self.kind}, linha: {self.num_linha}}}"
 
 
+# Declaração visível de um nome: a entrada e o endereço (profundidade do escopo, posição no escopo)
+class Binding:
+    __slots__ = ('entry', 'address')
+
+    def __init__(self, entry: TableEntry, depth: int, slot: int):
+        self.entry = entry
+        self.address = (depth, slot)
+
+
 class SymbolTable:
+    """Tabela de símbolos com um único dicionário nome -> cadeia de declarações.
+
+    A última Binding de cada cadeia é a visível, então lookup é O(1) qualquer que seja a
+    profundidade. Cada declaração entra num log de desfazer; sair de um escopo desempilha
+    das cadeias os nomes registrados depois da marca daquele escopo.
+    """
 
     def __init__(self):
-        self.scopes = [{}]
+        self.chains = {}
+        self.undo_log = []
+        # Início de cada escopo aberto no undo_log (o primeiro é o global)
+        self.scope_starts = [0]
+
+    @property
+    def depth(self) -> int:
+        return len(self.scope_starts) - 1
 
     def enter_scope(self):
-        self.scopes.append({})
+        self.scope_starts.append(len(self.undo_log))
 
     def exit_scope(self):
-        if len(self.scopes) > 1:
-            self.scopes.pop()
+        if len(self.scope_starts) > 1:
+            start = self.scope_starts.pop()
+            chains = self.chains
+            undo_log = self.undo_log
+            for name in reversed(undo_log[start:]):
+                chain = chains[name]
+                chain.pop()
+                if not chain:
+                    del chains[name]
+            del undo_log[start:]
         else:
             print("Erro: Tentando sair do escopo global.")
 
-    def add_entry(self, entry: TableEntry):
-        current_scope = self.scopes[-1]
+    def exit_to(self, depth: int):
+        # Fecha os escopos abertos até voltar à profundidade indicada (usado na recuperação de erros)
+        while len(self.scope_starts) - 1 > depth:
+            self.exit_scope()
+
+    def add_entry(self, entry: TableEntry, column: int | None = None) -> Binding:
+        name = entry.lexema = sys.intern(entry.lexema)
+        chain = self.chains.get(name)
+        depth = len(self.scope_starts) - 1
 
         # --- Regra de Variável Redeclarada ---
-        if entry.lexema in current_scope:
-            raise Exception(
-                f"Erro Semântico na linha {entry.num_linha}: O identificador '{entry.lexema}' já foi declarado neste escopo.")
+        if chain and chain[-1].address[0] == depth:
+            raise CompileError(Diagnostic('E002', (name,), (entry.num_linha, column)))
+
+        binding = Binding(entry, depth, len(self.undo_log) - self.scope_starts[-1])
+        if chain is None:
+            self.chains[name] = [binding]
+        else:
+            chain.append(binding)
+        self.undo_log.append(name)
+        return binding
 
-        current_scope[entry.lexema] = entry
+    def resolve(self, lexema: str) -> Binding | None:
+        chain = self.chains.get(lexema)
+        return chain[-1] if chain else None
 
     def lookup(self, lexema: str) -> TableEntry | None:
-        for scope in reversed(self.scopes):
-            if lexema in scope:
-                return scope[lexema]
-
-        return None
+        chain = self.chains.get(lexema)
+        return chain[-1].entry if chain else None
 
     def get_current_scope(self) -> dict[str, TableEntry]:
-        return self.scopes[-1]
\ No newline at end of file
+        # Cópia das declarações do escopo atual, na ordem em que foram feitas
+        chains = self.chains
+        return {name: chains[name][-1].entry for name in self.undo_log[self.scope_starts[-1]:]}
+
+    def get_scope(self, depth: int) -> dict[str, TableEntry]:
+        # Cópia das declarações de um escopo aberto qualquer. As dele ficam juntas no undo_log, entre
+        # a marca dele e a do escopo seguinte, e podem estar sombreadas por escopos mais internos
+        starts = self.scope_starts
+        end = starts[depth + 1] if depth + 1 < len(starts) else len(self.undo_log)
+        chains = self.chains
+        return {name: next(b.entry for b in reversed(chains[name]) if b.address[0] == depth)
+                for name in self.undo_log[starts[depth]:end]}
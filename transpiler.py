@@ -0,0 +1,413 @@
+# Arquivo: transpiler.py
+# Segundo backend de execução: traduz as ASTs (ast_nodes ou SLOTTED_NODES) e as tabelas de símbolos
+# de um programa para código-fonte Python, compilado uma vez com compile() num code object que roda
+# direto no interpretador do CPython. Cada função P vira uma função Python (f_<nome>), com os
+# parâmetros e variáveis como locais (v_<nome>), então o despacho por instrução é o do próprio
+# CPython. A semântica é a do bytecode.py:
+#  - os tipos são resolvidos na tradução: a divisão entre inteiros chama _idiv (truncada em direção
+#    a zero) e as conversões int <-> float das atribuições, argumentos e retornos são explícitas;
+#  - uma comparação usada como valor vira 0/1; como condição de if/while, fica como está;
+#  - o println vira uma formatação com %s (str() de cada valor, como na VM);
+#  - return f(...) dentro da própria f, fora de um while, vira uma atribuição aos parâmetros e um
+#    continue num while True em volta do corpo (a recursão de cauda roda como laço). Dentro de um
+#    while da linguagem o continue seria do laço errado, então ali a chamada fica.
+# O módulo termina com _MEMOIZABLE, as funções memoizáveis de purity.py; com memo_size > 0, o
+# PythonProgram as troca por funções que guardam os resultados numa tabela LRU pelos argumentos.
+# O compilador do CPython é recursivo, então as cadeias longas (a + b + c + ...) de uma atribuição,
+# return ou condição são quebradas a cada CHAIN_LIMIT operações em temporários (t0, t1...).
+# Os code objects podem ser guardados com marshal (dumps_code/loads_code); o main.py os grava no
+# cache de compilação, com a chave do fonte, e uma nova execução do mesmo fonte não traduz nem
+# compila nada.
+import importlib.util
+import marshal
+import math
+import sys
+from types import CodeType
+
+from bytecode import (DEFAULT_VALUES, NUMERIC, char_value, check_comparison, check_conversion, check_value,
+                      format_parts, lookup)
+from purity import analyze, is_self_tail_call
+from vm import DEFAULT_MAX_DEPTH, MemoStats, VMError
+
+PROGRAM_FILENAME = '<programa P>'
+MEMO_FILENAME = '<memo>'
+# O formato do marshal muda entre versões do Python: o número mágico delas entra no cabeçalho
+CODE_MAGIC = b'PPY\x01' + importlib.util.MAGIC_NUMBER
+CHAIN_LIMIT = 100
+COMPARISONS = ('<', '<=', '>', '>=', '==', '!=')
+
+# Precedência do texto gerado, para só colocar os parênteses necessários
+ADDITIVE, MULTIPLICATIVE, ATOM = 1, 2, 3
+
+
+class TranspileError(Exception):
+    """Construção que o backend python não traduz (ex: aritmética com char)."""
+
+
+def _idiv(left: int, right: int) -> int:
+    # // arredonda para baixo; a linguagem trunca em direção a zero
+    quotient = left // right
+    if quotient < 0 and quotient * right != left:
+        quotient += 1
+    return quotient
+
+
+def literal_text(value) -> str:
+    # repr() serve para int, char e os floats finitos; inf/nan (de constantes dobradas) não são literais
+    if isinstance(value, float) and not math.isfinite(value):
+        return f"float('{value}')"
+    return repr(value)
+
+
+class FunctionTranspiler:
+    def __init__(self, func, table: dict, program: 'Transpiler'):
+        self.func = func
+        self.program = program
+        self.types = {name: entry.tipo for name, entry in table.items()}
+        self.lines = []
+        self.indent = 1
+        # Atribuições a temporários que precisam vir antes do comando que está sendo traduzido
+        self.pending = []
+        self.temps = 0
+        self.loops = 0  # whiles da linguagem em volta do comando atual
+        self.tail_loop = False  # Alguma chamada de cauda virou continue
+
+    def emit(self, line: str):
+        self.lines.append('    ' * self.indent + line)
+
+    def flush(self):
+        for line in self.pending:
+            self.emit(line)
+        self.pending.clear()
+
+    def transpile(self) -> list[str]:
+        func = self.func
+        params = {param.name for param in func.params}
+        # O corpo sai dentro de um while True; se nenhuma chamada de cauda usou o laço, ele é tirado
+        self.indent = 2
+        for name, type_name in self.types.items():
+            if name not in params:
+                self.emit(f"v_{name} = {literal_text(DEFAULT_VALUES.get(type_name))}")
+        statements = func.body.statements
+        self.block(statements)
+        if not statements or type(statements[-1]).__name__ != 'ReturnStmt':
+            self.emit(f"return {literal_text(DEFAULT_VALUES.get(func.return_type))}")
+        header = f"def f_{func.name}({', '.join(f'v_{param.name}' for param in func.params)}):"
+        if self.tail_loop:
+            return [header, "    while True:"] + self.lines
+        return [header] + [line[4:] for line in self.lines]
+
+    # --- Comandos ---
+
+    def block(self, statements: list):
+        start = len(self.lines)
+        for stmt in statements:
+            self.statement(stmt)
+        if len(self.lines) == start:
+            self.emit('pass')
+
+    def nested(self, statements: list):
+        self.indent += 1
+        self.block(statements)
+        self.indent -= 1
+
+    def statement(self, stmt):
+        kind = type(stmt).__name__
+        if kind == 'Assign':
+            text, value_type, _ = self.expression(stmt.value, hoist=True)
+            value = self.coerce(text, value_type, lookup(self.types, stmt.name, 'uma variável', TranspileError))
+            self.flush()
+            self.emit(f"v_{stmt.name} = {value}")
+        elif kind == 'IfStmt':
+            self.if_statement(stmt)
+        elif kind == 'WhileStmt':
+            condition = self.condition(stmt.condition)
+            if self.pending:
+                # Os temporários da condição são recalculados a cada volta
+                self.emit("while True:")
+                self.indent += 1
+                self.flush()
+                self.emit(f"if not ({condition}):")
+                self.emit("    break")
+                self.loops += 1
+                self.block(stmt.body.statements)
+                self.loops -= 1
+                self.indent -= 1
+            else:
+                self.emit(f"while {condition}:")
+                self.loops += 1
+                self.nested(stmt.body.statements)
+                self.loops -= 1
+        elif kind == 'PrintlnStmt':
+            parts = format_parts(stmt.fmt_string, len(stmt.args))
+            fmt = '%s'.join(part.replace('%', '%%') for part in parts) + '\n'
+            if stmt.args:
+                values = ', '.join(self.value(arg) for arg in stmt.args)
+                self.emit(f"_write({fmt!r} % ({values},))")
+            else:
+                self.emit(f"_write({fmt!r})")
+        elif kind == 'ReturnStmt' and not self.loops and is_self_tail_call(stmt, self.func.name):
+            args = self.arguments(stmt.value)
+            if args:
+                self.emit(f"{', '.join(f'v_{param.name}' for param in self.func.params)} = {', '.join(args)}")
+            self.emit("continue")
+            self.tail_loop = True
+        elif kind == 'ReturnStmt':
+            text, value_type, _ = self.expression(stmt.value, hoist=True)
+            value = self.coerce(text, value_type, self.func.return_type)
+            self.flush()
+            self.emit(f"return {value}")
+        elif kind == 'FunctionCall':
+            self.emit(self.call(stmt)[0])
+        # VarDecl: as variáveis já foram iniciadas no começo da função
+
+    def if_statement(self, stmt, condition: str | None = None):
+        if condition is None:
+            condition = self.condition(stmt.condition)
+        self.flush()
+        self.emit(f"if {condition}:")
+        self.nested(stmt.then_branch.statements)
+        branch = stmt.else_branch
+        while branch is not None and type(branch).__name__ == 'IfStmt':
+            condition = self.condition(branch.condition)
+            if self.pending:
+                # Os temporários precisam ser calculados entre os testes: else com um if dentro
+                self.emit("else:")
+                self.indent += 1
+                self.if_statement(branch, condition)
+                self.indent -= 1
+                return
+            self.emit(f"elif {condition}:")
+            self.nested(branch.then_branch.statements)
+            branch = branch.else_branch
+        if branch is not None:
+            self.emit("else:")
+            self.nested(branch.statements)
+
+    def condition(self, node) -> str:
+        if type(node).__name__ == 'BinOp' and node.op in COMPARISONS:
+            return self.comparison(node, hoist=True)
+        return self.value(node, hoist=True)
+
+    # --- Expressões ---
+
+    def value(self, node, hoist: bool = False) -> str:
+        # Texto de uma expressão usada só pelo valor (println, condição), que não pode ser void
+        text, value_type, _ = self.expression(node, hoist)
+        check_value(value_type, TranspileError)
+        return text
+
+    @staticmethod
+    def coerce(text: str, value_type: str, target_type: str) -> str:
+        check_conversion(value_type, target_type, TranspileError)
+        if value_type == target_type or target_type == 'void':
+            return text
+        return f"float({text})" if target_type == 'float' else f"int({text})"
+
+    def arguments(self, node) -> list[str]:
+        # Argumentos de uma chamada, convertidos para os tipos dos parâmetros
+        callee = self.program.signature(node.name)
+        if len(node.args) != len(callee.params):
+            raise TranspileError(f"'{node.name}' espera {len(callee.params)} argumentos, recebeu {len(node.args)}")
+        args = []
+        for arg, param in zip(node.args, callee.params):
+            text, value_type, _ = self.expression(arg)
+            args.append(self.coerce(text, value_type, param.type))
+        return args
+
+    def call(self, node) -> tuple[str, str, int]:
+        args = self.arguments(node)
+        return f"f_{node.name}({', '.join(args)})", self.program.signature(node.name).return_type, ATOM
+
+    def comparison(self, node, hoist: bool = False) -> str:
+        left, left_type, _ = self.expression(node.left, hoist)
+        right, right_type, _ = self.expression(node.right)
+        check_comparison(left_type, right_type, TranspileError)
+        return f"{left} {node.op} {right}"
+
+    def expression(self, node, hoist: bool = False) -> tuple[str, str, int]:
+        # (texto, tipo estático, precedência). Com hoist, a expressão é a primeira coisa que o comando
+        # avalia, então o começo de uma cadeia longa pode ir para um temporário antes dele.
+        kind = type(node).__name__
+        if kind == 'VarAccess':
+            return f"v_{node.name}", lookup(self.types, node.name, 'uma variável', TranspileError), ATOM
+        if kind == 'Literal':
+            value = char_value(node.value) if node.type == 'char' else node.value
+            return literal_text(value), node.type, ATOM
+        if kind == 'FunctionCall':
+            return self.call(node)
+        if kind != 'BinOp':
+            raise TranspileError(f"Expressão não suportada: {kind}")
+        if node.op in COMPARISONS:
+            return f"int({self.comparison(node, hoist)})", 'int', ATOM
+
+        # Cadeias longas à esquerda (a + b + c + ...) sem recursão em Python
+        chain = []
+        while type(node).__name__ == 'BinOp' and node.op not in COMPARISONS:
+            chain.append(node)
+            node = node.left
+        text, value_type, precedence = self.expression(node, hoist)
+        for count, binop in enumerate(reversed(chain), 1):
+            if hoist and count % CHAIN_LIMIT == 0:
+                temp = f"t{self.temps}"
+                self.temps += 1
+                self.pending.append(f"{temp} = {text}")
+                text, precedence = temp, ATOM
+            text, value_type, precedence = self.arithmetic(binop, text, value_type, precedence)
+        return text, value_type, precedence
+
+    def arithmetic(self, node, left: str, left_type: str, left_precedence: int) -> tuple[str, str, int]:
+        right, right_type, right_precedence = self.expression(node.right)
+        if left_type not in NUMERIC or right_type not in NUMERIC:
+            raise TranspileError(f"Operação '{node.op}' entre {left_type} e {right_type}")
+        result = 'float' if 'float' in (left_type, right_type) else 'int'
+        if node.op == '/' and result == 'int':
+            return f"_idiv({left}, {right})", result, ATOM
+        precedence = MULTIPLICATIVE if node.op in '*/' else ADDITIVE
+        if left_precedence < precedence:
+            left = f"({left})"
+        if right_precedence <= precedence:
+            right = f"({right})"
+        return f"{left} {node.op} {right}", result, precedence
+
+
+class Transpiler:
+    """Traduz as funções de um programa, na ordem do fonte, para um módulo Python."""
+
+    def __init__(self):
+        self._decls = {}
+        self.functions = []
+
+    def signature(self, name: str):
+        return lookup(self._decls, name, 'uma função', TranspileError)
+
+    def transpile_function(self, func, table: dict) -> str:
+        self._decls[func.name] = func
+        source = '\n'.join(FunctionTranspiler(func, table, self).transpile())
+        self.functions.append(source)
+        return source
+
+    def transpile_program(self, function_asts: dict, function_tables: dict) -> str:
+        for name, func in function_asts.items():
+            self.transpile_function(func, function_tables[name])
+        memoizable = analyze(function_asts).memoizable
+        names = tuple(name for name in function_asts if name in memoizable)
+        return '\n\n\n'.join(self.functions) + f"\n\n\n_MEMOIZABLE = {names!r}\n"
+
+
+def transpile_program(function_asts: dict, function_tables: dict) -> str:
+    return Transpiler().transpile_program(function_asts, function_tables)
+
+
+def compile_source(source: str) -> CodeType:
+    try:
+        return compile(source, PROGRAM_FILENAME, 'exec')
+    except (RecursionError, SyntaxError, MemoryError) as e:
+        # Expressões aninhadas demais para o compilador do CPython (parênteses, chamadas...)
+        raise TranspileError(f"Programa não compilado pelo Python: {e}") from None
+
+
+def compile_python(function_asts: dict, function_tables: dict) -> CodeType:
+    return compile_source(transpile_program(function_asts, function_tables))
+
+
+def dumps_code(code: CodeType) -> bytes:
+    return CODE_MAGIC + marshal.dumps(code)
+
+
+def loads_code(payload: bytes) -> CodeType:
+    if not payload.startswith(CODE_MAGIC):
+        raise ValueError("Code object de outra versão do Python ou do tradutor")
+    return marshal.loads(payload[len(CODE_MAGIC):])
+
+
+def failing_function(traceback, default: str) -> str:
+    # Nome da função P mais interna no traceback de um erro de execução
+    name = default
+    while traceback is not None:
+        code = traceback.tb_frame.f_code
+        if code.co_filename == PROGRAM_FILENAME and code.co_name.startswith('f_'):
+            name = code.co_name[2:]
+        traceback = traceback.tb_next
+    return name
+
+
+# Função que guarda os resultados de function pelos argumentos, na mesma tabela LRU da VM. É gerada
+# com os parâmetros explícitos (e não *args ou functools.lru_cache) para que as chamadas continuem
+# sendo entre funções Python, que não usam a pilha do C na recursão profunda.
+MEMO_TEMPLATE = """
+def memoized({params}):
+    key = {key}
+    value = cache.pop(key, missing)
+    if value is missing:
+        stats.misses += 1
+        value = function({params})
+        if len(cache) >= size:
+            del cache[next(iter(cache))]
+    else:
+        stats.hits += 1
+    cache[key] = value
+    return value
+"""
+
+
+def memoize(function, size: int, stats: MemoStats):
+    params = ', '.join(function.__code__.co_varnames[:function.__code__.co_argcount])
+    namespace = {'function': function, 'size': size, 'stats': stats, 'cache': {}, 'missing': object()}
+    source = MEMO_TEMPLATE.format(params=params, key=f"({params},)" if params else "()")
+    exec(compile(source, MEMO_FILENAME, 'exec'), namespace)
+    return namespace['memoized'], namespace['cache']
+
+
+class PythonProgram:
+    """Executa o code object de um programa traduzido. A saída dos println vai para out (padrão:
+    sys.stdout).
+
+    As chamadas da linguagem são chamadas Python: durante run() o limite de recursão do
+    interpretador sobe para max_depth (a partir do 3.11 as chamadas entre funções Python não usam a
+    pilha do C). Com memo_size > 0, as funções de _MEMOIZABLE guardam até memo_size resultados cada.
+    """
+
+    def __init__(self, code: CodeType, out=None, max_depth: int = DEFAULT_MAX_DEPTH, memo_size: int = 0):
+        self.code = code
+        self.out = out
+        self.max_depth = max_depth
+        self.namespace = {'_write': (out or sys.stdout).write, '_idiv': _idiv}
+        exec(code, self.namespace)
+        self._memo = {}  # nome -> (estatísticas, tabela)
+        if memo_size > 0:
+            for name in self.namespace.get('_MEMOIZABLE', ()):
+                stats = MemoStats()
+                self.namespace[f"f_{name}"], cache = memoize(self.namespace[f"f_{name}"], memo_size, stats)
+                self._memo[name] = (stats, cache)
+
+    def memo_stats(self) -> dict[str, MemoStats]:
+        """Acertos, faltas e resultados guardados de cada função memoizada."""
+        return {name: MemoStats(stats.hits, stats.misses, len(cache)) for name, (stats, cache) in self._memo.items()}
+
+    def run(self, entry: str = 'main', args: tuple = ()):
+        """Chama a função entry com args e devolve o valor que ela retorna."""
+        function = self.namespace.get(f"f_{entry}")
+        if function is None:
+            raise VMError("função não encontrada", entry)
+        if len(args) != function.__code__.co_argcount:
+            raise VMError(f"espera {function.__code__.co_argcount} argumentos, recebeu {len(args)}", entry)
+        limit = sys.getrecursionlimit()
+        # Cada chamada de uma função memoizada gasta dois frames do Python
+        frames = self.max_depth * 2 if self._memo else self.max_depth
+        sys.setrecursionlimit(max(limit, frames + 100))
+        try:
+            return function(*args)
+        except ZeroDivisionError as e:
+            raise VMError("divisão por zero", failing_function(e.__traceback__, entry)) from None
+        except RecursionError as e:
+            raise VMError(f"mais de {self.max_depth} chamadas aninhadas",
+                          failing_function(e.__traceback__, entry)) from None
+        finally:
+            sys.setrecursionlimit(limit)
+            if self.out is None:
+                sys.stdout.flush()
+
+
+def run_program(code: CodeType, out=None, entry: str = 'main'):
+    return PythonProgram(code, out).run(entry)
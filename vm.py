@@ -0,0 +1,256 @@
+# Arquivo: vm.py
+# Máquina virtual de pilha para o bytecode de bytecode.py. O laço de despacho é uma cadeia de ifs
+# ordenada pela frequência dos opcodes, com código, constantes, locais e a pilha de operandos em
+# variáveis locais do Python; o código de cada função é copiado do array para uma lista uma vez, na
+# criação da VM, porque indexar uma lista é bem mais rápido que indexar um array. As chamadas não
+# usam a pilha do Python: cada CALL empilha o estado do chamador numa lista de frames, então a
+# recursão da linguagem só é limitada por max_depth.
+#
+# Com memo_size > 0, as chamadas das funções memoizáveis (CodeObject.memoize, ver purity.py) são
+# guardadas pelos argumentos numa tabela LRU por função, com até memo_size resultados: um acerto
+# empilha o resultado sem executar a função, e numa falta o RETURN da chamada guarda o valor.
+# memo_stats() dá os acertos e as faltas de cada função.
+import sys
+from dataclasses import dataclass
+
+from bytecode import (LOAD_LOCAL, STORE_LOCAL, INCREMENT, LOAD_CONST, ADD_LOCAL, DIV_FLOAT_LOCAL, ADD_CONST,
+                      DIV_FLOAT_CONST, ADD, DIV_FLOAT, JUMP_IF_NOT_LT_LL, JUMP_IF_NOT_NE_LL, JUMP_IF_NOT_LT_LC,
+                      JUMP_IF_NOT_NE_LC, JUMP_IF_NOT_LT, JUMP_IF_NOT_NE, JUMP, CALL, RETURN, PRINT, POP,
+                      JUMP_IF_FALSE, COMPARE, TO_INT, TO_FLOAT, BytecodeProgram)
+
+DEFAULT_MAX_DEPTH = 100_000
+DEFAULT_MEMO_SIZE = 1024
+_MISSING = object()
+
+_COMPARE = (
+    lambda a, b: a < b,
+    lambda a, b: a <= b,
+    lambda a, b: a > b,
+    lambda a, b: a >= b,
+    lambda a, b: a == b,
+    lambda a, b: a != b,
+)
+
+
+class VMError(Exception):
+    """Erro de execução (divisão por zero, recursão profunda demais...), com a função em que ocorreu."""
+
+    def __init__(self, message: str, function: str):
+        super().__init__(f"Erro de execução em '{function}': {message}")
+        self.function = function
+
+
+@dataclass
+class MemoStats:
+    hits: int = 0
+    misses: int = 0
+    entries: int = 0  # Resultados guardados
+
+    @property
+    def hit_rate(self) -> float:
+        calls = self.hits + self.misses
+        return self.hits / calls if calls else 0.0
+
+
+def format_memo_stats(stats: dict) -> str:
+    lines = ["Memoização:"]
+    for name, entry in stats.items():
+        lines.append(f"  {name:<20} {entry.hits:>8} acertos {entry.misses:>8} faltas "
+                     f"({entry.hit_rate:.0%}), {entry.entries} guardados")
+    return '\n'.join(lines)
+
+
+class VM:
+    """Executa um BytecodeProgram. A saída dos println vai para out (padrão: sys.stdout)."""
+
+    def __init__(self, program: BytecodeProgram, out=None, max_depth: int = DEFAULT_MAX_DEPTH,
+                 memo_size: int = 0):
+        self.program = program
+        self.out = out
+        self.max_depth = max_depth
+        self.memo_size = memo_size
+        # (função, código como lista, constantes, número de parâmetros, valores iniciais dos slots,
+        # tabela de memoização ou None)
+        self._functions = [(f, f.code.tolist(), f.consts, f.nparams, f.defaults,
+                            {} if memo_size > 0 and f.memoize else None) for f in program.functions]
+        self._hits = [0] * len(program.functions)
+        self._misses = [0] * len(program.functions)
+
+    def memo_stats(self) -> dict[str, MemoStats]:
+        """Acertos, faltas e resultados guardados de cada função memoizada."""
+        return {f.name: MemoStats(self._hits[index], self._misses[index], len(table))
+                for index, (f, _, _, _, _, table) in enumerate(self._functions) if table is not None}
+
+    def run(self, entry: str = 'main', args: tuple = ()):
+        """Chama a função entry com args e devolve o valor que ela retorna."""
+        function = self.program.function(entry)
+        if len(args) != function.nparams:
+            raise VMError(f"espera {function.nparams} argumentos, recebeu {len(args)}", entry)
+        local_values = list(function.defaults)
+        local_values[:len(args)] = args
+        try:
+            return self._execute(self.program.index[entry], local_values)
+        finally:
+            if self.out is None:
+                sys.stdout.flush()
+
+    def _execute(self, index: int, local_values: list):
+        functions = self._functions
+        write = (self.out or sys.stdout).write
+        max_depth = self.max_depth
+        memo_size = self.memo_size
+        hits = self._hits
+        misses = self._misses
+
+        function, code, consts, _, _, _ = functions[index]
+        pc = 0
+        pending = None  # (tabela, argumentos) em que o RETURN guarda o resultado da chamada atual
+        frames = []
+        stack = []
+        push = stack.append
+        pop = stack.pop
+
+        try:
+            while True:
+                op = code[pc]
+                arg = code[pc + 1]
+                pc += 2
+                if op == LOAD_LOCAL:
+                    push(local_values[arg])
+                elif op == STORE_LOCAL:
+                    local_values[arg] = pop()
+                elif op == INCREMENT:
+                    local_values[arg] += consts[code[pc]]
+                    pc += 1
+                elif op <= DIV_FLOAT:
+                    # Operações aritméticas: o operando da direita vem do argumento ou da pilha
+                    if op == LOAD_CONST:
+                        push(consts[arg])
+                        continue
+                    if op <= DIV_FLOAT_LOCAL:
+                        right = local_values[arg]
+                        op -= ADD_LOCAL
+                    elif op <= DIV_FLOAT_CONST:
+                        right = consts[arg]
+                        op -= ADD_CONST
+                    else:
+                        right = pop()
+                        op -= ADD
+                    if op == 0:
+                        stack[-1] += right
+                    elif op == 1:
+                        stack[-1] -= right
+                    elif op == 2:
+                        stack[-1] *= right
+                    elif op == 3:
+                        left = stack[-1]
+                        quotient = left // right
+                        # // arredonda para baixo; a linguagem trunca em direção a zero
+                        if quotient < 0 and quotient * right != left:
+                            quotient += 1
+                        stack[-1] = quotient
+                    else:
+                        stack[-1] = stack[-1] / right
+                elif op <= JUMP_IF_NOT_NE:
+                    # Saltos condicionais: _LL e _LC trazem o operando da direita e o destino depois do slot
+                    if op <= JUMP_IF_NOT_NE_LL:
+                        left = local_values[arg]
+                        right = local_values[code[pc]]
+                        op -= JUMP_IF_NOT_LT_LL
+                        arg = code[pc + 1]
+                        pc += 2
+                    elif op <= JUMP_IF_NOT_NE_LC:
+                        left = local_values[arg]
+                        right = consts[code[pc]]
+                        op -= JUMP_IF_NOT_LT_LC
+                        arg = code[pc + 1]
+                        pc += 2
+                    else:
+                        right = pop()
+                        left = pop()
+                        op -= JUMP_IF_NOT_LT
+                    if op == 0:
+                        if not left < right:
+                            pc = arg
+                    elif op == 1:
+                        if not left <= right:
+                            pc = arg
+                    elif op == 2:
+                        if not left > right:
+                            pc = arg
+                    elif op == 3:
+                        if not left >= right:
+                            pc = arg
+                    elif op == 4:
+                        if left != right:
+                            pc = arg
+                    elif left == right:
+                        pc = arg
+                elif op == JUMP:
+                    pc = arg
+                elif op == CALL:
+                    if len(frames) >= max_depth:
+                        raise RecursionError
+                    callee = functions[arg]
+                    nparams = callee[3]
+                    table = callee[5]
+                    if table is not None:
+                        key = tuple(stack[len(stack) - nparams:])
+                        value = table.pop(key, _MISSING)
+                        if value is not _MISSING:
+                            # Acerto: o resultado volta para o fim da tabela (usado por último)
+                            table[key] = value
+                            del stack[len(stack) - nparams:]
+                            push(value)
+                            hits[arg] += 1
+                            continue
+                        misses[arg] += 1
+                    frames.append((function, code, consts, pc, local_values, pending))
+                    pending = (table, key) if table is not None else None
+                    function, code, consts, _, defaults, _ = callee
+                    local_values = defaults[:]
+                    if nparams:
+                        local_values[:nparams] = stack[-nparams:]
+                        del stack[-nparams:]
+                    pc = 0
+                elif op == RETURN:
+                    if pending is not None:
+                        table, key = pending
+                        if len(table) >= memo_size:
+                            del table[next(iter(table))]  # A usada há mais tempo
+                        table[key] = stack[-1]
+                    if not frames:
+                        return pop()
+                    function, code, consts, pc, local_values, pending = frames.pop()
+                elif op == PRINT:
+                    parts = consts[arg]
+                    count = len(parts) - 1
+                    if count:
+                        values = stack[-count:]
+                        del stack[-count:]
+                        text = parts[0] + ''.join([str(v) + p for v, p in zip(values, parts[1:])])
+                    else:
+                        text = parts[0]
+                    write(text + '\n')
+                elif op == POP:
+                    pop()
+                elif op == JUMP_IF_FALSE:
+                    if not pop():
+                        pc = arg
+                elif op == COMPARE:
+                    right = pop()
+                    stack[-1] = int(_COMPARE[arg](stack[-1], right))
+                elif op == TO_FLOAT:
+                    stack[-1] = float(stack[-1])
+                elif op == TO_INT:
+                    stack[-1] = int(stack[-1])
+                else:
+                    raise VMError(f"opcode desconhecido {op}", function.name)
+        except ZeroDivisionError:
+            raise VMError("divisão por zero", function.name) from None
+        except RecursionError:
+            raise VMError(f"mais de {max_depth} chamadas aninhadas", function.name) from None
+
+
+def run_program(program: BytecodeProgram, out=None, entry: str = 'main'):
+    return VM(program, out).run(entry)